@@ -0,0 +1,226 @@
+"""
+Enrutado por gimnasio (una base por gimnasio) y de lecturas a una réplica.
+
+Multi-gimnasio: con `TENANT_GYMS` configurado, `TenantMiddleware` (ver
+`daily_trainning_app/tenancy.py`) elige el gimnasio de cada petición por
+cabecera o subdominio y `TenantRouter` envía sus atletas, 1RM, series y
+derivados (`TENANT_MODELS`) a la base `gym_<gimnasio>`. El catálogo
+(`CATALOGUE_MODELS`) se escribe siempre en `default`, la base común, y se
+lee de la copia local de cada gimnasio. Sin gimnasio todo va a `default`.
+
+Réplica de lectura: `ReplicaRoutingMiddleware` marca como aptas las
+peticiones GET/HEAD/OPTIONS de clientes que no han escrito hace poco, y
+solo las vistas que lo piden (`ReplicaReadMixin` en la API: listados,
+detalle y analíticas) envían sus lecturas a
+`settings.DATABASE_REPLICA_ALIAS`, ya autenticada la petición. Sesiones,
+cuentas, admin y el resto leen de `default`, igual que todas las
+escrituras. Para que un cliente vea lo que acaba de escribir, tras una
+escritura sus peticiones dejan de ser aptas durante
+`REPLICA_STICKY_SECONDS` (por credenciales/sesión y por cookie); dentro de
+una vista que lee de la réplica, `use_primary()` fuerza `default`.
+
+Para probarlo en local basta con una copia del archivo SQLite:
+    cp db.sqlite3 replica.sqlite3
+    DATABASE_REPLICA_PATH=replica.sqlite3 python manage.py runserver
+"""
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE = 'read_primary'
+
+TENANT_APP = 'daily_trainning_app'
+
+# Modelos de cada gimnasio (nombre en minúsculas)
+TENANT_MODELS = frozenset({
+    'user', 'userexerciserm', 'workoutdata', 'archivedworkoutdata',
+    'athletefitnessstate', 'trainingprogram', 'programentry', 'changelog',
+    'searchtrigram', 'idempotencykey',
+})
+
+# Catálogo común, copiado en cada gimnasio (padres antes que hijos)
+CATALOGUE_MODELS = ('classification', 'exercise', 'exercisecontribution',
+                    'rpetable')
+
+# Gimnasio del contexto actual (None → base común `default`)
+_gym = ContextVar('gym', default=None)
+
+# Alias desde el que se lee en el contexto actual (None → `default`)
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def replica_alias():
+    alias = getattr(settings, 'DATABASE_REPLICA_ALIAS', None)
+    return alias if alias in settings.DATABASES else None
+
+
+@contextmanager
+def use_primary():
+    """ Fuerza las lecturas del bloque a `default` """
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+@contextmanager
+def use_replica():
+    """ Envía las lecturas del bloque a la réplica (si está configurada) """
+    token = _read_alias.set(replica_alias())
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+# 📌 1️⃣ Multi-gimnasio
+def gym_alias(gym):
+    """ Alias de la base de `gym` o None si no es un gimnasio configurado """
+    if gym not in getattr(settings, 'TENANT_GYMS', ()):
+        return None
+    return settings.TENANCY.get('alias_prefix', 'gym_') + gym
+
+
+def tenant_aliases():
+    return [gym_alias(gym) for gym in getattr(settings, 'TENANT_GYMS', ())]
+
+
+def is_tenant_db(alias):
+    return alias in tenant_aliases()
+
+
+def current_gym():
+    return _gym.get()
+
+
+@contextmanager
+def use_gym(gym):
+    """ Envía los modelos de gimnasio del bloque a la base de `gym` """
+    if gym and gym_alias(gym) is None:
+        raise KeyError(f"Gimnasio desconocido: '{gym}'.")
+    token = _gym.set(gym or None)
+    try:
+        yield
+    finally:
+        _gym.reset(token)
+
+
+def _scope(model):
+    """ 'tenant', 'catalogue' o None (modelos comunes: auth, sesiones, tareas) """
+    meta = model._meta
+    if meta.app_label != TENANT_APP:
+        return None
+    if meta.model_name in TENANT_MODELS:
+        return 'tenant'
+    if meta.model_name in CATALOGUE_MODELS:
+        return 'catalogue'
+    return None
+
+
+class TenantRouter:
+    """
+    Modelos de gimnasio a su base; el catálogo se lee de la copia local y
+    se escribe en `default`. Sin gimnasio en el contexto no decide nada.
+    """
+
+    def db_for_read(self, model, **hints):
+        gym = _gym.get()
+        if gym is None or _scope(model) is None:
+            return None
+        return gym_alias(gym)
+
+    def db_for_write(self, model, **hints):
+        gym = _gym.get()
+        scope = _scope(model)
+        if gym is None or scope is None:
+            return None
+        return gym_alias(gym) if scope == 'tenant' else DEFAULT_DB_ALIAS
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if not is_tenant_db(db):
+            return None
+        if app_label != TENANT_APP:
+            return False
+        return (model_name is None or model_name in TENANT_MODELS
+                or model_name in CATALOGUE_MODELS)
+
+
+# 📌 2️⃣ Réplica de lectura
+class ReplicaRouter:
+    """ Lecturas a la réplica cuando el contexto lo permite; escrituras a `default` """
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None:
+            return None
+        # Dentro de una transacción leemos lo que la propia transacción ve
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # Una instancia cargada de otra base (copias, scripts con `using`)
+        # se escribe donde está; las leídas de la réplica, en `default`
+        instance = hints.get('instance')
+        alias = getattr(getattr(instance, '_state', None), 'db', None)
+        if alias is not None and alias != replica_alias():
+            return alias
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
+
+
+def replica_allowed(request):
+    """ Si `ReplicaRoutingMiddleware` permite leer de la réplica en `request` """
+    return getattr(request, 'replica_allowed', False)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Decide por petición si sus lecturas pueden ir a la réplica
+    (`request.replica_allowed`) y fija en `default` a quien acaba de
+    escribir. No cambia el enrutado: eso lo hace la vista con `use_replica()`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if replica_alias() is None:
+            return self.get_response(request)
+
+        pin_key = self._pin_key(request)
+        safe = request.method in SAFE_METHODS
+        pinned = (PIN_COOKIE in request.COOKIES or
+                  (pin_key is not None and cache.get(pin_key)))
+        request.replica_allowed = safe and not pinned
+
+        response = self.get_response(request)
+
+        if not safe and response.status_code < 400:
+            sticky = settings.REPLICA_STICKY_SECONDS
+            if pin_key is not None:
+                cache.set(pin_key, True, sticky)
+            response.set_cookie(PIN_COOKIE, '1', max_age=sticky,
+                                httponly=True, samesite='Lax')
+        return response
+
+    @staticmethod
+    def _pin_key(request):
+        """ Identifica al cliente por sus credenciales o su sesión """
+        identity = (request.META.get('HTTP_AUTHORIZATION') or
+                    request.COOKIES.get(settings.SESSION_COOKIE_NAME))
+        if not identity:
+            return None
+        digest = hashlib.sha256(identity.encode()).hexdigest()
+        return f'replica-pin:{digest}'
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,10 +46,17 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'daily_trainning_app.compression.CompressionMiddleware',
+    'basis_trainning_app.db_routers.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'daily_trainning_app.tenancy.TenantMiddleware',
+    'daily_trainning_app.instrumentation.ProfilingMiddleware',
+    'daily_trainning_app.query_guard.NPlusOneMiddleware',
+    'daily_trainning_app.query_guard.QueryCountMiddleware',
+    'daily_trainning_app.traffic.TrafficRecordingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -83,6 +92,49 @@ DATABASES = {
     }
 }
 
+# Réplica de lectura opcional para listados, analíticas y exportaciones
+DATABASE_REPLICA_ALIAS = 'replica'
+
+# Segundos que un cliente sigue leyendo de `default` tras escribir
+REPLICA_STICKY_SECONDS = 5
+
+if os.environ.get('DATABASE_REPLICA_PATH'):
+    DATABASES[DATABASE_REPLICA_ALIAS] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['DATABASE_REPLICA_PATH'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Multi-gimnasio (ver `db_routers.py` y `daily_trainning_app/tenancy.py`):
+# cada gimnasio de `TENANT_GYMS` (p. ej. `TENANT_GYMS=norte,centro`) tiene su
+# propia base con sus atletas y series; el catálogo vive en `default`. El
+# gimnasio llega en la cabecera `header` o como subdominio de `domain`
+# (`norte.<domain>`) y sus usuarios deben estar en el grupo
+# `<group_prefix><gimnasio>`. Sin gimnasios, todo va a `default`.
+TENANCY = {
+    'header': 'X-Gym',
+    'domain': os.environ.get('TENANT_DOMAIN', ''),
+    'alias_prefix': 'gym_',
+    'group_prefix': 'gym:',
+    'directory': Path(os.environ.get('TENANT_DIRECTORY', BASE_DIR / 'tenants')),
+}
+
+TENANT_GYMS = [
+    gym.strip().lower()
+    for gym in os.environ.get('TENANT_GYMS', '').split(',') if gym.strip()
+]
+
+for _gym in TENANT_GYMS:
+    DATABASES[TENANCY['alias_prefix'] + _gym] = {
+        **DATABASES['default'],
+        'NAME': TENANCY['directory'] / f'{_gym}.sqlite3',
+    }
+
+DATABASE_ROUTERS = [
+    'basis_trainning_app.db_routers.TenantRouter',
+    'basis_trainning_app.db_routers.ReplicaRouter',
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -124,3 +176,189 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Entrenamientos más antiguos que este horizonte se mueven al archivo
+# (`manage.py archive_workouts`)
+WORKOUT_ARCHIVE_HORIZON_DAYS = 365
+
+
+# Fracción mínima de trigramas de la consulta que debe compartir un resultado
+SEARCH_MIN_SIMILARITY = 0.5
+
+
+# Coeficientes por defecto para estimar RPE y 1RM. Se pueden sobrescribir por
+# ejercicio o clasificación desde el admin (modelo `RPETable`).
+# - `rir_por_porcentaje`: %1RM → repeticiones en reserva (la más cercana)
+# - `ajuste_fatiga`: RPE extra según el nivel de fatiga del ejercicio
+# - `factores_ajuste`: factor de la fórmula del 1RM de la sesión
+# - `resolucion`: paso (en %1RM) de las tablas compiladas
+# - `recarga_segundos`: cada cuánto se comprueba si las tablas cambiaron
+RPE_TABLES = {
+    'rir_por_porcentaje': {
+        100: 0, 95: 1, 90: 2, 85: 3, 80: 4, 75: 5, 70: 6, 65: 7, 60: 8},
+    'ajuste_fatiga': {'Bajo': 0, 'Medio': 0.5, 'Alto': 1},
+    'factores_ajuste': {'Bajo': 0.022, 'Medio': 0.028, 'Alto': 0.033},
+    'resolucion': 0.1,
+    'porcentaje_maximo': 150,
+    'recarga_segundos': 30,
+}
+
+
+# Ingesta de series desde dispositivos (`POST /api/v1/workout-data/`)
+# - Las respuestas por `Idempotency-Key` se guardan este tiempo (segundos)
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+# - Token bucket por cliente: `rate` series/segundo con ráfagas de `burst`
+INGESTION_THROTTLE = {'rate': 20, 'burst': 100}
+# - Micro-lotes: las series se encolan y se guardan con `bulk_create`;
+#   `max_rejected` series descartadas (lote reintentado serie a serie) se
+#   guardan en memoria para revisarlas
+WORKOUT_INGEST_BUFFER = {
+    'enabled': os.environ.get('WORKOUT_INGEST_BUFFER') == '1',
+    'flush_interval_ms': 50,
+    'max_batch': 1000,
+    'max_rejected': 1000,
+}
+
+
+# Sincronización incremental (`/api/v1/sync/`, ver `sync.py`): los cambios
+# se sirven cuando tienen esta antigüedad, para que ninguna transacción
+# anterior confirme por detrás del token del cliente. Debe superar la
+# transacción más larga que escriba series o 1RM.
+SYNC_SETTLE_SECONDS = 2
+
+
+# Cola de tareas en segundo plano (ver `task_queue.py`)
+# - `lease_seconds`: tiempo tras el que una tarea `running` se da por
+#   abandonada (worker caído) y se reencola; debe superar la tarea más larga
+TASK_QUEUE = {
+    'lease_seconds': 15 * 60,
+}
+
+
+# Instrumentación del guardado de WorkoutData (ver `instrumentation.py`).
+# Con `enabled` se miden todas las peticiones; si no, solo las de staff que
+# envían `X-Profile: 1`, que además reciben un perfil por muestreo.
+WORKOUT_PROFILING = {
+    'enabled': os.environ.get('WORKOUT_PROFILING') == '1',
+    'sinks': [
+        'daily_trainning_app.instrumentation.RingBufferSink',
+        # 'daily_trainning_app.instrumentation.LoggingSink',
+        # 'daily_trainning_app.instrumentation.OpenTelemetrySink',
+    ],
+    'header': 'X-Profile',
+    'sample_interval_ms': 5,
+}
+
+
+# Detección de N+1 para desarrollo y tests (ver `query_guard.py`):
+# `off`, `log` (aviso con la pila de llamadas) o `raise` (NPlusOneError).
+N_PLUS_ONE_DETECTION = {
+    'mode': os.environ.get('N_PLUS_ONE', 'off'),
+    'threshold': 5,
+}
+
+# Pruebas de carga (`python -m benchmarks.loadtest`):
+# - `QUERY_COUNT_HEADER`: añade `X-DB-Queries` a cada respuesta
+# - `TRAFFIC_RECORDING_PATH`: graba las peticiones a `/api/` en JSON Lines
+#   para reproducirlas después
+QUERY_COUNT_HEADER = os.environ.get('QUERY_COUNT_HEADER') == '1'
+TRAFFIC_RECORDING_PATH = os.environ.get('TRAFFIC_RECORDING_PATH')
+
+# Feed en vivo de series (`/api/v1/live/workouts/`, solo con ASGI)
+# El broker vive en memoria de cada proceso y no reparte entre procesos: un
+# cliente solo ve en vivo las series guardadas por el worker ASGI que lo
+# atiende. Para un feed completo se despliega un único proceso ASGI que
+# reciba también la escritura de series; con más workers (o los procesos de
+# `settings_worker`) el resto se recupera con `Last-Event-ID` o `/api/v1/sync/`.
+# - `heartbeat_seconds`: comentario SSE si no hay eventos
+# - `max_queue`: eventos pendientes por cliente antes de avisar con `lagged`
+# - `backfill_limit`: series que se reenvían al reconectar con `Last-Event-ID`
+LIVE_FEED = {
+    'heartbeat_seconds': 15,
+    'max_queue': 1000,
+    'backfill_limit': 500,
+}
+
+# Compresión de respuestas (ver `compression.py`): gzip, o brotli si el
+# paquete `brotli` está instalado
+# - `min_size`: bytes a partir de los que se comprime
+# - `content_types`: tipos de la API que se comprimen, además de `*+json`
+#   (nunca HTML: lleva tokens CSRF, ver BREACH en `compression.py`)
+# - `max_random_bytes`: relleno aleatorio de la cabecera gzip (BREACH)
+# - `cache_timeout`: segundos que se guardan las listas del catálogo ya
+#   comprimidas (se invalidan antes si cambia el catálogo)
+RESPONSE_COMPRESSION = {
+    'min_size': 1024,
+    'max_random_bytes': 100,
+    'brotli_quality': 5,
+    'content_types': [
+        'application/json',
+        'application/msgpack',
+    ],
+    'cache_timeout': 60 * 60,
+}
+
+# Modelo fitness–fatiga de Banister (ver `fitness.py`)
+# - `tau_*`: constantes de tiempo (días) del fitness y de la fatiga
+# - `k_*`: pesos de cada componente en el rendimiento
+# - `metrica` × `peso_fatiga[nivel_fatiga]` × `escala`: impulso de cada serie
+FITNESS_MODEL = {
+    'tau_fitness': 42,
+    'tau_fatiga': 7,
+    'k_fitness': 1.0,
+    'k_fatiga': 2.0,
+    'metrica': 'volumen_relativo',
+    'peso_fatiga': {'Bajo': 0.8, 'Medio': 1.0, 'Alto': 1.2},
+    'escala': 0.01,
+}
+
+# Volumen semanal por grupo muscular (ver `muscle_volume.py`)
+# - `max_semanas`: semanas máximas por consulta
+# - `cache_timeout`: segundos que se guarda cada (atleta, semana) calculado
+MUSCLE_VOLUME = {
+    'max_semanas': 53,
+    'cache_timeout': 7 * 24 * 3600,
+}
+
+# Copias de seguridad en caliente (ver `backups.py`)
+# - `pages_per_step` / `sleep_ms`: páginas copiadas por paso y pausa entre
+#   pasos para dejar escribir a la ingesta
+# - `max_restarts`: reinicios tolerados antes de copiar el resto de una vez
+# - `delta_overlap_seconds`: cuánto se solapa cada delta con el anterior
+# - `chunk_rows`: filas por bloque en los deltas
+# - `full_max_age_hours`: los deltas solo llevan series y RMs (ni altas,
+#   bajas o ediciones sueltas de atletas, ejercicios, programas o tablas
+#   RPE); `backup_db --incremental` avisa si la última copia completa es
+#   más antigua. Programa la copia completa (`backup_db`) al menos así de a
+#   menudo.
+BACKUPS = {
+    'directory': BASE_DIR / 'backups',
+    'pages_per_step': 1024,
+    'sleep_ms': 5,
+    'max_restarts': 3,
+    'delta_overlap_seconds': 300,
+    'chunk_rows': 5000,
+    'full_max_age_hours': 24,
+}
+
+
+# Django REST Framework
+# https://www.django-rest-framework.org/api-guide/settings/
+
+REST_FRAMEWORK = {
+    # Las credenciales Basic solo valen en los gimnasios del usuario
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'daily_trainning_app.api.authentication.GymBasicAuthentication',
+    ],
+    # Se eligen con la cabecera `Accept`; `orjson` y `msgpack` son opcionales
+    'DEFAULT_RENDERER_CLASSES': [
+        'daily_trainning_app.api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'daily_trainning_app.api.renderers.ColumnarJSONRenderer',
+    ] + (
+        ['daily_trainning_app.api.renderers.MessagePackRenderer']
+        if find_spec('msgpack') else []
+    ),
+}
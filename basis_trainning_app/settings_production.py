@@ -0,0 +1,106 @@
+"""
+Production settings for basis_trainning_app project.
+
+Extiende `settings.py` con conexiones persistentes y SQLite afinado para
+escrituras concurrentes (WAL, `synchronous=NORMAL`, busy timeout, mmap).
+Con `DATABASE_ENGINE=postgresql` usa PostgreSQL con pool de conexiones.
+
+Uso:
+    DJANGO_SETTINGS_MODULE=basis_trainning_app.settings_production
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import (
+    BASE_DIR, DATABASE_REPLICA_ALIAS, SECRET_KEY as DEV_SECRET_KEY, TENANCY,
+    TENANT_GYMS
+)
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', DEV_SECRET_KEY)
+
+DEBUG = os.environ.get('DJANGO_DEBUG', '') == '1'
+
+ALLOWED_HOSTS = [
+    host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',')
+    if host
+]
+
+
+# Database
+# https://docs.djangoproject.com/en/5.1/ref/databases/#sqlite-notes
+
+# Se aplican en cada conexión nueva (`init_command`). WAL permite que los
+# lectores no bloqueen al escritor y viceversa; con WAL, `synchronous=NORMAL`
+# sigue siendo seguro ante caídas del proceso.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'cache_size': -64000,  # 64 MB
+    'temp_store': 'MEMORY',
+}
+
+SQLITE_INIT_COMMAND = ';'.join(
+    f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items())
+
+if os.environ.get('DATABASE_ENGINE') == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DATABASE_NAME', 'basis_trainning_app'),
+            'USER': os.environ.get('DATABASE_USER', ''),
+            'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+            'HOST': os.environ.get('DATABASE_HOST', ''),
+            'PORT': os.environ.get('DATABASE_PORT', ''),
+            # El pool (psycopg 3) sustituye a las conexiones persistentes
+            'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('DATABASE_POOL_MIN', 2)),
+                    'max_size': int(os.environ.get('DATABASE_POOL_MAX', 20)),
+                    'timeout': 10,
+                },
+            },
+        }
+    }
+    if os.environ.get('DATABASE_REPLICA_HOST'):
+        DATABASES[DATABASE_REPLICA_ALIAS] = {
+            **DATABASES['default'],
+            'HOST': os.environ['DATABASE_REPLICA_HOST'],
+            'PORT': os.environ.get('DATABASE_REPLICA_PORT',
+                                   DATABASES['default']['PORT']),
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'init_command': SQLITE_INIT_COMMAND,
+                # Toma el bloqueo de escritura al empezar la transacción y
+                # evita los "database is locked" al promocionar una lectura
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+    if os.environ.get('DATABASE_REPLICA_PATH'):
+        DATABASES[DATABASE_REPLICA_ALIAS] = {
+            **DATABASES['default'],
+            'NAME': os.environ['DATABASE_REPLICA_PATH'],
+            'TEST': {'MIRROR': 'default'},
+        }
+
+# Una base por gimnasio, con la misma configuración que `default`
+for _gym in TENANT_GYMS:
+    DATABASES[TENANCY['alias_prefix'] + _gym] = {
+        **DATABASES['default'],
+        'NAME': (f"{DATABASES['default']['NAME']}_{_gym}"
+                 if os.environ.get('DATABASE_ENGINE') == 'postgresql'
+                 else TENANCY['directory'] / f'{_gym}.sqlite3'),
+    }
@@ -0,0 +1,34 @@
+"""
+Slim settings for worker and command processes.
+
+Los procesos de corta duración (`run_workers`, `recompute_workouts`,
+`archive_workouts`, cron) no sirven HTTP: no cargan admin, sesiones,
+mensajes, staticfiles ni Django REST Framework, y no tienen middleware.
+El resto (base de datos, ajustes de la app) se hereda del perfil indicado
+en `DJANGO_BASE_SETTINGS` (por defecto `settings`).
+
+Uso:
+    DJANGO_SETTINGS_MODULE=basis_trainning_app.settings_worker \
+        python manage.py run_workers
+"""
+
+import importlib
+import os
+
+_base = importlib.import_module(
+    os.environ.get('DJANGO_BASE_SETTINGS', 'basis_trainning_app.settings'))
+globals().update(
+    {name: value for name, value in vars(_base).items() if name.isupper()})
+
+INSTALLED_APPS = [
+    'django.contrib.contenttypes',
+    # `User.cuenta` apunta a las cuentas de `auth` (solo modelos, sin vistas)
+    'django.contrib.auth',
+    'daily_trainning_app',
+]
+
+MIDDLEWARE = []
+
+TEMPLATES = []
+
+ROOT_URLCONF = 'basis_trainning_app.urls_worker'
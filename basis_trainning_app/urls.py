@@ -17,8 +17,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from daily_trainning_app.api.router import router_trauning_app
+from daily_trainning_app import views as training_views
 
 urlpatterns = [
+    path('admin/profiling/', admin.site.admin_view(training_views.profiling),
+         name='profiling'),
     path('admin/', admin.site.urls),
+    path('api/v1/live/workouts/', training_views.workout_feed,
+         name='live-workouts'),
     path('api/v1/', include(router_trauning_app.urls)),  # Todas las rutas de los ViewSets dentro de `/api/`
 ]
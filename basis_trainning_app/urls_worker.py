@@ -0,0 +1,5 @@
+"""
+URL configuration for worker processes (`settings_worker`): sin rutas.
+"""
+
+urlpatterns = []
@@ -0,0 +1,30 @@
+"""
+Ejecuta todos los benchmarks (`bench_*.py`) en procesos separados.
+
+Uso:
+    python -m benchmarks            # todos
+    python -m benchmarks serializers  # solo los que contengan el texto
+"""
+import pathlib
+import subprocess
+import sys
+
+
+def main(argv):
+    root = pathlib.Path(__file__).resolve().parent
+    selected = [
+        path.stem for path in sorted(root.glob("bench_*.py"))
+        if not argv or any(name in path.stem for name in argv)
+    ]
+    failures = 0
+    for name in selected:
+        print(f"\n📊 {name}")
+        completed = subprocess.run(
+            [sys.executable, "-m", f"benchmarks.{name}"],
+            cwd=root.parent)
+        failures += completed.returncode != 0
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
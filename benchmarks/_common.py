@@ -0,0 +1,109 @@
+"""
+Utilidades compartidas por los benchmarks.
+
+Cada benchmark trabaja sobre una base SQLite temporal (nunca sobre
+`db.sqlite3`), aplica las migraciones y genera datos sintéticos con
+`bulk_create`.
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+import django
+
+
+def setup_django(settings_module="basis_trainning_app.settings", db_path=None):
+    """ Configura Django apuntando la base `default` a un archivo temporal """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    from django.conf import settings
+
+    if db_path is None:
+        handle, db_path = tempfile.mkstemp(
+            prefix="bench-", suffix=".sqlite3")
+        os.close(handle)
+    settings.DATABASES["default"]["NAME"] = db_path
+    settings.DEBUG = False
+    django.setup()
+
+    from django.core.management import call_command
+    call_command("migrate", verbosity=0, interactive=False)
+    return db_path
+
+
+def populate(users=50, exercises=20, workouts=10000, seed=42):
+    """ Genera un catálogo, usuarios, 1RMs y entrenamientos aleatorios """
+    from daily_trainning_app.models import (
+        Classification, Exercise, User, UserExerciseRM, WorkoutData
+    )
+
+    rng = random.Random(seed)
+    classifications = Classification.objects.bulk_create(
+        Classification(nombre=f"Grupo {i}") for i in range(10))
+    exercise_objs = Exercise.objects.bulk_create(
+        Exercise(
+            nombre=f"Ejercicio {i}",
+            video=f"https://youtube.com/ejercicio{i}",
+            descripcion="Ejercicio generado para benchmarks.",
+            classification=rng.choice(classifications),
+            nivel_fatiga=rng.choice(["Bajo", "Medio", "Alto"]),
+        ) for i in range(exercises))
+    user_objs = User.objects.bulk_create(
+        User(
+            nombre=f"Atleta {i}",
+            email=f"atleta{i}@example.com",
+            fecha_inicio=date(2024, 1, 1),
+        ) for i in range(users))
+    UserExerciseRM.objects.bulk_create(
+        UserExerciseRM(
+            user=user,
+            exercise=exercise,
+            peso_maximo_rm=rng.randint(80, 200),
+            fecha_registro=date(2024, 1, 1),
+        ) for user in user_objs for exercise in exercise_objs)
+
+    today = date.today()
+    batch = []
+    for _ in range(workouts):
+        sets = rng.randint(3, 5)
+        reps = rng.randint(3, 12)
+        peso = rng.randint(40, 150)
+        batch.append(WorkoutData(
+            user=rng.choice(user_objs),
+            exercise=rng.choice(exercise_objs),
+            fecha=today - timedelta(days=rng.randint(0, 365)),
+            sets=sets,
+            reps=reps,
+            peso=peso,
+            intensidad_relativa=round(rng.uniform(50, 95), 2),
+            volumen_relativo=round(rng.uniform(500, 5000), 2),
+            rpe_objetivo=round(rng.uniform(5, 10), 2),
+            rm_sesion=round(rng.uniform(60, 220), 2),
+        ))
+    WorkoutData.objects.bulk_create(batch, batch_size=1000)
+    return user_objs, exercise_objs
+
+
+def measure(func, repeat=5):
+    """ Ejecuta `func` varias veces y devuelve (mediana en segundos, resultado) """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def cleanup(db_path):
+    """ Cierra las conexiones y elimina la base temporal """
+    from django.db import connections
+
+    connections.close_all()
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(db_path + suffix)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,194 @@
+"""
+Servidores HTTP locales para las pruebas de carga (`benchmarks.loadtest`).
+
+- `wsgi`: `basis_trainning_app.wsgi.application` sobre el servidor con
+  hilos de `runserver`, sin el log por petición.
+- `asgi`: `basis_trainning_app.asgi.application` con `uvicorn` si está
+  instalado; si no, con un servidor HTTP/1.1 mínimo sobre `asyncio`
+  (keep-alive, `Content-Length` y `chunked` para las respuestas en
+  streaming como el feed SSE; suficiente para la API, no para producción).
+
+Uso (lo lanza `loadtest --serve`):
+    python -m benchmarks._servers wsgi|asgi PORT DB_PATH
+"""
+import asyncio
+import os
+import sys
+from http import HTTPStatus
+from importlib.util import find_spec
+from urllib.parse import unquote
+
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def prepare(db_path):
+    """ Django sobre la base de pruebas, con el conteo de consultas activo """
+    os.environ["QUERY_COUNT_HEADER"] = "1"
+    from benchmarks._common import setup_django
+
+    setup_django(os.environ.get("DJANGO_SETTINGS_MODULE",
+                                "basis_trainning_app.settings"), db_path)
+    from django.conf import settings
+    settings.ALLOWED_HOSTS = ["*"]
+    # Basic auth verifica la contraseña en cada petición: con PBKDF2 el
+    # hash dominaría la medición (ver `loadtest.provision_accounts`)
+    settings.PASSWORD_HASHERS = FAST_HASHERS
+
+
+# 📌 1️⃣ WSGI
+def serve_wsgi(port):
+    from django.core.servers.basehttp import (
+        ThreadedWSGIServer, WSGIRequestHandler
+    )
+
+    from basis_trainning_app.wsgi import application
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadedWSGIServer(("127.0.0.1", port), QuietHandler)
+    httpd.daemon_threads = True
+    httpd.set_app(application)
+    httpd.serve_forever()
+
+
+# 📌 2️⃣ ASGI
+async def _handle_connection(app, reader, writer):
+    server = writer.get_extra_info("sockname")[:2]
+    client = writer.get_extra_info("peername")[:2]
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            method, target, version = request_line.decode("latin-1").split()
+            headers = []
+            length = 0
+            keep_alive = version == "HTTP/1.1"
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                name, value = name.strip().lower(), value.strip()
+                headers.append((name.encode("latin-1"), value.encode("latin-1")))
+                if name == "content-length":
+                    length = int(value)
+                elif name == "connection":
+                    keep_alive = value.lower() == "keep-alive" or (
+                        keep_alive and value.lower() != "close")
+            body = await reader.readexactly(length) if length else b""
+
+            path, _, query = target.partition("?")
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": version.split("/")[1],
+                "method": method,
+                "scheme": "http",
+                "path": unquote(path),
+                "raw_path": path.encode("latin-1"),
+                "query_string": query.encode("latin-1"),
+                "root_path": "",
+                "headers": headers,
+                "client": client,
+                "server": server,
+            }
+            pending = [{"type": "http.request", "body": body,
+                        "more_body": False}]
+            disconnected = asyncio.Event()
+
+            async def receive():
+                if pending:
+                    return pending.pop()
+                # Django escucha la desconexión mientras procesa la petición
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+
+            response = {"status": 500, "headers": [], "body": [],
+                        "chunked": False}
+
+            def head(extra):
+                status = response["status"]
+                lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+                for name, value in response["headers"]:
+                    if name.lower() not in (b"content-length",
+                                            b"transfer-encoding",
+                                            b"connection"):
+                        lines.append(f"{name.decode('latin-1')}: "
+                                     f"{value.decode('latin-1')}")
+                lines.append(extra)
+                lines.append("Connection: keep-alive" if keep_alive
+                             else "Connection: close")
+                return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    response["status"] = message["status"]
+                    response["headers"] = message.get("headers", [])
+                elif message["type"] == "http.response.body":
+                    body = message.get("body", b"")
+                    more = message.get("more_body", False)
+                    if more and not response["chunked"]:
+                        # Respuesta en streaming (p. ej. SSE): chunked
+                        response["chunked"] = True
+                        writer.write(head("Transfer-Encoding: chunked"))
+                    if response["chunked"]:
+                        if body:
+                            writer.write(b"%x\r\n%s\r\n" % (len(body), body))
+                        if not more:
+                            writer.write(b"0\r\n\r\n")
+                        await writer.drain()
+                    else:
+                        response["body"].append(body)
+
+            app_task = asyncio.ensure_future(app(scope, receive, send))
+            # Si el cliente cierra (p. ej. un stream SSE), avisamos a Django
+            eof_task = asyncio.ensure_future(reader.read())
+            await asyncio.wait({app_task, eof_task},
+                               return_when=asyncio.FIRST_COMPLETED)
+            if not app_task.done():
+                disconnected.set()
+                await app_task
+                break
+            eof_task.cancel()
+            await asyncio.wait({eof_task})
+            app_task.result()
+            if not response["chunked"]:
+                payload = b"".join(response["body"])
+                writer.write(head(f"Content-Length: {len(payload)}"))
+                writer.write(payload)
+                await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def serve_asgi(port):
+    from basis_trainning_app.asgi import application
+
+    if find_spec("uvicorn"):
+        import uvicorn
+        uvicorn.run(application, host="127.0.0.1", port=port,
+                    log_level="warning", access_log=False)
+        return
+
+    async def main():
+        server = await asyncio.start_server(
+            lambda reader, writer: _handle_connection(
+                application, reader, writer),
+            "127.0.0.1", port, backlog=1024)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    interface, port, db_path = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+    prepare(db_path)
+    {"wsgi": serve_wsgi, "asgi": serve_asgi}[interface](port)
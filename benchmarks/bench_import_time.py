@@ -0,0 +1,74 @@
+"""
+Coste de arranque por perfil de settings, medido con `python -X importtime`.
+
+Compara `settings` (web: admin, DRF, staticfiles...) con `settings_worker`
+(procesos de tareas y comandos) y muestra los módulos más caros.
+
+Uso:
+    python -m benchmarks.bench_import_time [repeticiones]
+"""
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+PROFILES = (
+    ("web", "basis_trainning_app.settings"),
+    ("worker", "basis_trainning_app.settings_worker"),
+)
+
+# Lo que hace cualquier comando o worker antes de empezar a trabajar
+STARTUP = (
+    "import django; django.setup(); "
+    "import daily_trainning_app.task_queue, daily_trainning_app.recompute"
+)
+
+
+def run(settings_module, importtime=False):
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings_module}
+    args = [sys.executable]
+    if importtime:
+        args += ["-X", "importtime"]
+    start = time.perf_counter()
+    completed = subprocess.run(
+        args + ["-c", STARTUP], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True)
+    return time.perf_counter() - start, completed.stderr
+
+
+def parse_importtime(stderr):
+    """
+    Devuelve [(cumulativo_us, propio_us, módulo, es_raíz)] de la salida de
+    importtime. `es_raíz` indica un import directo (sin sangría).
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((int(cumulative), int(own), name.strip(),
+                        not name[1:].startswith(" ")))
+    return modules
+
+
+def main(repeat=5):
+    for label, settings_module in PROFILES:
+        wall = statistics.median(
+            run(settings_module)[0] for _ in range(repeat))
+        _, stderr = run(settings_module, importtime=True)
+        modules = parse_importtime(stderr)
+        total_ms = sum(own for _, own, _, _ in modules) / 1000
+        print(f"  {label:<7} arranque {wall * 1000:7.1f} ms  "
+              f"imports {total_ms:7.1f} ms  módulos {len(modules)}")
+        top_level = sorted(
+            (item for item in modules if item[3]), reverse=True)
+        for cumulative, _, name, _ in top_level[:5]:
+            print(f"           {cumulative / 1000:7.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,55 @@
+"""
+Ingesta de series: `clean()` + `save()` por serie frente a micro-lotes
+(`ingestion.bulk_insert_workouts`).
+
+Uso:
+    python -m benchmarks.bench_ingestion [n_series] [lote]
+"""
+import random
+import sys
+import time
+from datetime import date
+
+from benchmarks._common import cleanup, populate, setup_django
+
+
+def main(n_sets=2000, batch=500):
+    db_path = setup_django("basis_trainning_app.settings_production")
+    try:
+        users, exercises = populate(workouts=0)
+
+        from daily_trainning_app.ingestion import bulk_insert_workouts
+        from daily_trainning_app.models import WorkoutData
+
+        rng = random.Random(1)
+        rows = [{
+            "user_id": rng.choice(users).pk,
+            "exercise_id": rng.choice(exercises).pk,
+            "fecha": date.today(),
+            "sets": rng.randint(3, 5),
+            "reps": rng.randint(3, 12),
+            "peso": rng.randint(40, 150),
+        } for _ in range(n_sets)]
+
+        start = time.perf_counter()
+        for row in rows:
+            workout = WorkoutData(**row)
+            workout.clean()
+            workout.save()
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for offset in range(0, n_sets, batch):
+            bulk_insert_workouts(rows[offset:offset + batch])
+        batched = time.perf_counter() - start
+
+        print(f"Series: {n_sets}  Lote: {batch}")
+        print(f"  clean() + save()      {n_sets / single:10.0f} series/s")
+        print(f"  bulk_insert_workouts  {n_sets / batched:10.0f} series/s "
+              f"x{single / batched:5.1f}")
+    finally:
+        cleanup(db_path)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
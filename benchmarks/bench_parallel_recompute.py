@@ -0,0 +1,47 @@
+"""
+Escalado del recálculo paralelo (`recompute.recompute_all`) de 1 a N procesos.
+
+Usa el perfil de producción con `SQLITE_PATH` para que los procesos hijos
+abran la misma base temporal.
+
+Uso:
+    python -m benchmarks.bench_parallel_recompute [n_workouts] [max_procesos]
+"""
+import os
+import sys
+import tempfile
+
+from benchmarks._common import cleanup, populate, setup_django
+
+
+def main(n_workouts=50000, max_processes=None):
+    handle, db_path = tempfile.mkstemp(prefix="bench-", suffix=".sqlite3")
+    os.close(handle)
+    os.environ["SQLITE_PATH"] = db_path
+    setup_django("basis_trainning_app.settings_production", db_path=db_path)
+    try:
+        populate(users=200, exercises=20, workouts=n_workouts)
+
+        from django.db import connections
+        from daily_trainning_app.models import WorkoutData
+        from daily_trainning_app.recompute import recompute_all
+
+        max_processes = max_processes or min(os.cpu_count() or 1, 8)
+        print(f"Filas: {n_workouts}  Núcleos: {os.cpu_count()}")
+        baseline = None
+        processes = 1
+        while processes <= max_processes:
+            # Valores de partida distintos para que cada pasada escriba
+            WorkoutData.objects.update(rpe_objetivo=0.0)
+            connections.close_all()
+            stats = recompute_all(processes=processes)
+            baseline = baseline or stats["filas_por_segundo"]
+            print(f"  {processes:2d} procesos {stats['filas_por_segundo']:10d} "
+                  f"filas/s  x{stats['filas_por_segundo'] / baseline:4.1f}")
+            processes *= 2
+    finally:
+        cleanup(db_path)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,54 @@
+"""
+Compara `WorkoutDataSerializer` con la ruta rápida de `fast_serializers`.
+
+Uso:
+    python -m benchmarks.bench_serializers [n_workouts]
+"""
+import sys
+
+from benchmarks._common import cleanup, measure, populate, setup_django
+
+
+def main(n_workouts=10000):
+    db_path = setup_django()
+    try:
+        populate(workouts=n_workouts)
+
+        from daily_trainning_app.api.fast_serializers import (
+            serialize_workouts, serialize_workouts_compact
+        )
+        from daily_trainning_app.api.serializers import WorkoutDataSerializer
+        from daily_trainning_app.models import WorkoutData
+
+        queryset = WorkoutData.objects.select_related(
+            "user", "exercise__classification").all()
+
+        def drf():
+            return WorkoutDataSerializer(queryset.all(), many=True).data
+
+        def fast():
+            return serialize_workouts(queryset.all())
+
+        def compact():
+            return serialize_workouts_compact(queryset.all())
+
+        baseline, expected = measure(drf, repeat=3)
+        fast_time, result = measure(fast)
+        compact_time, _ = measure(compact)
+        assert [dict(row) for row in expected] == result, \
+            "La ruta rápida no coincide con WorkoutDataSerializer"
+
+        print(f"Filas: {n_workouts}")
+        for label, seconds in (
+                ("WorkoutDataSerializer", baseline),
+                ("serialize_workouts", fast_time),
+                ("serialize_workouts_compact", compact_time)):
+            print(f"  {label:<28} {seconds * 1000:9.1f} ms "
+                  f"{n_workouts / seconds:12.0f} filas/s "
+                  f"x{baseline / seconds:5.1f}")
+    finally:
+        cleanup(db_path)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,115 @@
+"""
+Escrituras y lecturas concurrentes sobre SQLite: perfil por defecto
+(`settings`) frente al perfil de producción (`settings_production`).
+
+Uso:
+    python -m benchmarks.bench_sqlite_concurrency [writers] [readers] [seconds]
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from datetime import date
+
+PROFILES = (
+    ("default", "basis_trainning_app.settings"),
+    ("production", "basis_trainning_app.settings_production"),
+)
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_profile(settings_module, writers, readers, seconds):
+    """ Se ejecuta en un subproceso con el perfil indicado """
+    os.environ["DJANGO_SETTINGS_MODULE"] = settings_module
+    os.environ.pop("DATABASE_ENGINE", None)
+    from benchmarks._common import cleanup, populate, setup_django
+
+    db_path = setup_django(settings_module)
+    try:
+        users, exercises = populate(users=20, exercises=10, workouts=5000)
+
+        from django.db import OperationalError, connection, transaction
+        from daily_trainning_app.models import WorkoutData
+
+        deadline = time.perf_counter() + seconds
+        lock = threading.Lock()
+        stats = {"writes": 0, "reads": 0, "errors": 0, "latencies": []}
+
+        def writer(index):
+            user = users[index % len(users)]
+            exercise = exercises[index % len(exercises)]
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    with transaction.atomic():
+                        WorkoutData.objects.create(
+                            user=user, exercise=exercise, fecha=date.today(),
+                            sets=4, reps=8, peso=100)
+                    elapsed = time.perf_counter() - start
+                    with lock:
+                        stats["writes"] += 1
+                        stats["latencies"].append(elapsed)
+                except OperationalError:
+                    with lock:
+                        stats["errors"] += 1
+            connection.close()
+
+        def reader(index):
+            user = users[index % len(users)]
+            while time.perf_counter() < deadline:
+                try:
+                    list(WorkoutData.objects.filter(user=user)
+                         .order_by("-fecha")[:50])
+                    with lock:
+                        stats["reads"] += 1
+                except OperationalError:
+                    with lock:
+                        stats["errors"] += 1
+            connection.close()
+
+        threads = [threading.Thread(target=writer, args=(i,))
+                   for i in range(writers)]
+        threads += [threading.Thread(target=reader, args=(i,))
+                    for i in range(readers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        latencies = stats.pop("latencies")
+        stats["p99_write_ms"] = percentile(latencies, 0.99) * 1000
+        return stats
+    finally:
+        cleanup(db_path)
+
+
+def main(writers=4, readers=8, seconds=5):
+    print(f"Escritores: {writers}  Lectores: {readers}  Duración: {seconds}s")
+    for label, settings_module in PROFILES:
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_sqlite_concurrency",
+             "--profile", settings_module, str(writers), str(readers),
+             str(seconds)],
+            capture_output=True, text=True, check=True)
+        stats = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(f"  {label:<11} escrituras/s {stats['writes'] / seconds:9.0f}  "
+              f"lecturas/s {stats['reads'] / seconds:9.0f}  "
+              f"p99 escritura {stats['p99_write_ms']:8.1f} ms  "
+              f"errores {stats['errors']}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--profile"]:
+        settings_module = sys.argv[2]
+        args = [int(arg) for arg in sys.argv[3:6]]
+        print(json.dumps(run_profile(settings_module, *args)))
+    else:
+        main(*(int(arg) for arg in sys.argv[1:4]))
@@ -0,0 +1,443 @@
+"""
+Pruebas de carga de `/api/v1/` con mezclas de peticiones realistas.
+
+Genera (o reproduce) una mezcla de tráfico: lecturas de atletas, paneles de
+entrenadores y ráfagas de series enviadas desde dispositivos. La lanza con
+llegadas en bucle abierto (Poisson, `--rate` peticiones/s) desde `--clients`
+conexiones keep-alive, y mide la latencia desde el instante programado (así
+las colas del servidor no se esconden). Informa del throughput y de
+p50/p95/p99 y consultas a la base (`X-DB-Queries`) por ruta.
+
+Uso:
+    # Servidor local WSGI o ASGI sobre una base temporal con datos sintéticos
+    python -m benchmarks.loadtest --serve wsgi --rate 100 --duration 20
+    python -m benchmarks.loadtest --serve asgi --clients 64 --rate 0
+
+    # Reproducir tráfico grabado con
+    #   TRAFFIC_RECORDING_PATH=traffic.jsonl python manage.py runserver
+    python -m benchmarks.loadtest --serve wsgi --replay traffic.jsonl --speed 2
+
+    # Contra un servidor ya arrancado (gunicorn, uvicorn...), con
+    # QUERY_COUNT_HEADER=1 para ver las consultas
+    python -m benchmarks.loadtest --target http://127.0.0.1:8000 \\
+        --auth coach:secret --users 50 --exercises 20
+
+`--rate 0` desactiva el ritmo: cada cliente encadena peticiones sin pausa
+(bucle cerrado, para medir el throughput máximo).
+"""
+import argparse
+import base64
+import http.client
+import json
+import os
+import queue
+import random
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import date
+from urllib.parse import urlsplit
+
+API = "/api/v1"
+PASSWORD = "loadtest"
+COACH = "coach"
+
+# Peso de cada escenario en la mezcla sintética
+MIX = {
+    "athlete_reads": 0.6,
+    "coach_dashboards": 0.15,
+    "ingestion_bursts": 0.25,
+}
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def route_of(method, path):
+    """ Agrupa las rutas: ids como `{id}` y solo los nombres de parámetros """
+    path, _, query = path.partition("?")
+    path = re.sub(r"/\d+(?=/|$)", "/{id}", path)
+    keys = sorted({part.split("=")[0] for part in query.split("&") if part})
+    return f"{method} {path}" + (f"?{'&'.join(keys)}" if keys else "")
+
+
+# 📌 1️⃣ Mezclas de peticiones
+def _request(t, method, path, user_id=None, staff=False, body=None,
+             headers=None):
+    return {
+        "t": t,
+        "method": method,
+        "path": path,
+        "body": json.dumps(body) if body is not None else "",
+        "content_type": "application/json" if body is not None else "",
+        "user_id": user_id,
+        "staff": staff,
+        "headers": headers or {},
+    }
+
+
+def athlete_read(rng, t, user_id, exercise_ids):
+    choice = rng.random()
+    if choice < 0.35:
+        return [_request(t, "GET", f"{API}/workout-data/?layout=compact",
+                         user_id)]
+    if choice < 0.55:
+        return [_request(t, "GET", f"{API}/sync/?since=0&limit=500", user_id)]
+    if choice < 0.7:
+        return [_request(t, "GET", f"{API}/user-exercise-rm/", user_id)]
+    if choice < 0.85:
+        return [_request(t, "GET", f"{API}/exercises/", user_id)]
+    items = [{"exercise_id": exercise_id, "sets": 4, "reps": rng.randint(3, 10),
+              "rpe": rng.choice([7, 8, 9])}
+             for exercise_id in rng.sample(exercise_ids, min(5, len(exercise_ids)))]
+    return [_request(t, "POST", f"{API}/prescriptions/", user_id,
+                     body={"user_id": user_id, "incremento": 2.5,
+                           "items": items})]
+
+
+def coach_dashboard(rng, t, user_ids, exercise_ids):
+    choice = rng.random()
+    if choice < 0.3:
+        return [_request(t, "GET", f"{API}/users/?q=atleta", staff=True)]
+    if choice < 0.6:
+        user_id = rng.choice(user_ids)
+        return [_request(t, "GET", f"{API}/workout-data/{user_id}/latest/",
+                         staff=True)]
+    if choice < 0.8:
+        return [_request(t, "GET", f"{API}/programs/", staff=True)]
+    return [_request(t, "GET", f"{API}/tasks/?estado=failed", staff=True)]
+
+
+def ingestion_burst(rng, t, user_id, exercise_ids, size=None):
+    """ Un dispositivo sincroniza varias series seguidas """
+    size = size or rng.randint(5, 20)
+    exercise_id = rng.choice(exercise_ids)
+    return [
+        _request(t + index * 0.01, "POST", f"{API}/workout-data/", user_id,
+                 body={"user_id": user_id, "exercise_id": exercise_id,
+                       "fecha": date.today().isoformat(),
+                       "sets": 1, "reps": rng.randint(3, 12),
+                       "peso": rng.randint(40, 150)},
+                 headers={"Idempotency-Key": uuid.uuid4().hex})
+        for index in range(size)
+    ]
+
+
+def synthesize(rate, duration, user_ids, exercise_ids, mix=MIX, seed=42):
+    """ Llegadas de Poisson a `rate` eventos/s repartidas según `mix` """
+    rng = random.Random(seed)
+    scenarios = list(mix)
+    weights = [mix[name] for name in scenarios]
+    requests = []
+    t = 0.0
+    while True:
+        t += rng.expovariate(rate)
+        if t >= duration:
+            break
+        scenario = rng.choices(scenarios, weights)[0]
+        if scenario == "athlete_reads":
+            requests += athlete_read(
+                rng, t, rng.choice(user_ids), exercise_ids)
+        elif scenario == "coach_dashboards":
+            requests += coach_dashboard(rng, t, user_ids, exercise_ids)
+        else:
+            requests += ingestion_burst(
+                rng, t, rng.choice(user_ids), exercise_ids)
+    return sorted(requests, key=lambda request: request["t"])
+
+
+def load_recording(path, speed=1.0):
+    """ Lee el tráfico grabado por `TrafficRecordingMiddleware` """
+    requests = []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            entry = json.loads(line)
+            requests.append({
+                "t": entry["t"] / speed,
+                "method": entry["method"],
+                "path": entry["path"],
+                "body": entry.get("body", ""),
+                "content_type": entry.get("content_type", ""),
+                "user_id": entry.get("user_id"),
+                "staff": entry.get("staff", False),
+                "headers": {},
+            })
+    if requests:
+        first = min(request["t"] for request in requests)
+        for request in requests:
+            request["t"] -= first
+    return sorted(requests, key=lambda request: request["t"])
+
+
+# 📌 2️⃣ Ejecución
+def basic_auth(username, password):
+    token = base64.b64encode(f"{username}:{password}".encode()).decode()
+    return f"Basic {token}"
+
+
+def run(requests, base_url, clients, auth_for, paced=True):
+    """
+    Lanza las peticiones desde `clients` hilos. Devuelve
+    `(resultados, segundos)` con `(ruta, estado, latencia, consultas)`.
+    """
+    target = urlsplit(base_url)
+    pending = queue.Queue()
+    for request in requests:
+        pending.put(request)
+    results = []
+    lock = threading.Lock()
+    start = time.perf_counter() + 0.1
+
+    def connect():
+        return http.client.HTTPConnection(
+            target.hostname, target.port or 80, timeout=60)
+
+    def worker():
+        connection = connect()
+        local = []
+        while True:
+            try:
+                request = pending.get_nowait()
+            except queue.Empty:
+                break
+            scheduled = start + request["t"]
+            if paced:
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            sent = time.perf_counter()
+            headers = {"Authorization": auth_for(request),
+                       "Accept": "application/json", **request["headers"]}
+            if request["content_type"]:
+                headers["Content-Type"] = request["content_type"]
+            queries = None
+            try:
+                connection.request(
+                    request["method"], request["path"],
+                    body=request["body"].encode() or None, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+                queries = response.getheader("X-DB-Queries")
+            except (OSError, http.client.HTTPException):
+                status = 0
+                connection.close()
+                connection = connect()
+            finished = time.perf_counter()
+            # En bucle abierto la latencia incluye la espera en cola
+            latency = finished - (max(scheduled, start) if paced else sent)
+            local.append((
+                route_of(request["method"], request["path"]), status,
+                latency, int(queries) if queries is not None else None))
+        connection.close()
+        with lock:
+            results.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start
+
+
+def summarize(results, seconds):
+    """ Throughput total y percentiles por ruta """
+    by_route = defaultdict(list)
+    for route, status, latency, queries in results:
+        by_route[route].append((status, latency, queries))
+
+    routes = {}
+    for route, rows in sorted(by_route.items()):
+        latencies = [latency for _, latency, _ in rows]
+        queries = [count for _, _, count in rows if count is not None]
+        routes[route] = {
+            "peticiones": len(rows),
+            "errores": sum(1 for status, _, _ in rows
+                           if not 200 <= status < 400),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "consultas_media": (round(sum(queries) / len(queries), 1)
+                                if queries else None),
+        }
+    latencies = [latency for _, _, latency, _ in results]
+    return {
+        "peticiones": len(results),
+        "errores": sum(route["errores"] for route in routes.values()),
+        "segundos": round(seconds, 2),
+        "throughput_rps": round(len(results) / seconds, 1) if seconds else 0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "rutas": routes,
+    }
+
+
+def print_report(report):
+    print(f"   {report['peticiones']} peticiones en {report['segundos']} s "
+          f"→ {report['throughput_rps']} req/s, {report['errores']} errores")
+    print(f"   p50 {report['p50_ms']} ms · p95 {report['p95_ms']} ms · "
+          f"p99 {report['p99_ms']} ms")
+    print(f"\n   {'ruta':<52} {'n':>6} {'err':>5} {'p50':>8} {'p95':>8} "
+          f"{'p99':>8} {'consultas':>9}")
+    for route, stats in report["rutas"].items():
+        queries = stats["consultas_media"]
+        print(f"   {route[:52]:<52} {stats['peticiones']:>6} "
+              f"{stats['errores']:>5} {stats['p50_ms']:>8} "
+              f"{stats['p95_ms']:>8} {stats['p99_ms']:>8} "
+              f"{'-' if queries is None else queries:>9}")
+
+
+# 📌 3️⃣ Servidor local
+def provision_accounts(user_ids):
+    """
+    Cuentas de la API: un entrenador (superusuario) y una cuenta por cada
+    `User`, enlazada con `User.cuenta` (con la misma id). Las contraseñas
+    usan un hash rápido: la API autentica con Basic auth en cada petición y
+    PBKDF2 (cientos de ms) taparía el coste real de las vistas.
+    """
+    from django.conf import settings
+    from django.contrib.auth.hashers import make_password
+    from django.contrib.auth.models import User as AuthUser
+
+    from benchmarks._servers import FAST_HASHERS
+    from daily_trainning_app.models import User
+
+    settings.PASSWORD_HASHERS = FAST_HASHERS
+
+    password = make_password(PASSWORD)
+    AuthUser.objects.bulk_create(
+        AuthUser(id=user_id, username=f"athlete{user_id}", password=password)
+        for user_id in user_ids)
+    User.objects.bulk_update(
+        [User(id=user_id, cuenta_id=user_id) for user_id in user_ids],
+        ["cuenta"])
+    AuthUser.objects.create(
+        id=max(user_ids) + 1, username=COACH, password=password,
+        is_staff=True, is_superuser=True)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("El servidor de pruebas no arrancó a tiempo.")
+
+
+def serve(interface, settings_module, users, exercises, workouts):
+    """ Prepara la base temporal y arranca el servidor en un subproceso """
+    from benchmarks._common import populate, setup_django
+
+    db_path = setup_django(settings_module)
+    user_objs, exercise_objs = populate(
+        users=users, exercises=exercises, workouts=workouts)
+    user_ids = [user.pk for user in user_objs]
+    provision_accounts(user_ids)
+
+    from django.db import connections
+    connections.close_all()
+
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks._servers", interface, str(port),
+         db_path],
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": settings_module})
+    wait_until_ready(port)
+    return (process, db_path, f"http://127.0.0.1:{port}", user_ids,
+            [exercise.pk for exercise in exercise_objs])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Pruebas de carga de la API (/api/v1/).")
+    where = parser.add_mutually_exclusive_group(required=True)
+    where.add_argument("--serve", choices=("wsgi", "asgi"),
+                       help="Arranca un servidor local con datos sintéticos.")
+    where.add_argument("--target", help="URL de un servidor ya arrancado.")
+    parser.add_argument("--settings", default="basis_trainning_app.settings")
+    parser.add_argument("--replay", help="Tráfico grabado (JSON Lines).")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Multiplicador de velocidad al reproducir.")
+    parser.add_argument("--rate", type=float, default=50,
+                        help="Eventos por segundo (0: sin ritmo).")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--exercises", type=int, default=20)
+    parser.add_argument("--workouts", type=int, default=20000)
+    parser.add_argument("--auth", help="usuario:contraseña para todas las "
+                                       "peticiones (obligatorio con --target).")
+    parser.add_argument("--json", help="Guarda el informe en este fichero.")
+    args = parser.parse_args(argv)
+
+    process = db_path = None
+    if args.serve:
+        print(f"🚀 Arrancando servidor {args.serve.upper()} de pruebas...")
+        process, db_path, base_url, user_ids, exercise_ids = serve(
+            args.serve, args.settings, args.users, args.exercises,
+            args.workouts)
+    else:
+        if not args.auth:
+            parser.error("--target requiere --auth usuario:contraseña")
+        base_url = args.target.rstrip("/")
+        user_ids = list(range(1, args.users + 1))
+        exercise_ids = list(range(1, args.exercises + 1))
+
+    if args.auth:
+        fixed = basic_auth(*args.auth.split(":", 1))
+        auth_for = lambda request: fixed  # noqa: E731
+    else:
+        coach = basic_auth(COACH, PASSWORD)
+        athletes = {user_id: basic_auth(f"athlete{user_id}", PASSWORD)
+                    for user_id in user_ids}
+        auth_for = lambda request: (  # noqa: E731
+            coach if request["staff"] else
+            athletes.get(request["user_id"], coach))
+
+    try:
+        if args.replay:
+            requests = load_recording(args.replay, args.speed)
+        else:
+            requests = synthesize(
+                args.rate or 50, args.duration, user_ids, exercise_ids)
+        print(f"📨 {len(requests)} peticiones · {args.clients} clientes · "
+              f"{'ritmo ' + str(args.rate) + '/s' if args.rate else 'sin ritmo'}")
+        results, seconds = run(
+            requests, base_url, args.clients, auth_for, paced=bool(args.rate))
+        report = summarize(results, seconds)
+        print_report(report)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as handle:
+                json.dump(report, handle, indent=2)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        if db_path is not None:
+            from benchmarks._common import cleanup
+            cleanup(db_path)
+    return 1 if report["errores"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,13 @@
 from django.contrib import admin
 from django.utils.timezone import now
 from datetime import timedelta
-from .models import Classification, Exercise, User, UserExerciseRM, WorkoutData
+from django.db.models import Q
+from .models import (
+    ArchivedWorkoutData, AthleteFitnessState, Classification, Exercise,
+    ExerciseContribution, ProgramEntry, RPETable, Task, TrainingProgram, User,
+    UserExerciseRM, WorkoutData
+)
+from .search import filter_by_search, search_ids
 
 
 admin.site.site_header = "Training APP Panel"
@@ -9,6 +15,33 @@ admin.site.site_title = "BASIS TRAINING SYSTEM"
 admin.site.index_title = "BASIS TRAINING SYSTEM"
 
 
+class IndexedSearchMixin:
+    """ Usa el índice de trigramas en lugar de `LIKE '%...%'` sobre `search_fields` """
+    search_index = None  # 'exercise' o 'user'
+    search_limit = 200
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return filter_by_search(
+            queryset, self.search_index, search_term,
+            limit=self.search_limit), False
+
+
+class RelatedIndexedSearchMixin:
+    """ Busca por el usuario o el ejercicio relacionado usando el índice """
+    search_limit = 200
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        user_ids = search_ids("user", search_term, limit=self.search_limit)
+        exercise_ids = search_ids(
+            "exercise", search_term, limit=self.search_limit)
+        return queryset.filter(
+            Q(user_id__in=user_ids) | Q(exercise_id__in=exercise_ids)), False
+
+
 class WorkoutDataInline(admin.TabularInline):
     model = WorkoutData
     extra = 3  # Muestra hasta 3 filas vacías en el admin
@@ -37,12 +70,20 @@ class WorkoutDataInline(admin.TabularInline):
 
     def get_queryset(self, request):
         """ Muestra solo los entrenamientos de los últimos 10 días """
-        qs = super().get_queryset(request)
+        qs = super().get_queryset(request).select_related('exercise')
         return qs.filter(
             fecha__gte=now() -
             timedelta(
                 days=10)).order_by('-fecha')
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        """ Las opciones de ejercicio se consultan una vez y no en cada fila """
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs)
+        if db_field.name == 'exercise':
+            formfield.choices = list(formfield.choices)
+        return formfield
+
     def get_nivel_fatiga(self, obj):
         """ Devuelve el nivel de fatiga desde el modelo Exercise """
         return obj.exercise.nivel_fatiga if obj.exercise else "No asignado"
@@ -56,36 +97,48 @@ class ClassificationAdmin(admin.ModelAdmin):
     ordering = ('nombre',)
 
 
+class ExerciseContributionInline(admin.TabularInline):
+    """ Grupos musculares que trabaja el ejercicio y con qué peso """
+    model = ExerciseContribution
+    extra = 1
+    autocomplete_fields = ('classification',)
+
+
 @admin.register(Exercise)
-class ExerciseAdmin(admin.ModelAdmin):
+class ExerciseAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    search_index = 'exercise'
     list_display = ('id', 'nombre', 'classification', 'video', 'nivel_fatiga')
     list_filter = ('classification', 'nivel_fatiga')
     search_fields = ('nombre', 'descripcion')
     ordering = ('nombre',)
+    inlines = [ExerciseContributionInline]
 
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    search_index = 'user'
     list_display = ('id', 'nombre', 'email', 'fecha_inicio')
     search_fields = ('nombre', 'email')
     ordering = ('fecha_inicio',)
+    raw_id_fields = ('cuenta',)
     # Permite ver los entrenamientos dentro de cada usuario
     inlines = [WorkoutDataInline]
 
 
 @admin.register(UserExerciseRM)
-class UserExerciseRMAdmin(admin.ModelAdmin):
+class UserExerciseRMAdmin(RelatedIndexedSearchMixin, admin.ModelAdmin):
     """
     Admin para gestionar el historial de 1RM por usuario y ejercicio.
     """
     list_display = ('user', 'exercise', 'peso_maximo_rm', 'fecha_registro')
+    list_select_related = ('user', 'exercise')
     list_filter = ('user', 'exercise', 'fecha_registro')
     search_fields = ('user__nombre', 'exercise__nombre')
     ordering = ('-fecha_registro',)  # Ordena del más reciente al más antiguo
 
 
 @admin.register(WorkoutData)
-class WorkoutDataAdmin(admin.ModelAdmin):
+class WorkoutDataAdmin(RelatedIndexedSearchMixin, admin.ModelAdmin):
     list_display = (
         'id',
         'user',
@@ -100,8 +153,12 @@ class WorkoutDataAdmin(admin.ModelAdmin):
         'volumen_relativo',
         'rpe_objetivo',
         'rm_sesion',
+        'planificado',
         'get_nivel_fatiga')
-    list_filter = ('fecha', 'user', 'exercise', 'exercise__nivel_fatiga')
+    list_filter = (
+        'fecha', 'planificado', 'programa', 'user', 'exercise',
+        'exercise__nivel_fatiga')
+    list_select_related = ('user', 'exercise')
     search_fields = ('user__nombre', 'exercise__nombre')
     ordering = ('-fecha',)
     readonly_fields = (
@@ -116,3 +173,103 @@ class WorkoutDataAdmin(admin.ModelAdmin):
         """ Devuelve el nivel de fatiga desde Exercise """
         return obj.exercise.nivel_fatiga if obj.exercise else "No asignado"
     get_nivel_fatiga.short_description = "Fatigue Level"
+
+
+class ProgramEntryInline(admin.TabularInline):
+    model = ProgramEntry
+    extra = 5
+    fields = ('semana', 'dia', 'orden', 'exercise', 'sets', 'reps',
+              'porcentaje_rm')
+    raw_id_fields = ('exercise',)
+
+
+@admin.register(TrainingProgram)
+class TrainingProgramAdmin(admin.ModelAdmin):
+    """ Plantillas de programa; se materializan con `manage.py materialize_program` """
+    list_display = ('id', 'nombre', 'creado_en')
+    search_fields = ('nombre',)
+    inlines = [ProgramEntryInline]
+
+
+@admin.register(RPETable)
+class RPETableAdmin(admin.ModelAdmin):
+    list_display = ('id', 'nombre', 'exercise', 'classification', 'updated_at')
+    list_select_related = ('exercise', 'classification')
+    raw_id_fields = ('exercise',)
+    search_fields = ('nombre',)
+
+
+@admin.register(ArchivedWorkoutData)
+class ArchivedWorkoutDataAdmin(admin.ModelAdmin):
+    """ Historial archivado: solo consulta """
+    list_display = (
+        'id',
+        'user',
+        'exercise',
+        'fecha',
+        'sets',
+        'reps',
+        'peso',
+        'carga',
+        'rpe_objetivo',
+        'rm_sesion',
+        'archivado_en')
+    list_filter = ('fecha',)
+    list_select_related = ('user', 'exercise')
+    raw_id_fields = ('user', 'exercise')
+    ordering = ('-fecha',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(AthleteFitnessState)
+class AthleteFitnessStateAdmin(admin.ModelAdmin):
+    """ Estados del modelo fitness–fatiga: se calculan solos (`fitness.py`) """
+    list_display = (
+        'user',
+        'fecha',
+        'impulso',
+        'fitness',
+        'fatiga',
+        'rendimiento',
+        'updated_at')
+    list_filter = ('fecha',)
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    ordering = ('-fecha',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'nombre',
+        'gym',
+        'estado',
+        'progreso',
+        'intentos',
+        'duracion_ms',
+        'creado_en',
+        'finalizado_en')
+    list_filter = ('estado', 'nombre', 'gym')
+    ordering = ('-creado_en',)
+    readonly_fields = (
+        'intentos',
+        'progreso',
+        'mensaje',
+        'resultado',
+        'error',
+        'worker',
+        'iniciado_en',
+        'finalizado_en',
+        'duracion_ms')
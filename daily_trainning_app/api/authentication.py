@@ -0,0 +1,35 @@
+"""
+Autenticación de la API limitada al gimnasio de la petición.
+
+`TenantMiddleware` rechaza a los usuarios de sesión que no pertenecen al
+gimnasio (o que no indican ninguno), pero las credenciales HTTP Basic se
+comprueban después, dentro de la vista de DRF; esta clase hace allí las
+mismas comprobaciones.
+"""
+from rest_framework import status
+from rest_framework.authentication import BasicAuthentication
+from rest_framework.exceptions import APIException, PermissionDenied
+
+from basis_trainning_app.db_routers import current_gym
+from daily_trainning_app.tenancy import (
+    gym_required_message, is_gym_member, may_skip_gym
+)
+
+
+class GymRequired(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_code = "gym_required"
+
+
+class GymBasicAuthentication(BasicAuthentication):
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is None:
+            return None
+        gym = current_gym()
+        if gym is None:
+            if not may_skip_gym(result[0]):
+                raise GymRequired(gym_required_message())
+        elif not is_gym_member(result[0], gym):
+            raise PermissionDenied("No perteneces a este gimnasio.")
+        return result
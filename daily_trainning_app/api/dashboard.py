@@ -0,0 +1,219 @@
+"""
+Panel de inicio del atleta en una sola petición.
+
+La pantalla de inicio pedía por separado el usuario, sus últimos 1RM, sus
+series recientes y la última sesión de cada ejercicio; cada llamada
+repetía los filtros de permisos y anidaba ejercicio y clasificación en
+cada fila. `build_dashboard()` carga las secciones pedidas en dos fases:
+
+1. Cada sección hace su consulta y anota con `want()` los ejercicios que
+   necesita en un `BatchLoader` compartido (patrón DataLoader).
+2. El cargador trae todos esos ejercicios, con su clasificación, en una
+   sola consulta y cada sección construye su respuesta.
+
+Como mucho cinco consultas (usuario, 1RM, recientes, últimas sesiones y
+ejercicios), sin importar cuántos ejercicios haya. Las series recientes y
+las últimas sesiones unen la tabla caliente y el archivo
+(`ArchivedWorkoutData`) en la misma consulta. Los ejercicios van una
+vez en `exercises` (como `layout=compact`) y `timings_ms` mide cada
+sección.
+"""
+import time
+
+from django.db.models import F, Window
+from django.db.models.functions import Rank, RowNumber
+
+from daily_trainning_app.archiving import history_rows
+from daily_trainning_app.instrumentation import span
+from daily_trainning_app.models import (
+    ArchivedWorkoutData, Exercise, User, UserExerciseRM, WorkoutData
+)
+
+SECTIONS = ("user", "rms", "recent", "latest_sessions")
+
+EXERCISE_COLUMNS = (
+    "id", "nombre", "video", "descripcion",
+    "classification_id", "classification__nombre",
+)
+
+SESSION_COLUMNS = (
+    "id", "exercise_id", "fecha", "sets", "reps", "peso", "carga",
+    "intensidad_relativa", "rpe_objetivo", "rm_sesion",
+)
+
+
+class BatchLoader:
+    """
+    Acumula claves con `want()` y las resuelve todas juntas con
+    `batch_fn(claves) -> {clave: valor}` en `resolve()`.
+    """
+
+    def __init__(self, batch_fn):
+        self.batch_fn = batch_fn
+        self._pending = set()
+        self._values = {}
+
+    def want(self, keys):
+        self._pending.update(key for key in keys if key not in self._values)
+
+    def resolve(self):
+        if self._pending:
+            self._values.update(self.batch_fn(self._pending))
+            self._pending = set()
+        return self._values
+
+
+def _load_exercises(ids):
+    """ Ejercicios con su clasificación anidada, en una consulta """
+    return {
+        pk: {
+            "id": pk,
+            "nombre": nombre,
+            "video": video,
+            "descripcion": descripcion,
+            "classification": {
+                "id": classification_id, "nombre": classification_nombre},
+        }
+        for pk, nombre, video, descripcion, classification_id,
+        classification_nombre in Exercise.objects.filter(
+            pk__in=ids).values_list(*EXERCISE_COLUMNS)
+    }
+
+
+def _session_row(row):
+    data = dict(zip(SESSION_COLUMNS, row))
+    data["fecha"] = data["fecha"].isoformat()
+    data["carga"] = float(data["carga"])
+    return data
+
+
+class DashboardContext:
+    def __init__(self, user_id, recent_limit):
+        self.user_id = user_id
+        self.recent_limit = recent_limit
+        self.exercises = BatchLoader(_load_exercises)
+
+
+# 📌 1️⃣ Secciones: cada una consulta y devuelve cómo construir su respuesta
+def _user(ctx):
+    row = User.objects.filter(pk=ctx.user_id).values_list(
+        "id", "nombre", "email", "fecha_inicio").first()
+    if row is None:
+        raise User.DoesNotExist(f"No existe el usuario {ctx.user_id}.")
+    pk, nombre, email, fecha_inicio = row
+    return lambda: {
+        "id": pk, "nombre": nombre, "email": email,
+        "fecha_inicio": fecha_inicio.isoformat()}
+
+
+def _rms(ctx):
+    """ Último 1RM de cada ejercicio (sin recorrer todo el historial) """
+    rows = list(
+        UserExerciseRM.objects.filter(user_id=ctx.user_id)
+        .annotate(posicion=Window(
+            RowNumber(), partition_by=[F("exercise_id")],
+            order_by=[F("fecha_registro").desc(), F("id").desc()]))
+        .filter(posicion=1)
+        .order_by("-fecha_registro", "-id")
+        .values_list("id", "exercise_id", "peso_maximo_rm", "fecha_registro"))
+    ctx.exercises.want(row[1] for row in rows)
+    return lambda: [
+        {"id": pk, "exercise_id": exercise_id, "peso_maximo_rm": peso,
+         "fecha_registro": fecha.isoformat()}
+        for pk, exercise_id, peso, fecha in rows
+    ]
+
+
+def _recent(ctx):
+    """ Últimas series registradas (sin las planificadas), con el archivo """
+    rows = list(history_rows(
+        WorkoutData.objects.filter(user_id=ctx.user_id, planificado=False),
+        ArchivedWorkoutData.objects.filter(
+            user_id=ctx.user_id, planificado=False),
+        SESSION_COLUMNS)[:ctx.recent_limit])
+    ctx.exercises.want(row[1] for row in rows)
+    return lambda: [_session_row(row) for row in rows]
+
+
+def _last_day(queryset):
+    """ Series del último día de cada ejercicio del queryset """
+    return queryset.annotate(posicion=Window(
+        Rank(), partition_by=[F("exercise_id")],
+        order_by=F("fecha").desc())).filter(posicion=1)
+
+
+def _latest_sessions(ctx):
+    """
+    Todas las series del último día entrenado de cada ejercicio. El archivo
+    solo guarda fechas anteriores, así que únicamente cuenta para los
+    ejercicios que ya no tienen series en la tabla caliente.
+    """
+    workouts = WorkoutData.objects.filter(
+        user_id=ctx.user_id, planificado=False)
+    archived = ArchivedWorkoutData.objects.filter(
+        user_id=ctx.user_id, planificado=False).exclude(
+        exercise_id__in=workouts.values("exercise_id"))
+    rows = list(
+        _last_day(workouts).values_list(*SESSION_COLUMNS)
+        .union(_last_day(archived).values_list(*SESSION_COLUMNS), all=True)
+        .order_by("exercise_id", "id"))
+    ctx.exercises.want(row[1] for row in rows)
+
+    def render():
+        sessions = {}
+        for row in rows:
+            serie = _session_row(row)
+            session = sessions.setdefault(serie["exercise_id"], {
+                "exercise_id": serie["exercise_id"],
+                "fecha": serie["fecha"],
+                "mejor_rm_sesion": 0.0,
+                "series": [],
+            })
+            session["mejor_rm_sesion"] = max(
+                session["mejor_rm_sesion"], serie["rm_sesion"] or 0.0)
+            session["series"].append(serie)
+        return sorted(sessions.values(), key=lambda item: item["fecha"],
+                      reverse=True)
+    return render
+
+
+LOADERS = {
+    "user": _user,
+    "rms": _rms,
+    "recent": _recent,
+    "latest_sessions": _latest_sessions,
+}
+
+
+# 📌 2️⃣ Panel completo
+def build_dashboard(user_id, sections=SECTIONS, recent_limit=10):
+    """
+    Panel del atleta con las `sections` pedidas. El usuario se consulta
+    siempre (un atleta inexistente es `User.DoesNotExist`).
+    """
+    ctx = DashboardContext(user_id, recent_limit)
+    timings = {}
+    renders = {}
+
+    def timed(name, func):
+        start = time.perf_counter()
+        with span(f"dashboard.{name}"):
+            result = func()
+        timings[name] = timings.get(name, 0.0) + \
+            (time.perf_counter() - start) * 1000
+        return result
+
+    start = time.perf_counter()
+    for name in ("user", *(name for name in sections if name != "user")):
+        renders[name] = timed(name, lambda: LOADERS[name](ctx))
+    exercises = timed("exercises", ctx.exercises.resolve)
+
+    data = {
+        name: timed(name, render) for name, render in renders.items()
+        if name in sections
+    }
+    data["exercises"] = {str(pk): exercise for pk, exercise in exercises.items()}
+    timings["total"] = (time.perf_counter() - start) * 1000
+    data["timings_ms"] = {
+        name: round(elapsed, 2) for name, elapsed in timings.items()}
+    return data
@@ -0,0 +1,174 @@
+"""
+Serialización rápida (solo lectura) de listas de entrenamientos.
+
+`WorkoutDataSerializer` recorre campo a campo cada fila y anida un
+`UserSerializer` y un `ExerciseSerializer` por registro. Para listas grandes
+construimos los diccionarios directamente desde las tuplas de
+`.values_list()` usando un mapa de columnas precalculado, con los mismos
+nombres de campo que la API ya expone.
+"""
+
+# 📌 1️⃣ Mapa de columnas: (nombre en la respuesta, columna en la consulta)
+WORKOUT_FIELDS = (
+    ("id", "id"),
+    ("fecha", "fecha"),
+    ("sets", "sets"),
+    ("reps", "reps"),
+    ("peso", "peso"),
+    ("carga", "carga"),
+    ("intensidad_relativa", "intensidad_relativa"),
+    ("volumen_relativo", "volumen_relativo"),
+    ("rpe_objetivo", "rpe_objetivo"),
+    ("rm_sesion", "rm_sesion"),
+    ("planificado", "planificado"),
+    ("programa", "programa_id"),
+)
+
+USER_FIELDS = (
+    ("id", "user_id"),
+    ("nombre", "user__nombre"),
+    ("email", "user__email"),
+    ("fecha_inicio", "user__fecha_inicio"),
+)
+
+EXERCISE_FIELDS = (
+    ("id", "exercise_id"),
+    ("nombre", "exercise__nombre"),
+    ("video", "exercise__video"),
+    ("descripcion", "exercise__descripcion"),
+)
+
+CLASSIFICATION_FIELDS = (
+    ("id", "exercise__classification_id"),
+    ("nombre", "exercise__classification__nombre"),
+)
+
+# Conversión por campo para reproducir exactamente la salida de DRF
+# (`DateField` → ISO 8601, `carga` se declara como `FloatField`).
+_CONVERTERS = {
+    "fecha": lambda value: value.isoformat() if value else None,
+    "fecha_inicio": lambda value: value.isoformat() if value else None,
+    "carga": float,
+}
+
+COMPACT_LAYOUT = "compact"
+
+
+def _columns(fields):
+    return [column for _, column in fields]
+
+
+def _build_plan(fields, offset):
+    """ Precalcula (nombre, posición en la tupla, conversor) para cada campo """
+    return [
+        (name, offset + index, _CONVERTERS.get(name))
+        for index, (name, _) in enumerate(fields)
+    ]
+
+
+_ALL_COLUMNS = (
+    _columns(WORKOUT_FIELDS) + _columns(USER_FIELDS) +
+    _columns(EXERCISE_FIELDS) + _columns(CLASSIFICATION_FIELDS)
+)
+# El `id` se escribe aparte para respetar el orden de campos del serializer
+_WORKOUT_PLAN = _build_plan(WORKOUT_FIELDS, 0)[1:]
+_USER_PLAN = _build_plan(USER_FIELDS, len(WORKOUT_FIELDS))
+_EXERCISE_PLAN = _build_plan(
+    EXERCISE_FIELDS, len(WORKOUT_FIELDS) + len(USER_FIELDS))
+_CLASSIFICATION_PLAN = _build_plan(
+    CLASSIFICATION_FIELDS,
+    len(WORKOUT_FIELDS) + len(USER_FIELDS) + len(EXERCISE_FIELDS))
+_USER_ID_INDEX = _USER_PLAN[0][1]
+_EXERCISE_ID_INDEX = _EXERCISE_PLAN[0][1]
+
+
+def _extract(row, plan, data=None):
+    if data is None:
+        data = {}
+    for name, index, convert in plan:
+        value = row[index]
+        data[name] = convert(value) if convert and value is not None else value
+    return data
+
+
+def _exercise(row):
+    exercise = _extract(row, _EXERCISE_PLAN)
+    exercise["classification"] = _extract(row, _CLASSIFICATION_PLAN)
+    return exercise
+
+
+# Columnas consultadas, en el orden en que llegan las tuplas
+WORKOUT_COLUMNS = tuple(_ALL_COLUMNS)
+
+
+def workout_rows(queryset):
+    """ Devuelve las tuplas crudas con todas las columnas necesarias """
+    return queryset.values_list(*WORKOUT_COLUMNS)
+
+
+def serialize_workouts(queryset):
+    """
+    Serializa entrenamientos con la misma forma que `WorkoutDataSerializer`
+    (usuario y ejercicio anidados en cada fila).
+    """
+    return serialize_workout_rows(workout_rows(queryset))
+
+
+def serialize_workout_rows(rows):
+    """ Igual que `serialize_workouts`, a partir de tuplas en `WORKOUT_COLUMNS` """
+    data = []
+    for row in rows:
+        workout = {
+            "id": row[0],
+            "user": _extract(row, _USER_PLAN),
+            "exercise": _exercise(row),
+        }
+        data.append(_extract(row, _WORKOUT_PLAN, workout))
+    return data
+
+
+def serialize_workouts_compact(queryset):
+    """
+    Serializa entrenamientos deduplicando usuarios y ejercicios en tablas
+    auxiliares: cada fila solo lleva `user_id` y `exercise_id`.
+    """
+    return serialize_workout_rows_compact(workout_rows(queryset))
+
+
+def serialize_workout_rows_compact(rows):
+    """ Igual que `serialize_workouts_compact`, a partir de tuplas """
+    workouts = []
+    users = {}
+    exercises = {}
+    for row in rows:
+        user_id = row[_USER_ID_INDEX]
+        exercise_id = row[_EXERCISE_ID_INDEX]
+        workout = {"id": row[0], "user_id": user_id, "exercise_id": exercise_id}
+        workouts.append(_extract(row, _WORKOUT_PLAN, workout))
+
+        if user_id not in users:
+            users[user_id] = _extract(row, _USER_PLAN)
+        if exercise_id not in exercises:
+            exercises[exercise_id] = _exercise(row)
+
+    return {
+        "workouts": workouts,
+        "users": {str(pk): user for pk, user in users.items()},
+        "exercises": {str(pk): exercise for pk, exercise in exercises.items()},
+    }
+
+
+def serialize_user_rms_compact(queryset):
+    """ Serializa registros de 1RM en forma plana (`user_id`, `exercise_id`) """
+    return [
+        {
+            "id": pk,
+            "user_id": user_id,
+            "exercise_id": exercise_id,
+            "peso_maximo_rm": peso_maximo_rm,
+            "fecha_registro": fecha_registro.isoformat(),
+        }
+        for pk, user_id, exercise_id, peso_maximo_rm, fecha_registro
+        in queryset.values_list(
+            "id", "user_id", "exercise_id", "peso_maximo_rm", "fecha_registro")
+    ]
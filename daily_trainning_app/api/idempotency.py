@@ -0,0 +1,122 @@
+"""
+Soporte de `Idempotency-Key` para las escrituras de dispositivos.
+
+La primera petición con una clave guarda su respuesta; los reintentos con
+la misma clave (dentro de `IDEMPOTENCY_KEY_TTL`) reciben esa respuesta sin
+volver a crear nada. Reutilizar la clave con otro cuerpo devuelve 422.
+"""
+import hashlib
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.http.request import RawPostDataException
+from django.db import IntegrityError, router, transaction
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.response import Response
+
+from daily_trainning_app.models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+
+
+def _replay(record):
+    return Response(record.respuesta, status=record.status_code,
+                    headers={"Idempotent-Replayed": "true"})
+
+
+def _mismatch():
+    return Response(
+        {"detail": "La Idempotency-Key ya se usó con otra petición."},
+        status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+
+def _concurrent(clave, huella):
+    """ Respuesta cuando otra petición ya registró la misma clave """
+    record = IdempotencyKey.objects.filter(clave=clave).first()
+    if record is None or record.status_code == 0:
+        return Response(
+            {"detail": "Hay otra petición en curso con esta Idempotency-Key."},
+            status=status.HTTP_409_CONFLICT)
+    return _replay(record) if record.huella == huella else _mismatch()
+
+
+def _fingerprint(request):
+    """
+    Huella del cuerpo. Si el stream ya se leyó (un multipart que otro
+    middleware parseó) se calcula sobre los datos y archivos parseados.
+    """
+    try:
+        return hashlib.sha256(request.body).hexdigest()
+    except RawPostDataException:
+        pass
+    digest = hashlib.sha256()
+    data = request.data
+    items = data.lists() if hasattr(data, "lists") else \
+        ((name, [value]) for name, value in data.items())
+    for name, values in sorted(items, key=lambda item: item[0]):
+        digest.update(f"{name}\0".encode())
+        for value in values:
+            if hasattr(value, "chunks"):
+                for chunk in value.chunks():
+                    digest.update(chunk)
+                value.seek(0)
+            else:
+                digest.update(str(value).encode())
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def idempotent(view_method):
+    """ Decora una acción de un ViewSet para deduplicar por `Idempotency-Key` """
+
+    @wraps(view_method)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view_method(view, request, *args, **kwargs)
+
+        # Las claves son de cada cuenta de la API (no del atleta enlazado:
+        # un administrador registra series de varios atletas)
+        clave = f"cuenta:{request.user.pk}:{key}"[:255]
+        huella = _fingerprint(request)
+        cutoff = now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+        existing = IdempotencyKey.objects.filter(clave=clave).first()
+        if existing is not None and existing.creado_en >= cutoff:
+            return _replay(existing) if existing.huella == huella \
+                else _mismatch()
+
+        # La clave y lo que crea la vista van a la misma base (la del gimnasio)
+        using = router.db_for_write(IdempotencyKey)
+        with transaction.atomic(using=using):
+            if existing is not None:
+                existing.delete()  # Caducada
+            try:
+                # Solo el alta de la clave: los IntegrityError de la vista
+                # no son una carrera y se propagan
+                with transaction.atomic(using=using):
+                    record = IdempotencyKey.objects.create(
+                        clave=clave, huella=huella)
+            except IntegrityError:
+                # Otra petición con la misma clave se adelantó
+                return _concurrent(clave, huella)
+            response = view_method(view, request, *args, **kwargs)
+            if response.status_code >= 400:
+                # Los errores no se guardan: el cliente puede corregir
+                transaction.set_rollback(True, using=using)
+                return response
+            record.status_code = response.status_code
+            record.respuesta = response.data
+            record.save(update_fields=["status_code", "respuesta"])
+            return response
+
+    return wrapper
+
+
+def purge_expired_keys():
+    """ Borra las claves caducadas. Devuelve cuántas se eliminaron """
+    cutoff = now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    deleted, _ = IdempotencyKey.objects.filter(creado_en__lt=cutoff).delete()
+    return deleted
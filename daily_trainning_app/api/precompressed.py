@@ -0,0 +1,77 @@
+"""
+Listas del catálogo (`Exercise`, `Classification`) servidas desde caché ya
+serializadas y comprimidas.
+
+El catálogo cambia muy poco y se pide en cada arranque de la app. La
+primera petición por (parámetros, formato, codificación) renderiza y
+comprime al nivel máximo; las siguientes devuelven esos bytes sin
+consultar la base, serializar ni comprimir. Las señales de
+`Exercise`/`Classification` cambian `catalogue_version()` y con ella todas
+las claves. Con varios procesos la caché debe ser compartida (Redis,
+Memcached) para que la invalidación llegue a todos.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from daily_trainning_app.compression import (
+    catalogue_version, compress, negotiate_encoding
+)
+
+
+def _cache_key(request, encoding):
+    raw = "|".join([
+        str(catalogue_version()), encoding or "identity",
+        request.accepted_media_type, request.get_full_path()])
+    return "precompressed:" + hashlib.sha256(raw.encode()).hexdigest()
+
+
+def precompressed(params=()):
+    """
+    Decora `list()` de un ViewSet del catálogo. Solo se cachean las
+    peticiones cuyos parámetros están en `params` (más `format`); el
+    resto (p. ej. búsquedas con `?q=`) y la API navegable van sin caché.
+    """
+    allowed = {"format", *params}
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(view, request, *args, **kwargs):
+            renderer = request.accepted_renderer
+            if renderer.format == "api" or \
+                    not allowed.issuperset(request.query_params):
+                return view_method(view, request, *args, **kwargs)
+
+            config = settings.RESPONSE_COMPRESSION
+            encoding = negotiate_encoding(
+                request.headers.get("Accept-Encoding", ""))
+            key = _cache_key(request, encoding)
+            cached = cache.get(key)
+            if cached is None:
+                response = view_method(view, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                body = renderer.render(
+                    response.data, request.accepted_media_type,
+                    view.get_renderer_context())
+                used = None
+                if encoding and len(body) >= config.get("min_size", 1024):
+                    body, used = compress(body, encoding, best=True), encoding
+                content_type = request.accepted_media_type
+                if renderer.charset:
+                    content_type += f"; charset={renderer.charset}"
+                cached = (body, content_type, used)
+                cache.set(key, cached, config.get("cache_timeout", 3600))
+
+            body, content_type, used = cached
+            response = HttpResponse(body, content_type=content_type)
+            if used:
+                response["Content-Encoding"] = used
+            patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+            return response
+        return wrapper
+    return decorator
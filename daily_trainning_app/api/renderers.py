@@ -0,0 +1,114 @@
+"""
+Renderers alternativos para la API.
+
+- `FastJSONRenderer`: mismo JSON que `JSONRenderer`, pero usando `orjson`
+  cuando está instalado. Lo que `orjson` no sabe serializar vuelve a
+  `JSONRenderer`; `NaN`/`Infinity` salen como `null` (JSON estricto, donde
+  `JSONRenderer` fallaría) salvo con `STRICT_JSON = False`, que usa
+  `JSONRenderer` para conservar los literales.
+- `ColumnarJSONRenderer`: listas de objetos como columnas + filas, útil
+  para sincronizar miles de entrenamientos con un payload mucho menor.
+- `MessagePackRenderer`: binario, solo disponible si `msgpack` está instalado.
+
+Todos se seleccionan con la cabecera `Accept` (o `?format=`) y devuelven
+exactamente los mismos datos que hoy.
+"""
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depende del entorno
+    msgpack = None
+
+
+_LINE_SEPARATORS = (
+    ("\u2028".encode(), b"\\u2028"),
+    ("\u2029".encode(), b"\\u2029"),
+)
+
+
+def _default(value):
+    """ Delegamos los tipos especiales (Decimal, fechas, lazy strings...) en DRF """
+    return encoders.JSONEncoder().default(value)
+
+
+# 📌 1️⃣ JSON con orjson
+class FastJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """ Renderiza con `orjson`; la salida indentada sigue usando `json` """
+        if orjson is None or data is None or not self.strict:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            # Claves no `str` (ids enteros) como hace `json`
+            ret = orjson.dumps(
+                data, default=_default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME |
+                orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # Enteros de más de 64 bits, subclases de `str` como clave...
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Igual que DRF: escapamos U+2028/U+2029 para que sea JavaScript válido
+        for raw, escaped in _LINE_SEPARATORS:
+            if raw in ret:
+                ret = ret.replace(raw, escaped)
+        return ret
+
+
+# 📌 2️⃣ JSON columnar
+def to_columns(data):
+    """
+    Convierte una lista de diccionarios en `{"columns": [...], "rows": [...]}`.
+    Si recibe un diccionario, convierte cada valor que sea una lista de
+    diccionarios (p. ej. `workouts` en `?layout=compact`).
+    """
+    if isinstance(data, list):
+        if not data or not all(isinstance(item, dict) for item in data):
+            return data
+        columns = list(data[0])
+        return {
+            "columns": columns,
+            "rows": [[item.get(column) for column in columns] for item in data],
+        }
+    if isinstance(data, dict):
+        return {
+            key: to_columns(value) if isinstance(value, list) else value
+            for key, value in data.items()
+        }
+    return data
+
+
+class ColumnarJSONRenderer(FastJSONRenderer):
+    media_type = "application/vnd.basis.columnar+json"
+    format = "columnar"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(
+            to_columns(data), accepted_media_type, renderer_context)
+
+
+# 📌 3️⃣ MessagePack
+class MessagePackRenderer(renderers.BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if msgpack is None:
+            raise RuntimeError(
+                "MessagePackRenderer requiere el paquete `msgpack`.")
+        return msgpack.packb(data, default=_default, use_bin_type=True)
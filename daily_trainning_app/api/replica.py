@@ -0,0 +1,27 @@
+"""
+Lecturas de la API desde la réplica (ver `basis_trainning_app/db_routers.py`).
+
+Las acciones de `replica_actions` leen de la réplica cuando el middleware
+lo permite. Se activa en `initial()`, después de autenticar y comprobar
+permisos y límites, así que la sesión y la cuenta se leen de `default`.
+"""
+from contextlib import ExitStack
+
+from basis_trainning_app.db_routers import replica_allowed, use_replica
+
+
+class ReplicaReadMixin:
+    replica_actions = ("list", "retrieve")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_actions and replica_allowed(request):
+            self._replica_reads = ExitStack()
+            self._replica_reads.enter_context(use_replica())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        replica_reads = getattr(self, "_replica_reads", None)
+        if replica_reads is not None:
+            self._replica_reads = None
+            replica_reads.close()
+        return super().finalize_response(request, response, *args, **kwargs)
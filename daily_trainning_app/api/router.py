@@ -2,7 +2,9 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     ClassificationViewSet, ExerciseViewSet, UserViewSet,
-    UserExerciseRMViewSet, WorkoutDataViewSet
+    UserExerciseRMViewSet, WorkoutDataViewSet, SyncViewSet, TaskViewSet,
+    PrescriptionViewSet, TrainingProgramViewSet, FitnessViewSet,
+    MuscleVolumeViewSet
 )
 
 # 📌 1️⃣ Crear el Router para los ViewSets
@@ -12,6 +14,14 @@ router_trauning_app.register(r'exercises', ExerciseViewSet)
 router_trauning_app.register(r'users', UserViewSet)
 router_trauning_app.register(r'user-exercise-rm', UserExerciseRMViewSet)
 router_trauning_app.register(r'workout-data', WorkoutDataViewSet)
+router_trauning_app.register(r'sync', SyncViewSet, basename='sync')
+router_trauning_app.register(r'tasks', TaskViewSet)
+router_trauning_app.register(r'programs', TrainingProgramViewSet)
+router_trauning_app.register(
+    r'prescriptions', PrescriptionViewSet, basename='prescriptions')
+router_trauning_app.register(r'fitness', FitnessViewSet, basename='fitness')
+router_trauning_app.register(
+    r'muscle-volume', MuscleVolumeViewSet, basename='muscle-volume')
 
 # 📌 2️⃣ Definir las Rutas de la API
 urlpatterns = [
@@ -1,5 +1,16 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import router, transaction
+from django.utils.timezone import localdate
 from rest_framework import serializers
-from daily_trainning_app.models import Classification, Exercise, User, UserExerciseRM, WorkoutData
+from daily_trainning_app.models import (
+    Classification, Exercise, ProgramEntry, Task, TrainingProgram, User,
+    UserExerciseRM, WorkoutData
+)
+from daily_trainning_app.instrumentation import span
+from .dashboard import SECTIONS as DASHBOARD_SECTIONS
+from daily_trainning_app.task_queue import enqueue, load_tasks, registry
 
 # 📌 1️⃣ Serializer para Clasificación
 
@@ -120,7 +131,10 @@ class WorkoutDataSerializer(serializers.ModelSerializer):
             "intensidad_relativa",
             "volumen_relativo",
             "rpe_objetivo",
-            "rm_sesion"]
+            "rm_sesion",
+            "planificado",
+            "programa"]
+        read_only_fields = ["planificado", "programa"]
 
     def validate_peso(self, value):
         """ Asegurar que el peso utilizado sea mayor a 0 """
@@ -128,10 +142,235 @@ class WorkoutDataSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("El peso no puede ser negativo.")
         return value
 
+    def is_valid(self, *, raise_exception=False):
+        with span("workout.validate"):
+            return super().is_valid(raise_exception=raise_exception)
+
     def create(self, validated_data):
         """ Crear y calcular automáticamente los valores de entrenamiento """
-        instance = WorkoutData(**validated_data)
-        # Calcular automáticamente carga, volumen, intensidad, etc.
-        instance.clean()
-        instance.save()
+        with span("workout.create"):
+            instance = WorkoutData(**validated_data)
+            # Calcular automáticamente carga, volumen, intensidad, etc.
+            instance.clean()
+            with span("workout.insert"):
+                instance.save()
+        return instance
+
+    def update(self, instance, validated_data):
+        """ `carga` la recalcula la base: la releemos para devolverla al día """
+        instance = super().update(instance, validated_data)
+        instance.refresh_from_db(fields=["total_reps", "carga"])
+        return instance
+
+
+# 📌 6️⃣ Serializer para Tareas en segundo plano
+class TaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Task
+        fields = [
+            "id",
+            "nombre",
+            "argumentos",
+            "gym",
+            "estado",
+            "intentos",
+            "max_intentos",
+            "progreso",
+            "mensaje",
+            "resultado",
+            "error",
+            "creado_en",
+            "iniciado_en",
+            "finalizado_en",
+            "duracion_ms"]
+        read_only_fields = [
+            field for field in fields if field not in ("nombre", "argumentos")]
+
+    def validate_nombre(self, value):
+        """ Solo se pueden encolar tareas registradas """
+        load_tasks()
+        if value not in registry:
+            raise serializers.ValidationError(
+                f"Tarea desconocida. Disponibles: {', '.join(sorted(registry))}.")
+        return value
+
+    def validate_argumentos(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("Debe ser un objeto JSON.")
+        return value
+
+    def create(self, validated_data):
+        """ Encolar la tarea con sus reintentos configurados """
+        return enqueue(
+            validated_data["nombre"], validated_data.get("argumentos", {}))
+
+
+# 📌 7️⃣ Serializers para la prescripción de cargas
+class PrescriptionItemSerializer(serializers.Serializer):
+    exercise_id = serializers.IntegerField()
+    sets = serializers.IntegerField(min_value=1, default=1)
+    reps = serializers.IntegerField(min_value=1, max_value=30)
+    rpe = serializers.FloatField(min_value=5, max_value=10)
+
+
+class PrescriptionSerializer(serializers.Serializer):
+    user_id = serializers.IntegerField()
+    incremento = serializers.FloatField(min_value=0.25, default=1)
+    items = PrescriptionItemSerializer(many=True, allow_empty=False)
+
+    def validate_user_id(self, value):
+        if not User.objects.filter(pk=value).exists():
+            raise serializers.ValidationError("El usuario no existe.")
+        return value
+
+    def validate_items(self, value):
+        """ Todos los ejercicios de la sesión deben existir (una consulta) """
+        if len(value) > 500:
+            raise serializers.ValidationError(
+                "Máximo 500 elementos por sesión.")
+        ids = {item["exercise_id"] for item in value}
+        missing = ids - set(
+            Exercise.objects.filter(pk__in=ids).values_list("pk", flat=True))
+        if missing:
+            raise serializers.ValidationError(
+                f"Ejercicios inexistentes: {sorted(missing)}.")
+        return value
+
+
+# 📌 8️⃣ Serializers para Programas de entrenamiento
+class ProgramEntrySerializer(serializers.ModelSerializer):
+    exercise_id = serializers.PrimaryKeyRelatedField(
+        queryset=Exercise.objects.all(), source="exercise")
+
+    class Meta:
+        model = ProgramEntry
+        fields = [
+            "id",
+            "semana",
+            "dia",
+            "orden",
+            "exercise_id",
+            "sets",
+            "reps",
+            "porcentaje_rm"]
+
+
+class TrainingProgramSerializer(serializers.ModelSerializer):
+    entradas = ProgramEntrySerializer(many=True)
+
+    class Meta:
+        model = TrainingProgram
+        fields = ["id", "nombre", "descripcion", "creado_en", "entradas"]
+        read_only_fields = ["creado_en"]
+
+    def create(self, validated_data):
+        """ Crear el programa y sus entradas en bloque """
+        entradas = validated_data.pop("entradas")
+        with transaction.atomic(using=self._db()):
+            program = TrainingProgram.objects.create(**validated_data)
+            self._save_entries(program, entradas)
+        return program
+
+    def update(self, instance, validated_data):
+        """ Si se envían `entradas`, reemplazan a las anteriores """
+        entradas = validated_data.pop("entradas", None)
+        with transaction.atomic(using=self._db()):
+            instance = super().update(instance, validated_data)
+            if entradas is not None:
+                instance.entradas.all().delete()
+                self._save_entries(instance, entradas)
         return instance
+
+    def _db(self):
+        """ Base del gimnasio de la petición (o `default`) """
+        return router.db_for_write(TrainingProgram)
+
+    def _save_entries(self, program, entradas):
+        ProgramEntry.objects.bulk_create(
+            [ProgramEntry(programa=program, **entrada) for entrada in entradas])
+
+
+class MaterializeProgramSerializer(serializers.Serializer):
+    user_ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False)
+    fecha_inicio = serializers.DateField()
+    reemplazar = serializers.BooleanField(default=False)
+
+    def validate_user_ids(self, value):
+        value = sorted(set(value))
+        missing = set(value) - set(
+            User.objects.filter(pk__in=value).values_list("pk", flat=True))
+        if missing:
+            raise serializers.ValidationError(
+                f"Usuarios inexistentes: {sorted(missing)}.")
+        return value
+
+
+# 📌 9️⃣ Serializers para el modelo fitness–fatiga (parámetros de consulta)
+class ReadinessQuerySerializer(serializers.Serializer):
+    users = serializers.CharField(required=False)
+    fecha = serializers.DateField(required=False)
+
+    def validate_users(self, value):
+        """ Lista separada por comas: `?users=1,2,3` """
+        try:
+            return sorted({int(pk) for pk in value.split(",") if pk.strip()})
+        except ValueError:
+            raise serializers.ValidationError(
+                "Debe ser una lista de ids separados por comas.")
+
+
+class FitnessCurveQuerySerializer(serializers.Serializer):
+    max_days = 366
+
+    desde = serializers.DateField(required=False)
+    hasta = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        """ Por defecto, los últimos 90 días hasta hoy """
+        hasta = attrs.get("hasta") or localdate()
+        desde = attrs.get("desde") or hasta - timedelta(days=89)
+        if desde > hasta:
+            raise serializers.ValidationError(
+                "`desde` no puede ser posterior a `hasta`.")
+        if (hasta - desde).days >= self.max_days:
+            raise serializers.ValidationError(
+                f"El rango máximo es de {self.max_days} días.")
+        return {"desde": desde, "hasta": hasta}
+
+
+# 📌 🔟 Serializer para el volumen semanal por grupo muscular
+class MuscleVolumeQuerySerializer(ReadinessQuerySerializer):
+    fecha = None
+    desde = serializers.DateField(required=False)
+    hasta = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        """ Por defecto, las últimas 12 semanas hasta hoy """
+        max_semanas = settings.MUSCLE_VOLUME.get("max_semanas", 53)
+        hasta = attrs.get("hasta") or localdate()
+        desde = attrs.get("desde") or hasta - timedelta(weeks=11)
+        if desde > hasta:
+            raise serializers.ValidationError(
+                "`desde` no puede ser posterior a `hasta`.")
+        if (hasta - desde).days >= max_semanas * 7:
+            raise serializers.ValidationError(
+                f"El rango máximo es de {max_semanas} semanas.")
+        return {**attrs, "desde": desde, "hasta": hasta}
+
+
+# 📌 1️⃣1️⃣ Serializer para el panel del atleta (parámetros de consulta)
+class DashboardQuerySerializer(serializers.Serializer):
+    sections = serializers.CharField(required=False)
+    recent_limit = serializers.IntegerField(
+        min_value=1, max_value=100, default=10)
+
+    def validate_sections(self, value):
+        """ Lista separada por comas: `?sections=user,rms` """
+        sections = {name.strip() for name in value.split(",") if name.strip()}
+        unknown = sections - set(DASHBOARD_SECTIONS)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Secciones desconocidas: {', '.join(sorted(unknown))}. "
+                f"Disponibles: {', '.join(DASHBOARD_SECTIONS)}.")
+        return tuple(name for name in DASHBOARD_SECTIONS if name in sections)
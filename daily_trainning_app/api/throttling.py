@@ -0,0 +1,74 @@
+"""
+Limitación de ritmo por cliente con token bucket.
+
+Cada cliente tiene un cubo de `burst` fichas que se rellena a `rate`
+fichas por segundo; cada escritura consume una. Permite ráfagas cortas
+de un dispositivo sin dejar que un cliente sature al escritor.
+
+Leer y actualizar el cubo se hace con un cerrojo en la caché
+(`cache.add`, atómico en Redis, Memcached y `LocMemCache`), así que las
+peticiones simultáneas de un dispositivo no leen todas el mismo saldo.
+Con `LocMemCache` el cubo (y el cerrojo) es de cada proceso.
+"""
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = "ingest"
+    # Espera máxima por el cerrojo (en intentos de 1 ms) antes de denegar
+    lock_attempts = 100
+
+    def __init__(self):
+        config = settings.INGESTION_THROTTLE
+        self.rate = float(config["rate"])
+        self.burst = float(config["burst"])
+        self.tokens = self.burst
+
+    def get_cache_key(self, request):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return f"throttle:{self.scope}:{ident}"
+
+    @contextmanager
+    def _locked(self, key):
+        """ Cerrojo por cliente; `False` si no se consigue a tiempo """
+        lock_key = f"{key}:lock"
+        for _ in range(self.lock_attempts):
+            # Caduca solo por si el proceso muere con el cerrojo tomado
+            if cache.add(lock_key, 1, timeout=1):
+                try:
+                    yield True
+                finally:
+                    cache.delete(lock_key)
+                return
+            time.sleep(0.001)
+        yield False
+
+    def allow_request(self, request, view):
+        key = self.get_cache_key(request)
+        with self._locked(key) as locked:
+            if not locked:
+                self.tokens = 0.0
+                return False
+            current = time.time()
+            tokens, updated = cache.get(key, (self.burst, current))
+
+            tokens = min(self.burst, tokens + (current - updated) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.tokens = tokens
+            # Cuando la entrada caduca el cubo ya estaría lleno otra vez
+            cache.set(key, (tokens, current),
+                      timeout=int(self.burst / self.rate) + 1)
+        return allowed
+
+    def wait(self):
+        return max(0.0, (1 - self.tokens) / self.rate)
@@ -1,23 +1,70 @@
-from rest_framework import viewsets, permissions
+from django.http import Http404
+from rest_framework import mixins, viewsets, permissions, serializers, status
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from daily_trainning_app.models import Classification, Exercise, User, UserExerciseRM, WorkoutData
+from basis_trainning_app.db_routers import current_gym
+from daily_trainning_app.archiving import history_rows
+from daily_trainning_app.fitness import curve, readiness
+from daily_trainning_app.muscle_volume import roster_volume
+from daily_trainning_app.ingestion import buffering_enabled, get_buffer
+from daily_trainning_app.prescriptions import prescribe
+from daily_trainning_app.models import (
+    ArchivedWorkoutData, Classification, Exercise, Task, TrainingProgram, User,
+    UserExerciseRM, WorkoutData
+)
 from .serializers import (
     ClassificationSerializer, ExerciseSerializer, UserSerializer,
-    UserExerciseRMSerializer, WorkoutDataSerializer
+    UserExerciseRMSerializer, WorkoutDataSerializer, TaskSerializer,
+    PrescriptionSerializer, TrainingProgramSerializer,
+    MaterializeProgramSerializer, ReadinessQuerySerializer,
+    FitnessCurveQuerySerializer, MuscleVolumeQuerySerializer,
+    DashboardQuerySerializer
+)
+from daily_trainning_app.task_queue import enqueue
+from daily_trainning_app.search import filter_by_search
+from daily_trainning_app.sync import changes_since
+from .dashboard import SECTIONS as DASHBOARD_SECTIONS, build_dashboard
+from .idempotency import idempotent
+from .precompressed import precompressed
+from .replica import ReplicaReadMixin
+from .throttling import TokenBucketThrottle
+from .fast_serializers import (
+    COMPACT_LAYOUT, WORKOUT_COLUMNS, serialize_user_rms_compact,
+    serialize_workout_rows, serialize_workout_rows_compact, serialize_workouts,
+    serialize_workouts_compact, workout_rows
 )
 
+
+def include_planned(request):
+    """ `?include_planned=1`: incluir las series planificadas (programas) """
+    return request.query_params.get("include_planned") in ("1", "true")
+
+
+def own_athlete_id(request):
+    """ Atleta enlazado a la cuenta de la petición (`User.cuenta`) """
+    athlete_id = User.id_for_account(request.user)
+    if athlete_id is None:
+        raise PermissionDenied("Tu cuenta no está enlazada a ningún atleta.")
+    return athlete_id
+
+
 # 📌 1️⃣ Vista para Clasificación (List, Create, Retrieve, Update, Delete)
-class ClassificationViewSet(viewsets.ModelViewSet):
+class ClassificationViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Classification.objects.all()
     serializer_class = ClassificationSerializer
     # Cualquiera puede ver, pero solo autenticados pueden modificar
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+    @precompressed()
+    def list(self, request, *args, **kwargs):
+        """ Listado servido desde caché, ya renderizado y comprimido """
+        return super().list(request, *args, **kwargs)
+
 
 # 📌 2️⃣ Vista para Ejercicios (Filtrado por Clasificación)
-class ExerciseViewSet(viewsets.ModelViewSet):
+class ExerciseViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Exercise.objects.select_related("classification").all()
     serializer_class = ExerciseSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
@@ -28,20 +75,66 @@ class ExerciseViewSet(viewsets.ModelViewSet):
         classification_id = self.request.query_params.get("classification_id")
         if classification_id:
             queryset = queryset.filter(classification_id=classification_id)
+        query = self.request.query_params.get("q")
+        if query and self.action == "list":
+            # Búsqueda sin acentos y tolerante a errores (índice de trigramas)
+            queryset = filter_by_search(queryset, "exercise", query)
         return queryset
 
+    @precompressed(params=("classification_id",))
+    def list(self, request, *args, **kwargs):
+        """ Listado servido desde caché (las búsquedas con `q` no se cachean) """
+        return super().list(request, *args, **kwargs)
+
 
 # 📌 3️⃣ Vista para Usuarios (Sin Exponer Datos Sensibles)
-class UserViewSet(viewsets.ReadOnlyModelViewSet):  # Solo lectura
+class UserViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):  # Solo lectura
     queryset = User.objects.all()
     serializer_class = UserSerializer
     # Solo usuarios autenticados pueden ver usuarios
     permission_classes = [permissions.IsAuthenticated]
+    replica_actions = ("list", "retrieve", "dashboard")
+
+    def get_queryset(self):
+        """ Buscar usuarios por nombre o email con `?q=` """
+        queryset = super().get_queryset()
+        query = self.request.query_params.get("q")
+        if query and self.action == "list":
+            queryset = filter_by_search(queryset, "user", query)
+        return queryset
+
+    @action(detail=True, methods=["get"])
+    def dashboard(self, request, pk=None):
+        """
+        Pantalla de inicio del atleta en una petición: `?sections=` (por
+        defecto todas: usuario, últimos 1RM, series recientes y última
+        sesión de cada ejercicio), con los ejercicios compartidos y el
+        tiempo de cada sección. Cinco consultas como mucho.
+        """
+        try:
+            user_id = int(pk)
+        except ValueError:
+            raise serializers.ValidationError(
+                {"id": "Debe ser un número entero."})
+        if not request.user.is_superuser and \
+                user_id != own_athlete_id(request):
+            raise PermissionDenied(
+                "No puedes consultar el panel de otro usuario.")
+        serializer = DashboardQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            return Response(build_dashboard(
+                user_id, data.get("sections") or DASHBOARD_SECTIONS,
+                recent_limit=data["recent_limit"]))
+        except User.DoesNotExist:
+            raise NotFound("No existe el usuario.")
 
 
 # 📌 4️⃣ Vista para 1RM por Usuario y Ejercicio
-class UserExerciseRMViewSet(viewsets.ModelViewSet):
-    queryset = UserExerciseRM.objects.select_related("user", "exercise").all()
+class UserExerciseRMViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
+    queryset = UserExerciseRM.objects.select_related(
+        "user", "exercise__classification").all()
     serializer_class = UserExerciseRMSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -50,40 +143,351 @@ class UserExerciseRMViewSet(viewsets.ModelViewSet):
         if self.request.user.is_superuser:
             return super().get_queryset()  # Admins ven todos los datos
         return super().get_queryset().filter(
-            user=self.request.user)  # Usuarios ven solo sus datos
+            user__cuenta=self.request.user)  # Usuarios ven solo sus datos
 
     def perform_create(self, serializer):
-        """ Asignar automáticamente el usuario autenticado al crear un registro """
-        serializer.save(user=self.request.user)
+        """ Asignar automáticamente el atleta de la cuenta al crear un registro """
+        if self.request.user.is_superuser:
+            serializer.save()
+            return
+        serializer.save(user_id=own_athlete_id(self.request))
 
 
 # 📌 5️⃣ Vista para Entrenamientos (WorkoutData)
-class WorkoutDataViewSet(viewsets.ModelViewSet):
-    queryset = WorkoutData.objects.select_related("user", "exercise").all()
+class WorkoutDataViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
+    queryset = WorkoutData.objects.select_related(
+        "user", "exercise__classification").all()
     serializer_class = WorkoutDataSerializer
     permission_classes = [permissions.IsAuthenticated]
+    replica_actions = ("list", "retrieve", "latest")
 
     def get_queryset(self):
         """ Filtrar entrenamientos por usuario autenticado """
-        if self.request.user.is_superuser:
-            return super().get_queryset()
-        return super().get_queryset().filter(user=self.request.user)
+        return self._scoped(super().get_queryset())
+
+    def _scoped(self, queryset):
+        """
+        Cada cuenta ve solo las series de su atleta. El listado deja fuera
+        las planificadas salvo con `?include_planned=1`.
+        """
+        if not self.request.user.is_superuser:
+            queryset = queryset.filter(user__cuenta=self.request.user)
+        if self.action == "list" and not include_planned(self.request):
+            queryset = queryset.filter(planificado=False)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        """
+        Listado rápido de entrenamientos construido desde `.values_list()`.
+        Con `?layout=compact` usuarios y ejercicios se devuelven deduplicados,
+        con `?include_archived=1` se incluye el historial archivado y con
+        `?include_planned=1` las series planificadas (programas).
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+
+        if request.query_params.get("include_archived") in ("1", "true"):
+            rows = history_rows(
+                queryset, self.get_archive_queryset(), WORKOUT_COLUMNS)
+        else:
+            rows = workout_rows(queryset)
+
+        if request.query_params.get("layout") == COMPACT_LAYOUT:
+            return Response(serialize_workout_rows_compact(rows))
+        return Response(serialize_workout_rows(rows))
+
+    def get_archive_queryset(self):
+        """ Entrenamientos archivados con los mismos filtros """
+        return self._scoped(ArchivedWorkoutData.objects.all())
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Detalle de un entrenamiento; si ya no está en la tabla caliente se
+        busca en el archivo (solo lectura: editar o borrar sigue dando 404).
+        """
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+            try:
+                archived = serialize_workouts(
+                    self.get_archive_queryset().filter(pk=pk))
+            except (TypeError, ValueError):
+                archived = None
+            if not archived:
+                raise
+            return Response(archived[0])
+
+    def get_throttles(self):
+        """ Las altas (dispositivos) se limitan por cliente con token bucket """
+        throttles = super().get_throttles()
+        if self.action == "create":
+            throttles.append(TokenBucketThrottle())
+        return throttles
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        """
+        Registra una serie. Con `WORKOUT_INGEST_BUFFER` activo la serie se
+        encola y se guarda en el siguiente micro-lote (202 Accepted): el
+        202 confirma la recepción, no el guardado (ver `ingestion.py`).
+        """
+        if not buffering_enabled():
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        self._check_owner(data["user"])
+        row = {
+            "user_id": data["user"].pk,
+            "exercise_id": data["exercise"].pk,
+            "fecha": data["fecha"],
+            "sets": data.get("sets", 0),
+            "reps": data.get("reps", 0),
+            "peso": data.get("peso", 0),
+        }
+        get_buffer().submit(row)
+        return Response(
+            {**row, "fecha": row["fecha"].isoformat(), "status": "queued"},
+            status=status.HTTP_202_ACCEPTED)
 
     def perform_create(self, serializer):
-        """ Asignar usuario autenticado y calcular valores antes de guardar """
-        instance = serializer.save(user=self.request.user)
-        # Asegurar cálculos automáticos de carga, RPE, volumen, etc.
-        instance.clean()
-        instance.save()
+        """ Guardar el entrenamiento; `create()` del serializer calcula los valores """
+        self._check_owner(serializer.validated_data["user"])
+        serializer.save()
+
+    def _check_owner(self, user):
+        """ Solo los administradores registran entrenamientos de otros usuarios """
+        if not self.request.user.is_superuser and \
+                user.pk != own_athlete_id(self.request):
+            raise PermissionDenied(
+                "No puedes registrar entrenamientos de otro usuario.")
 
     @action(detail=True, methods=["get"])
     def latest(self, request, pk=None):
-        """ Obtener el entrenamiento más reciente de un usuario """
+        """
+        Obtener el último entrenamiento realizado (no planificado) de un
+        usuario. Si no le queda ninguno en la tabla caliente se busca en el
+        archivo, que solo guarda fechas anteriores.
+        """
         user = get_object_or_404(User, pk=pk)
-        latest_workout = WorkoutData.objects.filter(
-            user=user).order_by("-fecha").first()
+        # `get_queryset` deja a cada cuenta ver solo las series de su atleta
+        latest_workout = self.get_queryset().filter(
+            user=user, planificado=False).order_by("-fecha", "-id").first()
         if latest_workout:
             serializer = self.get_serializer(latest_workout)
             return Response(serializer.data)
+        archived = serialize_workouts(
+            self.get_archive_queryset().filter(user=user, planificado=False)
+            .order_by("-fecha", "-id")[:1])
+        if archived:
+            return Response(archived[0])
         return Response(
             {"message": "No hay entrenamientos para este usuario."}, status=404)
+
+
+# 📌 6️⃣ Sincronización incremental para clientes offline
+class SyncViewSet(viewsets.ViewSet):
+    """
+    Devuelve solo lo creado, editado o borrado desde `?since=<token>`.
+    El cliente guarda `next` (opaco) y lo envía en la siguiente
+    sincronización; mientras `has_more` sea verdadero debe seguir pidiendo
+    páginas. Los cambios aparecen tras `SYNC_SETTLE_SECONDS` (ver `sync.py`).
+    Las series planificadas no se envían salvo con `?include_planned=1`; una
+    serie que pasa a planificada llega como borrada.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 1000
+    max_limit = 5000
+
+    def _int_param(self, name, default):
+        value = self.request.query_params.get(name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise serializers.ValidationError(
+                {name: "Debe ser un número entero."})
+        if value < 0:
+            raise serializers.ValidationError(
+                {name: "No puede ser negativo."})
+        return value
+
+    def list(self, request):
+        token = request.query_params.get("since", "0")
+        limit = min(self._int_param("limit", self.default_limit),
+                    self.max_limit) or self.default_limit
+
+        if request.user.is_superuser:
+            usuario_id = request.query_params.get("user_id")
+            usuario_id = self._int_param("user_id", 0) if usuario_id else None
+        else:
+            usuario_id = own_athlete_id(request)
+
+        try:
+            changes, next_token, has_more = changes_since(
+                token, limit, usuario_id=usuario_id)
+        except ValueError:
+            raise serializers.ValidationError(
+                {"since": "Token de sincronización no válido."})
+
+        workouts = changes["workoutdata"]
+        rms = changes["userexerciserm"]
+        updated = WorkoutData.objects.filter(pk__in=workouts["upsert"])
+        deleted = workouts["delete"]
+        if not include_planned(request):
+            deleted = sorted(deleted + list(
+                updated.filter(planificado=True).values_list("pk", flat=True)))
+            updated = updated.filter(planificado=False)
+        return Response({
+            "next": next_token,
+            "has_more": has_more,
+            "workout_data": {
+                "updated": serialize_workouts_compact(
+                    updated.order_by("pk"))["workouts"],
+                "deleted": deleted,
+            },
+            "user_exercise_rm": {
+                "updated": serialize_user_rms_compact(
+                    UserExerciseRM.objects.filter(pk__in=rms["upsert"])
+                    .order_by("pk")),
+                "deleted": rms["delete"],
+            },
+        })
+
+
+# 📌 7️⃣ Vista para Tareas en segundo plano (encolar y consultar estado/progreso)
+class TaskViewSet(mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Task.objects.all()
+    serializer_class = TaskSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_queryset(self):
+        """ Filtrar por `estado` o `nombre` si se pasan como parámetros """
+        # Cada gimnasio solo ve sus tareas
+        queryset = super().get_queryset().filter(gym=current_gym() or "")
+        for field in ("estado", "nombre"):
+            value = self.request.query_params.get(field)
+            if value:
+                queryset = queryset.filter(**{field: value})
+        return queryset
+
+
+# 📌 8️⃣ Prescripción de cargas para una sesión planificada
+class PrescriptionViewSet(viewsets.ViewSet):
+    """
+    Recibe la sesión completa (`items`: ejercicio, series, reps y RPE
+    objetivo) y devuelve el peso sugerido para cada elemento a partir del
+    1RM actual del usuario, en una sola petición.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def create(self, request):
+        serializer = PrescriptionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        if not request.user.is_superuser and \
+                data["user_id"] != own_athlete_id(request):
+            raise PermissionDenied(
+                "No puedes prescribir cargas para otro usuario.")
+
+        items = prescribe(
+            data["user_id"], data["items"], incremento=data["incremento"])
+        return Response({
+            "user_id": data["user_id"],
+            "items": items,
+            "sin_rm": sorted({
+                item["exercise_id"] for item in items if not item["rm"]}),
+        })
+
+
+# 📌 9️⃣ Vista para Programas de entrenamiento (plantillas y materialización)
+class TrainingProgramViewSet(viewsets.ModelViewSet):
+    queryset = TrainingProgram.objects.prefetch_related("entradas").all()
+    serializer_class = TrainingProgramSerializer
+
+    def get_permissions(self):
+        """ Cualquier autenticado puede verlos; solo administradores los editan """
+        if self.action in ("list", "retrieve"):
+            return [permissions.IsAuthenticated()]
+        return [permissions.IsAdminUser()]
+
+    @action(detail=True, methods=["post"])
+    def materialize(self, request, pk=None):
+        """
+        Encola la creación de las series planificadas para `user_ids`
+        desde `fecha_inicio`. Devuelve la tarea para consultar su progreso.
+        """
+        program = self.get_object()
+        serializer = MaterializeProgramSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        task = enqueue("materialize_program", {
+            "program_id": program.pk,
+            "user_ids": data["user_ids"],
+            "fecha_inicio": data["fecha_inicio"].isoformat(),
+            "reemplazar": data["reemplazar"],
+        })
+        return Response(
+            TaskSerializer(task).data, status=status.HTTP_202_ACCEPTED)
+
+
+# 📌 🔟 Modelo fitness–fatiga: disponibilidad de la plantilla y curvas
+class FitnessViewSet(ReplicaReadMixin, viewsets.ViewSet):
+    """
+    `list`: fitness, fatiga y rendimiento de cada atleta en `?fecha=` (hoy
+    por defecto), desde los estados guardados y en una consulta. Los
+    administradores pueden filtrar con `?users=1,2,3`.
+    `retrieve`: curva diaria de un atleta entre `?desde=` y `?hasta=`.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request):
+        serializer = ReadinessQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        user_ids = data.get("users")
+        if not request.user.is_superuser:
+            user_ids = [own_athlete_id(request)]
+        return Response(readiness(user_ids, data.get("fecha")))
+
+    def retrieve(self, request, pk=None):
+        try:
+            user_id = int(pk)
+        except ValueError:
+            raise serializers.ValidationError(
+                {"id": "Debe ser un número entero."})
+        if not request.user.is_superuser and \
+                user_id != own_athlete_id(request):
+            raise PermissionDenied(
+                "No puedes consultar el estado de otro usuario.")
+        serializer = FitnessCurveQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        return Response({
+            "user_id": user_id,
+            "dias": curve(user_id, data["desde"], data["hasta"]),
+        })
+
+
+# 📌 1️⃣1️⃣ Volumen semanal por grupo muscular
+class MuscleVolumeViewSet(ReplicaReadMixin, viewsets.ViewSet):
+    """
+    Series semanales efectivas por grupo muscular de cada atleta entre
+    `?desde=` y `?hasta=` (las últimas 12 semanas por defecto), repartidas
+    según `ExerciseContribution`. Los administradores piden la plantilla
+    entera o `?users=1,2,3`; el resto, solo sus datos.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request):
+        serializer = MuscleVolumeQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        user_ids = data.get("users")
+        if not request.user.is_superuser:
+            user_ids = [own_athlete_id(request)]
+        elif user_ids is None:
+            user_ids = User.objects.values_list("pk", flat=True)
+        return Response(roster_volume(user_ids, data["desde"], data["hasta"]))
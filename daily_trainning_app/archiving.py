@@ -0,0 +1,78 @@
+"""
+Archivo de entrenamientos antiguos.
+
+Los entrenamientos con `fecha` anterior al horizonte configurado
+(`WORKOUT_ARCHIVE_HORIZON_DAYS`) se mueven por lotes a
+`ArchivedWorkoutData`, conservando su `id`. `history_rows()` une ambas
+tablas para que el historial siga viendo todos los registros.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import router, transaction
+from django.utils.timezone import localdate
+
+from .models import ArchivedWorkoutData, WorkoutData
+from .sync import change_log_suppressed
+
+# Columnas que se copian tal cual al archivo
+ARCHIVED_FIELDS = [
+    field.attname for field in ArchivedWorkoutData._meta.concrete_fields
+    if field.name != 'archivado_en'
+]
+UPSERT_FIELDS = [name for name in ARCHIVED_FIELDS if name != 'id'] + [
+    'archivado_en']
+
+
+def archive_cutoff(days=None):
+    """ Fecha a partir de la cual los entrenamientos se quedan en la tabla caliente """
+    if days is None:
+        days = settings.WORKOUT_ARCHIVE_HORIZON_DAYS
+    return localdate() - timedelta(days=days)
+
+
+def archive_workouts(before=None, batch_size=5000, using=None,
+                     progress=None):
+    """
+    Mueve a `ArchivedWorkoutData` los entrenamientos con `fecha < before`.
+    Cada lote se copia y se borra en la misma transacción. Devuelve el
+    número de filas movidas.
+    """
+    if before is None:
+        before = archive_cutoff()
+    using = using or router.db_for_write(WorkoutData)
+
+    pending = WorkoutData.objects.using(using).filter(fecha__lt=before)
+    total = pending.count()
+    moved = 0
+    while True:
+        # No son bajas para los clientes: el historial las sigue sirviendo
+        with transaction.atomic(using=using), change_log_suppressed():
+            rows = list(pending.order_by('pk').values(*ARCHIVED_FIELDS)
+                        [:batch_size])
+            if not rows:
+                break
+            # Si el `id` ya estaba archivado (p. ej. tras restaurar una
+            # copia) gana la fila caliente, que es la que se va a borrar
+            ArchivedWorkoutData.objects.using(using).bulk_create(
+                [ArchivedWorkoutData(**row) for row in rows],
+                update_conflicts=True, unique_fields=['id'],
+                update_fields=UPSERT_FIELDS)
+            WorkoutData.objects.using(using).filter(
+                pk__in=[row['id'] for row in rows]).delete()
+        moved += len(rows)
+        if progress is not None:
+            progress(moved, total)
+    return moved
+
+
+def history_rows(workouts, archived, columns, order_by=('-fecha', '-id')):
+    """
+    Une las filas (`values_list`) de la tabla caliente y del archivo.
+    Ambos querysets deben llevar los mismos filtros.
+    """
+    return (
+        workouts.order_by().values_list(*columns)
+        .union(archived.order_by().values_list(*columns), all=True)
+        .order_by(*order_by)
+    )
@@ -0,0 +1,439 @@
+"""
+Copias de seguridad en caliente de la base SQLite y deltas incrementales.
+
+Copia completa (`online_backup`): usa la API de backup de SQLite desde una
+conexión de solo lectura aparte, copiando `pages_per_step` páginas por
+paso y durmiendo `sleep_ms` entre pasos. Cada paso solo retiene la lectura
+un instante, así que la ingesta de `WorkoutData` sigue escribiendo (con
+WAL los lectores no bloquean al escritor; sin WAL, el escritor espera
+como mucho un paso). Si otra conexión escribe durante la copia, SQLite la
+reinicia; tras `max_restarts` reinicios se copia el resto en un único
+paso, que en WAL es una sola instantánea de lectura sin bloquear a nadie.
+
+Deltas (`export_delta`): filas cambiadas en una ventana de tiempo, en
+JSON por líneas comprimido con gzip y por columnas (una lista de nombres
+por bloque y una lista de valores por fila):
+
+- altas y ediciones de `WorkoutData` y `UserExerciseRM` (`updated_at`),
+- entrenamientos archivados (`archivado_en`), que salen de `WorkoutData`,
+- bajas registradas en `ChangeLog`,
+- los atletas, ejercicios, clasificaciones y programas que referencian.
+
+Los deltas solo siguen series y RMs. El resto del catálogo (atletas,
+ejercicios, clasificaciones, programas y sus `ProgramEntry`, tablas RPE,
+contribuciones musculares) no tiene `updated_at` ni bajas en `ChangeLog`:
+sus ediciones solo viajan si alguna serie o RM cambiada los referencia, y
+sus altas sin series y sus bajas no viajan nunca. Por eso un delta no
+sustituye a la copia completa: hay que hacer una con regularidad (al
+menos cada `full_max_age_hours`, y después de editar el catálogo) y
+`backup_db --incremental` avisa si la última es más antigua.
+
+Cada delta empieza `delta_overlap_seconds` antes de donde acabó el
+anterior (por si una transacción larga confirmó tarde): aplicar una fila
+dos veces no cambia nada. `restore_delta` las carga con `executemany`
+(INSERT ... ON CONFLICT DO UPDATE) sin instanciar modelos ni disparar
+señales, y recalcula después el modelo fitness–fatiga de los atletas
+tocados.
+
+Nombres de archivo (de ellos se deduce qué aplicar al restaurar):
+    full-<alias>-<inicio>.sqlite3
+    delta-<alias>-<desde>-<hasta>.jsonl.gz
+"""
+import gzip
+import json
+import re
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import now
+
+from . import fitness
+from .models import (
+    ArchivedWorkoutData, ChangeLog, Classification, Exercise,
+    TrainingProgram, User, UserExerciseRM, WorkoutData
+)
+from .search import index_objects
+
+FORMAT = 'basis-delta'
+FORMAT_VERSION = 1
+STAMP = '%Y%m%dT%H%M%S%fZ'
+
+_FULL_NAME = re.compile(r'^full-(?P<alias>.+)-(?P<inicio>\d{8}T\d{12}Z)\.sqlite3$')
+_DELTA_NAME = re.compile(
+    r'^delta-(?P<alias>.+)-(?P<desde>\d{8}T\d{12}Z)-(?P<hasta>\d{8}T\d{12}Z)'
+    r'\.jsonl\.gz$')
+
+# Orden de carga: primero lo referenciado, después lo que referencia
+DELTA_MODELS = {
+    'classification': Classification,
+    'exercise': Exercise,
+    'user': User,
+    'trainingprogram': TrainingProgram,
+    'userexerciserm': UserExerciseRM,
+    'workoutdata': WorkoutData,
+    'archivedworkoutdata': ArchivedWorkoutData,
+}
+
+
+class BackupError(Exception):
+    pass
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def _config():
+    return settings.BACKUPS
+
+
+def backup_directory():
+    return Path(_config().get('directory', settings.BASE_DIR / 'backups'))
+
+
+def _stamp(moment):
+    return moment.astimezone(dt_timezone.utc).strftime(STAMP)
+
+
+def _parse_stamp(value):
+    return datetime.strptime(value, STAMP).replace(tzinfo=dt_timezone.utc)
+
+
+def _sqlite_path(using):
+    database = connections[using].settings_dict
+    if database['ENGINE'] != 'django.db.backends.sqlite3':
+        raise BackupError(f"'{using}' no es SQLite: usa las herramientas del motor.")
+    return str(database['NAME'])
+
+
+def _columns(model):
+    """ Columnas copiadas (sin las generadas, que recalcula la base) """
+    return [field for field in model._meta.concrete_fields
+            if not field.generated]
+
+
+# 📌 1️⃣ Copia completa en caliente
+def online_backup(using='default', target=None, pages_per_step=None,
+                  sleep_ms=None, max_restarts=None, progress=None):
+    """
+    Copia la base `using` en `target` (por defecto en `backup_directory()`)
+    sin detener las escrituras. Devuelve la ruta del archivo creado.
+    """
+    config = _config()
+    pages_per_step = pages_per_step or config.get('pages_per_step', 1024)
+    sleep = (config.get('sleep_ms', 5) if sleep_ms is None else sleep_ms) / 1000
+    max_restarts = config.get('max_restarts', 3) \
+        if max_restarts is None else max_restarts
+
+    started = now()
+    if target is None:
+        backup_directory().mkdir(parents=True, exist_ok=True)
+        target = backup_directory() / f'full-{using}-{_stamp(started)}.sqlite3'
+    target = Path(target)
+    partial = target.with_name(target.name + '.part')
+    partial.unlink(missing_ok=True)
+
+    state = {'remaining': None, 'restarts': 0}
+
+    def step(status, remaining, total):
+        if state['remaining'] is not None and remaining > state['remaining']:
+            state['restarts'] += 1
+            if state['restarts'] > max_restarts:
+                raise _TooManyRestarts()
+        state['remaining'] = remaining
+        if progress is not None:
+            progress(total - remaining, total)
+        # Deja pasar a los escritores entre paso y paso
+        time.sleep(sleep)
+
+    source = sqlite3.connect(f'file:{_sqlite_path(using)}?mode=ro', uri=True)
+    destination = sqlite3.connect(partial)
+    try:
+        try:
+            source.backup(destination, pages=pages_per_step, progress=step)
+        except _TooManyRestarts:
+            source.backup(destination, pages=-1)
+    finally:
+        destination.close()
+        source.close()
+    partial.replace(target)
+    return target
+
+
+def verify_backup(path):
+    """ `PRAGMA quick_check` sobre la copia """
+    connection = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        result = connection.execute('PRAGMA quick_check').fetchone()[0]
+    except sqlite3.DatabaseError as exc:
+        result = str(exc)
+    finally:
+        connection.close()
+    if result != 'ok':
+        raise BackupError(f"La copia {path} está dañada: {result}")
+
+
+def restore_full(path, using='default'):
+    """ Sustituye la base `using` por la copia `path` (sin escritores activos) """
+    connections[using].close()
+    source = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    destination = sqlite3.connect(_sqlite_path(using))
+    try:
+        source.backup(destination)
+    finally:
+        destination.close()
+        source.close()
+
+
+# 📌 2️⃣ Deltas incrementales
+def _rows(queryset, model):
+    return queryset.order_by('pk').values_list(
+        *[field.attname for field in _columns(model)])
+
+
+def _write_block(handle, modelo, accion, **payload):
+    handle.write(json.dumps(
+        {'modelo': modelo, 'accion': accion, **payload},
+        cls=DjangoJSONEncoder, separators=(',', ':')).encode())
+    handle.write(b'\n')
+
+
+def _write_rows(handle, model, rows, chunk_rows):
+    names = [field.attname for field in _columns(model)]
+    modelo = model._meta.model_name
+    written = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            _write_block(handle, modelo, 'upsert', columnas=names, filas=chunk)
+            written, chunk = written + len(chunk), []
+    if chunk:
+        _write_block(handle, modelo, 'upsert', columnas=names, filas=chunk)
+        written += len(chunk)
+    return written
+
+
+def export_delta(desde, hasta=None, using='default', target=None):
+    """
+    Escribe las filas cambiadas entre `desde` y `hasta` (ahora por defecto).
+    Devuelve `(ruta, {modelo: filas})`.
+    """
+    hasta = hasta or now()
+    chunk_rows = _config().get('chunk_rows', 5000)
+    if target is None:
+        backup_directory().mkdir(parents=True, exist_ok=True)
+        target = backup_directory() / (
+            f'delta-{using}-{_stamp(desde)}-{_stamp(hasta)}.jsonl.gz')
+    target = Path(target)
+    partial = target.with_name(target.name + '.part')
+
+    workouts = WorkoutData.objects.using(using).filter(
+        updated_at__gte=desde, updated_at__lt=hasta)
+    rms = UserExerciseRM.objects.using(using).filter(
+        updated_at__gte=desde, updated_at__lt=hasta)
+    archived = ArchivedWorkoutData.objects.using(using).filter(
+        archivado_en__gte=desde, archivado_en__lt=hasta)
+    deleted = {}
+    for modelo, objeto_id in ChangeLog.objects.using(using).filter(
+            accion='delete', fecha__gte=desde, fecha__lt=hasta,
+            modelo__in=DELTA_MODELS).values_list('modelo', 'objeto_id'):
+        deleted.setdefault(modelo, set()).add(objeto_id)
+
+    # Lo que referencian las filas cambiadas, para que la carga no rompa FK
+    referenced = {'user': set(), 'exercise': set(), 'trainingprogram': set()}
+    for queryset, has_program in ((workouts, True), (rms, False),
+                                  (archived, True)):
+        columns = ['user_id', 'exercise_id'] + (
+            ['programa_id'] if has_program else [])
+        for row in queryset.values_list(*columns).distinct():
+            referenced['user'].add(row[0])
+            referenced['exercise'].add(row[1])
+            if has_program and row[2] is not None:
+                referenced['trainingprogram'].add(row[2])
+    exercises = Exercise.objects.using(using).filter(
+        pk__in=referenced['exercise'])
+
+    counts = {}
+    with gzip.open(partial, 'wb') as handle:
+        _write_block(handle, None, 'header', formato=FORMAT,
+                     version=FORMAT_VERSION, alias=using,
+                     desde=desde, hasta=hasta)
+        sources = {
+            'classification': Classification.objects.using(using).filter(
+                pk__in=exercises.values('classification_id')),
+            'exercise': exercises,
+            'user': User.objects.using(using).filter(
+                pk__in=referenced['user']),
+            'trainingprogram': TrainingProgram.objects.using(using).filter(
+                pk__in=referenced['trainingprogram']),
+            'userexerciserm': rms,
+            'workoutdata': workouts,
+            'archivedworkoutdata': archived,
+        }
+        for modelo, queryset in sources.items():
+            model = DELTA_MODELS[modelo]
+            counts[modelo] = _write_rows(
+                handle, model, _rows(queryset, model).iterator(
+                    chunk_size=chunk_rows), chunk_rows)
+        for modelo, ids in deleted.items():
+            ids = sorted(ids)
+            for offset in range(0, len(ids), chunk_rows):
+                _write_block(handle, modelo, 'delete',
+                             ids=ids[offset:offset + chunk_rows])
+            counts[f'{modelo}_borrados'] = len(ids)
+    partial.replace(target)
+    return target, counts
+
+
+def _upsert_sql(connection, model, names):
+    quote = connection.ops.quote_name
+    meta = model._meta
+    pk = meta.pk.column
+    by_attname = {field.attname: field.column for field in meta.concrete_fields}
+    columns = [by_attname[name] for name in names]
+    updates = ', '.join(f'{quote(column)} = excluded.{quote(column)}'
+                        for column in columns if column != pk)
+    return (f'INSERT INTO {quote(meta.db_table)} '
+            f'({", ".join(quote(column) for column in columns)}) '
+            f'VALUES ({", ".join(["%s"] * len(columns))}) '
+            f'ON CONFLICT ({quote(pk)}) DO UPDATE SET {updates}')
+
+
+def _delete_sql(connection, model, count):
+    quote = connection.ops.quote_name
+    meta = model._meta
+    return (f'DELETE FROM {quote(meta.db_table)} '
+            f'WHERE {quote(meta.pk.column)} IN ({", ".join(["%s"] * count)})')
+
+
+def _converters(connection, model, names):
+    """ JSON → valor de base de datos, columna a columna """
+    fields = {field.attname: field for field in model._meta.concrete_fields}
+
+    def converter(field):
+        def convert(value):
+            if value is None:
+                return None
+            return field.get_db_prep_save(field.to_python(value), connection)
+        return convert
+    return [converter(fields[name]) for name in names]
+
+
+def restore_delta(path, using='default'):
+    """
+    Aplica un delta sobre la base `using` en una transacción. Devuelve
+    `{modelo: filas}`.
+    """
+    connection = connections[using]
+    counts = {}
+    touched_users = set()
+    with gzip.open(path, 'rb') as handle, transaction.atomic(using=using):
+        header = json.loads(handle.readline())
+        if header.get('formato') != FORMAT or \
+                header.get('version') != FORMAT_VERSION:
+            raise BackupError(f"{path} no es un delta de este formato.")
+        with connection.cursor() as cursor:
+            for line in handle:
+                block = json.loads(line)
+                model = DELTA_MODELS[block['modelo']]
+                if block['accion'] == 'upsert':
+                    names = block['columnas']
+                    converters = _converters(connection, model, names)
+                    cursor.executemany(
+                        _upsert_sql(connection, model, names),
+                        [[convert(value) for convert, value
+                          in zip(converters, row)] for row in block['filas']])
+                    if model is ArchivedWorkoutData:
+                        # Archivar = salir de la tabla caliente
+                        ids = [row[names.index('id')] for row in block['filas']]
+                        cursor.execute(
+                            _delete_sql(connection, WorkoutData, len(ids)), ids)
+                    if 'user_id' in names:
+                        index = names.index('user_id')
+                        touched_users.update(
+                            row[index] for row in block['filas'])
+                    key, rows = block['modelo'], len(block['filas'])
+                else:
+                    ids = block['ids']
+                    cursor.execute(
+                        _delete_sql(connection, model, len(ids)), ids)
+                    key, rows = f"{block['modelo']}_borrados", len(ids)
+                counts[key] = counts.get(key, 0) + rows
+
+    if touched_users:
+        fitness.rebuild_fitness(touched_users, using=using)
+    users = User.objects.using(using).filter(pk__in=touched_users)
+    index_objects(users, using=using)
+    return counts
+
+
+# 📌 3️⃣ Inventario del directorio de copias
+def list_backups(alias, directory=None):
+    """ `(completas, deltas)` de `alias`, ordenadas por fecha """
+    directory = Path(directory or backup_directory())
+    full, deltas = [], []
+    for path in directory.glob('*'):
+        match = _FULL_NAME.match(path.name)
+        if match and match['alias'] == alias:
+            full.append((_parse_stamp(match['inicio']), path))
+        match = _DELTA_NAME.match(path.name)
+        if match and match['alias'] == alias:
+            deltas.append((_parse_stamp(match['desde']),
+                           _parse_stamp(match['hasta']), path))
+    return sorted(full), sorted(deltas, key=lambda item: item[1])
+
+
+def next_delta_start(alias, directory=None):
+    """
+    Inicio del siguiente delta: el final del último (o el inicio de la
+    última copia completa) menos el solapamiento configurado.
+    """
+    full, deltas = list_backups(alias, directory)
+    points = [hasta for _, hasta, _ in deltas] + [inicio for inicio, _ in full]
+    if not points:
+        return None
+    return max(points) - timedelta(
+        seconds=_config().get('delta_overlap_seconds', 300))
+
+
+def full_backup_age(alias, directory=None):
+    """ Antigüedad de la última copia completa de `alias` (None si no hay) """
+    full, _ = list_backups(alias, directory)
+    return now() - full[-1][0] if full else None
+
+
+def full_backup_overdue(alias, directory=None):
+    """
+    Si la última copia completa supera `full_max_age_hours` (o no hay
+    ninguna): los deltas no llevan los cambios del catálogo.
+    """
+    age = full_backup_age(alias, directory)
+    limit = timedelta(hours=_config().get('full_max_age_hours', 24))
+    return age is None or age > limit
+
+
+def restore_plan(alias, directory=None):
+    """ Última copia completa y los deltas posteriores a su inicio, en orden """
+    full, deltas = list_backups(alias, directory)
+    if not full:
+        raise BackupError(f"No hay copias completas de '{alias}'.")
+    inicio, path = full[-1]
+    return path, [delta for _, hasta, delta in deltas if hasta > inicio]
+
+
+def parse_moment(value):
+    """ `YYYY-MM-DD` o fecha y hora ISO 8601 (UTC si no trae zona) """
+    moment = parse_datetime(value) or (
+        datetime.fromisoformat(value) if value else None)
+    if moment is None:
+        raise BackupError(f"Fecha no válida: {value}")
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=dt_timezone.utc)
+    return moment
@@ -0,0 +1,134 @@
+"""
+Compresión de respuestas negociada con `Accept-Encoding`.
+
+El JSON de la API es muy repetitivo (ejercicio y clasificación anidados en
+cada fila), así que comprime muy bien. `CompressionMiddleware` usa brotli
+si el paquete `brotli` está instalado y el cliente lo acepta, y gzip en
+otro caso, solo por encima de `RESPONSE_COMPRESSION['min_size']` bytes.
+No toca respuestas en streaming (el feed SSE) ni las que ya traen
+`Content-Encoding` (las listas del catálogo precomprimidas, ver
+`api/precompressed.py`).
+
+Solo se comprimen los tipos de la API (`content_types` y `*+json`), nunca
+HTML: las páginas del admin y del login llevan el token CSRF y comprimir
+secretos junto a texto que controla el atacante permite BREACH. Como en
+`GZipMiddleware`, gzip añade además bytes aleatorios en la cabecera
+(`max_random_bytes`) para que el tamaño no delate el contenido.
+"""
+import gzip
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+_CODING = re.compile(r'^\s*([^\s;]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$')
+CATALOGUE_VERSION_KEY = 'catalogue:version'
+
+
+def available_encodings():
+    """ Codificaciones que sabe producir el servidor, por preferencia """
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding(accept_encoding):
+    """ Mejor codificación aceptada por el cliente o None (sin comprimir) """
+    accepted = {}
+    for part in accept_encoding.split(','):
+        match = _CODING.match(part)
+        if match:
+            coding, quality = match.groups()
+            try:
+                accepted[coding.lower()] = float(quality) if quality else 1.0
+            except ValueError:
+                continue
+    wildcard = accepted.get('*', 0)
+    for coding in available_encodings():
+        if accepted.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+def compress(content, encoding, best=False):
+    """
+    Comprime `content` con `encoding`. Con `best` usa el nivel máximo y una
+    salida determinista (catálogo público que se comprime una vez y se
+    sirve muchas); si no, gzip lleva relleno aleatorio contra BREACH.
+    """
+    config = settings.RESPONSE_COMPRESSION
+    if encoding == 'br':
+        return brotli.compress(
+            content, quality=11 if best else config.get('brotli_quality', 5))
+    if best:
+        return gzip.compress(content, compresslevel=9, mtime=0)
+    return compress_string(
+        content, max_random_bytes=config.get('max_random_bytes', 100))
+
+
+def is_compressible(response):
+    """ Solo los tipos de la API (nunca HTML con tokens CSRF) """
+    content_type = response.get('Content-Type', '').split(';')[0].strip()
+    return (content_type.endswith('+json')
+            or content_type in settings.RESPONSE_COMPRESSION.get(
+                'content_types', ()))
+
+
+# 📌 1️⃣ Middleware
+class CompressionMiddleware:
+    """ Comprime las respuestas grandes según `Accept-Encoding` """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = settings.RESPONSE_COMPRESSION.get('min_size', 1024)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if len(response.content) < self.min_size or \
+                not is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # El cuerpo ya no es idéntico byte a byte (como `GZipMiddleware`)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+
+# 📌 2️⃣ Versión del catálogo (invalida las respuestas precomprimidas)
+def catalogue_version():
+    """
+    Versión actual de `Exercise`/`Classification`. Si la caché la perdió
+    se crea una nueva, así nunca se reutilizan respuestas antiguas.
+    """
+    version = cache.get(CATALOGUE_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        # Si otro proceso se adelantó, nos quedamos con la suya
+        if not cache.add(CATALOGUE_VERSION_KEY, version, None):
+            version = cache.get(CATALOGUE_VERSION_KEY, version)
+    return version
+
+
+def bump_catalogue_version():
+    cache.set(CATALOGUE_VERSION_KEY, time.time_ns(), None)
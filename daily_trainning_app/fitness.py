@@ -0,0 +1,323 @@
+"""
+Modelo fitness–fatiga de Banister (impulso-respuesta) por atleta.
+
+Cada día con entrenamiento aporta un impulso `w` (la métrica de
+`FITNESS_MODEL['metrica']` de sus series, ponderada por el `nivel_fatiga`
+del ejercicio). Fitness y fatiga son sumas con decaimiento exponencial:
+
+    fitness(d) = fitness(d') · e^(−(d − d') / τ₁) + w(d)
+    fatiga(d)  = fatiga(d')  · e^(−(d − d') / τ₂) + w(d)
+    rendimiento = k₁ · fitness − k₂ · fatiga
+
+donde `d'` es el último día entrenado anterior. Basta el estado anterior
+para avanzar, así que una serie nueva solo recalcula su día (y los
+posteriores si llega con fecha atrasada), nunca todo el historial. El
+estado de cada día entrenado se guarda en `AthleteFitnessState`; la
+disponibilidad de toda la plantilla sale de esos estados en una consulta.
+
+Las series archivadas (`ArchivedWorkoutData`) cuentan igual que las de
+la tabla caliente, así que reconstruir no pierde el historial antiguo.
+
+Los atletas con series pero sin ningún estado (bases anteriores a la
+migración 0016, cargas sin señales) se reconstruyen al consultarlos la
+primera vez, así que nadie tiene que lanzar `rebuild_fitness` a mano.
+"""
+import math
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import (
+    Case, F, FloatField, Min, Q, Sum, Value, When, Window
+)
+from django.db.models.functions import RowNumber
+from django.utils.dateparse import parse_date
+from django.utils.timezone import localdate
+
+from .models import ArchivedWorkoutData, AthleteFitnessState, WorkoutData
+
+
+@dataclass(frozen=True)
+class FitnessParams:
+    tau_fitness: float
+    tau_fatiga: float
+    k_fitness: float
+    k_fatiga: float
+    peso_fatiga: dict
+    metrica: str
+    escala: float
+
+    @classmethod
+    def from_settings(cls):
+        config = settings.FITNESS_MODEL
+        return cls(
+            tau_fitness=config.get('tau_fitness', 42),
+            tau_fatiga=config.get('tau_fatiga', 7),
+            k_fitness=config.get('k_fitness', 1.0),
+            k_fatiga=config.get('k_fatiga', 2.0),
+            peso_fatiga=config.get('peso_fatiga', {}),
+            metrica=config.get('metrica', 'volumen_relativo'),
+            escala=config.get('escala', 1.0))
+
+    def decay(self, fitness, fatiga, days):
+        """ Estado tras `days` días sin entrenar """
+        return (fitness * math.exp(-days / self.tau_fitness),
+                fatiga * math.exp(-days / self.tau_fatiga))
+
+    def rendimiento(self, fitness, fatiga):
+        return round(self.k_fitness * fitness - self.k_fatiga * fatiga, 4)
+
+
+def _per_user(field, starts, lookup):
+    """ `Q` con un filtro de fecha distinto por atleta """
+    return reduce(or_, (
+        Q(**{'user_id': user_id, f'{field}__{lookup}': fecha})
+        for user_id, fecha in starts.items()))
+
+
+def _latest_per_user(queryset):
+    """ Último estado de cada atleta del queryset (una consulta con ventana) """
+    return queryset.annotate(posicion=Window(
+        RowNumber(), partition_by=[F('user_id')],
+        order_by=F('fecha').desc())).filter(posicion=1)
+
+
+def _performed(using):
+    """ Series realizadas de la tabla caliente y del archivo """
+    return tuple(model.objects.using(using).filter(planificado=False)
+                 for model in (WorkoutData, ArchivedWorkoutData))
+
+
+# 📌 1️⃣ Impulsos diarios
+def daily_impulses(starts, params, using=None):
+    """
+    `{user_id: [(fecha, impulso), ...]}` desde la fecha de cada atleta en
+    `starts`. Una consulta agregada por tabla (caliente y archivo); las
+    series planificadas no cuentan.
+    """
+    peso = Case(
+        *[When(exercise__nivel_fatiga=nivel, then=Value(float(factor)))
+          for nivel, factor in params.peso_fatiga.items()],
+        default=Value(1.0), output_field=FloatField())
+    by_day = {}
+    for workouts in _performed(using):
+        for user_id, fecha, impulso in (
+                workouts.filter(_per_user('fecha', starts, 'gte'))
+                .values('user_id', 'fecha')
+                .annotate(impulso=Sum(F(params.metrica) * peso,
+                                      output_field=FloatField()))
+                .order_by()
+                .values_list('user_id', 'fecha', 'impulso')):
+            by_day[user_id, fecha] = by_day.get((user_id, fecha), 0.0) + \
+                (impulso or 0.0)
+    impulses = {}
+    for (user_id, fecha), impulso in sorted(by_day.items()):
+        impulses.setdefault(user_id, []).append(
+            (fecha, impulso * params.escala))
+    return impulses
+
+
+# 📌 2️⃣ Actualización incremental
+def update_fitness(starts, using=None, batch_size=200):
+    """
+    Recalcula los estados de cada atleta desde su fecha en `starts`
+    (`{user_id: fecha}`), partiendo del último estado anterior. Cuatro
+    consultas por cada `batch_size` atletas, sin importar la longitud del
+    historial (los filtros por atleta son un `OR` y SQLite limita su
+    profundidad).
+    """
+    using = using or router.db_for_write(AthleteFitnessState)
+    items = list(starts.items())
+    return sum(
+        _update_batch(dict(items[offset:offset + batch_size]), using)
+        for offset in range(0, len(items), batch_size))
+
+
+def _update_batch(starts, using):
+    params = FitnessParams.from_settings()
+    states = AthleteFitnessState.objects.using(using)
+    previous = {
+        state.user_id: state for state in _latest_per_user(
+            states.filter(_per_user('fecha', starts, 'lt')))
+    }
+    impulses = daily_impulses(starts, params, using=using)
+
+    new_states = []
+    for user_id in starts:
+        state = previous.get(user_id)
+        fitness, fatiga = (state.fitness, state.fatiga) if state else (0, 0)
+        last = state.fecha if state else None
+        for fecha, impulso in impulses.get(user_id, ()):
+            if last is not None:
+                fitness, fatiga = params.decay(
+                    fitness, fatiga, (fecha - last).days)
+            fitness, fatiga, last = fitness + impulso, fatiga + impulso, fecha
+            new_states.append(AthleteFitnessState(
+                user_id=user_id, fecha=fecha, impulso=round(impulso, 4),
+                fitness=round(fitness, 4), fatiga=round(fatiga, 4),
+                rendimiento=params.rendimiento(fitness, fatiga)))
+
+    with transaction.atomic(using=using):
+        states.filter(_per_user('fecha', starts, 'gte')).delete()
+        states.bulk_create(new_states, batch_size=1000)
+    return len(new_states)
+
+
+def rebuild_fitness(user_ids=None, batch_size=200, using=None):
+    """ Recalcula todos los estados (o los de `user_ids`) desde cero """
+    using = using or router.db_for_write(AthleteFitnessState)
+    sources = _performed(using)
+    if user_ids is None:
+        user_ids = {
+            user_id for workouts in sources
+            for user_id in workouts.values_list('user_id', flat=True)
+            .distinct()}
+    user_ids = sorted(set(user_ids))
+    created = 0
+    for offset in range(0, len(user_ids), batch_size):
+        batch = user_ids[offset:offset + batch_size]
+        AthleteFitnessState.objects.using(using).filter(
+            user_id__in=batch).delete()
+        first = {}
+        for workouts in sources:
+            for user_id, desde in workouts.filter(
+                    user_id__in=batch).values('user_id').annotate(
+                    desde=Min('fecha')).values_list('user_id', 'desde'):
+                first[user_id] = min(desde, first.get(user_id, desde))
+        created += update_fitness(first, using=using)
+    return created
+
+
+# Cambios pendientes de la transacción en curso: {alias: {user_id: fecha}}
+_pending = ContextVar('fitness_pending', default=None)
+
+
+def mark_changed(rows, using=None):
+    """
+    Anota pares `(user_id, fecha)` con series nuevas, editadas o borradas.
+    Los estados se recalculan una vez, al confirmar la transacción (o en
+    el momento si no hay ninguna abierta).
+    """
+    using = using or router.db_for_write(AthleteFitnessState)
+    pending = _pending.get()
+    if pending is None:
+        pending = {}
+        _pending.set(pending)
+    starts = pending.setdefault(using, {})
+    for user_id, fecha in rows:
+        if isinstance(fecha, str):
+            fecha = parse_date(fecha)
+        if user_id not in starts or fecha < starts[user_id]:
+            starts[user_id] = fecha
+    # El primer callback vuelca todo lo anotado; los demás no hacen nada.
+    # (Si la transacción se deshace, lo anotado se recalcula en la
+    # siguiente: recalcular desde una fecha siempre da el mismo estado.)
+    transaction.on_commit(lambda: _flush(using), using=using)
+
+
+def _flush(using):
+    pending = _pending.get() or {}
+    starts = pending.pop(using, None)
+    if starts:
+        update_fitness(starts, using=using)
+
+
+# 📌 3️⃣ Consultas
+def ensure_states(user_ids=None, using=None):
+    """
+    Reconstruye los estados de los atletas (de `user_ids` o todos) que
+    tienen series realizadas pero ningún estado guardado. Devuelve la base
+    desde la que leer: la de escritura si hubo que reconstruir (la réplica
+    aún no tendría los estados nuevos).
+    """
+    missing = set()
+    for workouts in _performed(using):
+        if user_ids is not None:
+            workouts = workouts.filter(user_id__in=user_ids)
+        missing.update(
+            workouts.exclude(user_id__in=AthleteFitnessState.objects.using(
+                using).values('user_id'))
+            .values_list('user_id', flat=True).distinct())
+    if not missing:
+        return using
+    write_alias = router.db_for_write(AthleteFitnessState)
+    rebuild_fitness(missing, using=write_alias)
+    return write_alias
+
+
+def readiness(user_ids=None, fecha=None, using=None):
+    """
+    Estado de cada atleta en `fecha` (hoy por defecto): su último estado
+    guardado, con el decaimiento de los días transcurridos. Una consulta
+    más la comprobación de atletas sin estados (`ensure_states`).
+    """
+    params = FitnessParams.from_settings()
+    fecha = fecha or localdate()
+    using = ensure_states(user_ids, using=using)
+    states = AthleteFitnessState.objects.using(using).filter(fecha__lte=fecha)
+    if user_ids is not None:
+        states = states.filter(user_id__in=user_ids)
+    roster = []
+    for state in _latest_per_user(states).order_by('user_id'):
+        fitness, fatiga = params.decay(
+            state.fitness, state.fatiga, (fecha - state.fecha).days)
+        roster.append({
+            'user_id': state.user_id,
+            'fecha': fecha.isoformat(),
+            'ultimo_entrenamiento': state.fecha.isoformat(),
+            'fitness': round(fitness, 2),
+            'fatiga': round(fatiga, 2),
+            'rendimiento': round(params.rendimiento(fitness, fatiga), 2),
+        })
+    return roster
+
+
+def curve(user_id, desde, hasta, using=None):
+    """
+    Serie diaria (fitness, fatiga, rendimiento, impulso) entre `desde` y
+    `hasta`, rellenando los días sin entrenar con el decaimiento.
+    """
+    params = FitnessParams.from_settings()
+    using = ensure_states([user_id], using=using)
+    states = list(
+        AthleteFitnessState.objects.using(using)
+        .filter(user_id=user_id, fecha__lte=hasta)
+        .filter(Q(fecha__gte=desde) | Q(pk__in=AthleteFitnessState.objects
+                                        .using(using)
+                                        .filter(user_id=user_id,
+                                                fecha__lt=desde)
+                                        .order_by('-fecha')
+                                        .values('pk')[:1]))
+        .order_by('fecha'))
+    by_date = {state.fecha: state for state in states}
+    anterior = states[0] if states and states[0].fecha < desde else None
+
+    series = []
+    fitness = fatiga = 0.0
+    last = None
+    if anterior is not None:
+        fitness, fatiga, last = anterior.fitness, anterior.fatiga, anterior.fecha
+    day = desde
+    while day <= hasta:
+        state = by_date.get(day)
+        if state is not None:
+            fitness, fatiga, last, impulso = (
+                state.fitness, state.fatiga, day, state.impulso)
+            valores = (fitness, fatiga)
+        else:
+            impulso = 0.0
+            valores = params.decay(fitness, fatiga, (day - last).days) \
+                if last is not None else (0.0, 0.0)
+        series.append({
+            'fecha': day.isoformat(),
+            'impulso': round(impulso, 2),
+            'fitness': round(valores[0], 2),
+            'fatiga': round(valores[1], 2),
+            'rendimiento': round(params.rendimiento(*valores), 2),
+        })
+        day += timedelta(days=1)
+    return series
@@ -0,0 +1,185 @@
+"""
+Ingesta de series en micro-lotes.
+
+Con `WORKOUT_INGEST_BUFFER['enabled']` las series que llegan por la API se
+encolan en memoria y un hilo las vuelca cada `flush_interval_ms` con un
+único `bulk_create`, resolviendo todos los 1RM del lote en una consulta.
+Así el único escritor de SQLite hace una transacción por lote en lugar de
+una por serie. Cada serie recuerda su gimnasio y cada gimnasio se vuelca
+en su propia base.
+
+Durabilidad: la API responde 202 en cuanto la serie está en la cola, que
+vive solo en la memoria del proceso. Lo pendiente se vuelca al salir con
+normalidad (`atexit`: fin del servidor, SIGTERM de gunicorn/uvicorn), pero
+se pierde si el proceso muere sin salir (SIGKILL, OOM). Si un lote falla
+se reintenta serie a serie: solo se descartan las series que fallan solas
+(p. ej. un ejercicio borrado), que quedan en `rejected` y en el log.
+Un reintento con la misma `Idempotency-Key` repite el 202 guardado sin
+volver a encolar, así que los clientes que necesitan confirmación la
+obtienen de `/api/v1/sync/` (la serie aparece al guardarse). Sin el
+buffer cada serie se confirma antes de responder.
+"""
+import atexit
+import logging
+from collections import deque
+import queue
+import threading
+import time
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections, router, transaction
+
+from basis_trainning_app.db_routers import current_gym, use_gym
+
+from . import fitness, live_feed
+from .models import Exercise, UserExerciseRM, WorkoutData
+from .sync import record_changes
+
+logger = logging.getLogger(__name__)
+
+
+def build_workouts(rows, using=None):
+    """
+    Crea instancias de `WorkoutData` (sin guardar) con sus métricas
+    calculadas. `rows` son diccionarios con `user_id`, `exercise_id`,
+    `fecha`, `sets`, `reps` y `peso`. Dos consultas en total.
+    """
+    rows = list(rows)
+    exercises = Exercise.objects.using(using).in_bulk(
+        {row['exercise_id'] for row in rows})
+    rms = UserExerciseRM.latest_rm_map(
+        [row['user_id'] for row in rows],
+        [row['exercise_id'] for row in rows],
+        using=using)
+
+    workouts = []
+    for row in rows:
+        workout = WorkoutData(**row)
+        workout.exercise = exercises[row['exercise_id']]
+        workout.aplicar_calculos(
+            rms.get((row['user_id'], row['exercise_id']), 0))
+        workouts.append(workout)
+    return workouts
+
+
+def bulk_insert_workouts(rows, using=None, batch_size=1000):
+    """ Inserta un lote de series con sus métricas y registra los cambios """
+    using = using or router.db_for_write(WorkoutData)
+    workouts = build_workouts(rows, using=using)
+    with transaction.atomic(using=using):
+        WorkoutData.objects.using(using).bulk_create(
+            workouts, batch_size=batch_size)
+        record_changes(WorkoutData, workouts, 'upsert', using=using)
+        fitness.mark_changed(
+            [(workout.user_id, workout.fecha) for workout in workouts],
+            using=using)
+        # `bulk_create` no envía `post_save`: publicamos las series hechas
+        performed = [workout for workout in workouts if not workout.planificado]
+        if performed:
+            transaction.on_commit(
+                partial(live_feed.publish, performed), using=using)
+    return workouts
+
+
+class WorkoutIngestBuffer:
+    """ Cola en memoria que se vuelca a la base en micro-lotes """
+
+    def __init__(self, flush_interval_ms=50, max_batch=1000, max_rejected=1000):
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max_batch
+        # Series descartadas (gimnasio, fila), las más recientes
+        self.rejected = deque(maxlen=max_rejected)
+        self._queue = queue.Queue()
+        self._pending = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, row):
+        """ Encola una serie; se guardará en el siguiente volcado """
+        self._ensure_started()
+        self._queue.put((current_gym(), row))
+        self._pending.set()
+
+    def flush(self):
+        """ Vuelca todo lo pendiente. Devuelve el número de series guardadas """
+        saved = 0
+        while True:
+            rows = self._drain()
+            if not rows:
+                return saved
+            by_gym = {}
+            for gym, row in rows:
+                by_gym.setdefault(gym, []).append(row)
+            for gym, batch in by_gym.items():
+                with use_gym(gym):
+                    saved += self._save(gym, batch)
+
+    def _save(self, gym, batch):
+        """ Guarda un lote; si falla, serie a serie para no perder las buenas """
+        try:
+            bulk_insert_workouts(batch)
+            return len(batch)
+        except Exception:
+            logger.warning(
+                "Falló un lote de %s series; se reintenta serie a serie.",
+                len(batch), exc_info=True)
+        saved = 0
+        for row in batch:
+            try:
+                bulk_insert_workouts([row])
+                saved += 1
+            except Exception:
+                logger.exception("Serie descartada: %s", row)
+                self.rejected.append((gym, row))
+        return saved
+
+    def _drain(self):
+        rows = []
+        while len(rows) < self.max_batch:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='workout-ingest', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            # Espera la primera serie y deja que el lote se llene
+            self._pending.wait()
+            time.sleep(self.flush_interval)
+            self._pending.clear()
+            close_old_connections()
+            self.flush()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def buffering_enabled():
+    return settings.WORKOUT_INGEST_BUFFER.get('enabled', False)
+
+
+def get_buffer():
+    """ Buffer del proceso, creado bajo demanda con la configuración actual """
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                config = settings.WORKOUT_INGEST_BUFFER
+                _buffer = WorkoutIngestBuffer(
+                    flush_interval_ms=config.get('flush_interval_ms', 50),
+                    max_batch=config.get('max_batch', 1000),
+                    max_rejected=config.get('max_rejected', 1000))
+    return _buffer
@@ -0,0 +1,232 @@
+"""
+Instrumentación opcional del guardado de `WorkoutData`.
+
+`span(nombre)` mide una etapa (validación, búsqueda del 1RM, cálculo de
+RPE/1RM, INSERT) y la envía a los sinks configurados en
+`WORKOUT_PROFILING['sinks']`. Desactivado no cuesta más que una
+comprobación: se activa globalmente con `WORKOUT_PROFILING['enabled']` o
+para una sola petición con `ProfilingMiddleware` (cabecera `X-Profile: 1`,
+solo staff), que además ejecuta un profiler por muestreo.
+"""
+import logging
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Trazas de la petición perfilada en curso (None si no se perfila)
+_request_trace = ContextVar('request_trace', default=None)
+# Nombre de la etapa padre, para anidar los spans
+_parent = ContextVar('span_parent', default=None)
+
+
+def profiling_enabled():
+    return (_request_trace.get() is not None or
+            settings.WORKOUT_PROFILING.get('enabled', False))
+
+
+@contextmanager
+def span(name, **attributes):
+    """ Mide el bloque y lo envía a los sinks si la instrumentación está activa """
+    if not profiling_enabled():
+        yield
+        return
+
+    parent = _parent.get()
+    token = _parent.set(name)
+    start_ns = time.time_ns()
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        duration_ns = time.perf_counter_ns() - start
+        _parent.reset(token)
+        record = {
+            'name': name,
+            'parent': parent,
+            'start_ns': start_ns,
+            'duration_ms': duration_ns / 1e6,
+            'attributes': attributes,
+        }
+        trace = _request_trace.get()
+        if trace is not None:
+            trace.append(record)
+        for sink in get_sinks():
+            sink.emit(record)
+
+
+# 📌 Sinks
+class LoggingSink:
+    """ Escribe cada span en el logger `daily_trainning_app.instrumentation` """
+
+    def emit(self, record):
+        logger.info("span %s %.3f ms %s", record['name'],
+                    record['duration_ms'], record['attributes'])
+
+
+class RingBufferSink:
+    """ Guarda los últimos spans en memoria (visibles en el admin) """
+    records = deque(maxlen=1000)
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class OpenTelemetrySink:
+    """ Exporta los spans con el SDK de OpenTelemetry si está instalado """
+
+    def __init__(self):
+        from opentelemetry import trace
+        self.tracer = trace.get_tracer('daily_trainning_app')
+
+    def emit(self, record):
+        end_ns = record['start_ns'] + int(record['duration_ms'] * 1e6)
+        otel_span = self.tracer.start_span(
+            record['name'], start_time=record['start_ns'],
+            attributes={key: str(value)
+                        for key, value in record['attributes'].items()})
+        otel_span.end(end_time=end_ns)
+
+
+@lru_cache(maxsize=None)
+def _load_sinks(paths):
+    sinks = []
+    for path in paths:
+        try:
+            sinks.append(import_string(path)())
+        except ImportError:
+            logger.warning("No se pudo cargar el sink de profiling %s.", path)
+    return sinks
+
+
+def get_sinks():
+    return _load_sinks(tuple(settings.WORKOUT_PROFILING.get('sinks', ())))
+
+
+# 📌 Profiler por muestreo
+class SamplingProfiler:
+    """
+    Toma una muestra de la pila del hilo perfilado cada `interval` segundos
+    desde otro hilo. El resultado son pilas "plegadas" (formato flamegraph).
+    """
+
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_filename}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def top(self, limit=20):
+        """ Funciones con más muestras propias (la cima de cada pila) """
+        own = Counter()
+        for stack, count in self.samples.items():
+            own[stack.rsplit(';', 1)[-1]] += count
+        return own.most_common(limit)
+
+
+# Perfiles de peticiones recientes (visibles en el admin)
+recent_profiles = deque(maxlen=50)
+
+
+def is_staff_request(request):
+    """
+    ¿La petición es de un usuario staff? La sesión ya la resuelve
+    `AuthenticationMiddleware`, pero las credenciales de la API (HTTP
+    Basic) solo las comprueba DRF dentro de la vista: se prueban aquí con
+    las mismas clases de autenticación, sin la de sesión.
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+
+    from rest_framework.authentication import SessionAuthentication
+    from rest_framework.exceptions import APIException
+    from rest_framework.request import Request
+    from rest_framework.settings import api_settings
+
+    api_request = Request(request)
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        if issubclass(authentication_class, SessionAuthentication):
+            continue
+        try:
+            result = authentication_class().authenticate(api_request)
+        except APIException:
+            # La vista repetirá la autenticación y responderá el error
+            return False
+        if result is not None:
+            return result[0].is_staff
+    return False
+
+
+class ProfilingMiddleware:
+    """
+    Con la cabecera `X-Profile: 1`, un usuario staff (de sesión o con
+    credenciales de la API, ver `is_staff_request`) obtiene los spans y un
+    perfil por muestreo de su petición. La respuesta incluye `X-Profile-Id`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = settings.WORKOUT_PROFILING
+        header = config.get('header', 'X-Profile')
+        if request.headers.get(header) != '1' or \
+                not is_staff_request(request):
+            return self.get_response(request)
+
+        trace = []
+        token = _request_trace.set(trace)
+        start = time.perf_counter()
+        try:
+            with SamplingProfiler(
+                    config.get('sample_interval_ms', 5) / 1000) as profiler:
+                response = self.get_response(request)
+        finally:
+            _request_trace.reset(token)
+
+        profile_id = uuid.uuid4().hex[:12]
+        recent_profiles.appendleft({
+            'id': profile_id,
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'duration_ms': (time.perf_counter() - start) * 1000,
+            'spans': trace,
+            'samples': sum(profiler.samples.values()),
+            'top': profiler.top(),
+            'stacks': dict(profiler.samples),
+        })
+        response['X-Profile-Id'] = profile_id
+        return response
+
@@ -0,0 +1,172 @@
+"""
+Feed en vivo de series para los entrenadores (Server-Sent Events).
+
+Durante una sesión de equipo los entrenadores consultaban
+`GET /api/v1/workout-data/` cada pocos segundos. Ahora cada serie nueva
+se publica una sola vez en un broker en memoria (tras el commit, desde
+`post_save` y desde la ingesta en micro-lotes) y se reparte a todas las
+pantallas suscritas a sus atletas, sin consultar la base.
+
+- El evento se codifica una vez y se comparte entre todos los suscriptores.
+- Cada suscriptor tiene una cola acotada en su bucle de eventos; si un
+  cliente lento la llena se le avisa con un evento `lagged` y puede
+  recuperar lo perdido con `Last-Event-ID` o con `/api/v1/sync/`.
+- El broker es por proceso y no hay reparto entre procesos: un cliente
+  solo recibe las series que se guardan en el mismo proceso ASGI que
+  atiende su conexión. Las que entran por otro worker (otro proceso de
+  uvicorn/gunicorn, los procesos de `settings_worker`, comandos de gestión)
+  no le llegan en vivo; las recupera al reconectar con `Last-Event-ID` o
+  con `/api/v1/sync/`. Para un feed completo hay que desplegar el feed y
+  la escritura de series en un único proceso ASGI.
+- Las series planificadas no se publican.
+- Con varios gimnasios cada suscripción queda ligada a la base del suyo
+  (los ids de atleta se repiten entre bases).
+"""
+import asyncio
+import json
+import threading
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import router
+
+from .models import WorkoutData
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+# Campos de cada evento (la misma forma que las filas de `layout=compact`)
+EVENT_FIELDS = (
+    'id', 'user_id', 'exercise_id', 'fecha', 'sets', 'reps', 'peso',
+    'carga', 'intensidad_relativa', 'volumen_relativo', 'rpe_objetivo',
+    'rm_sesion',
+)
+
+
+
+def event_data(workout):
+    """ Diccionario del evento para una serie guardada """
+    data = {field: getattr(workout, field) for field in EVENT_FIELDS}
+    data['fecha'] = str(workout.fecha)  # ISO 8601
+    return data
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f'{type(value).__name__} no es serializable')
+
+
+def _dumps(data):
+    """
+    JSON compacto sin pasar por DRF: este módulo lo importan las señales y
+    los workers (`settings_worker`) no cargan `rest_framework`.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, default=_default, separators=(',', ':')).encode()
+
+
+def encode_event(data, event='workout'):
+    """ Bloque SSE (`id`, `event`, `data`) ya codificado """
+    return (f'id: {data["id"]}\nevent: {event}\ndata: '.encode()
+            + _dumps(data) + b'\n\n')
+
+
+class Subscription:
+    """ Cola de eventos `(id, bloque SSE)` de un cliente, ligada a su bucle """
+
+    def __init__(self, db, user_ids, max_queue):
+        self.db = db
+        self.user_ids = user_ids
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.lagged = False
+
+    def deliver(self, events):
+        """ Se ejecuta en el bucle del cliente (`call_soon_threadsafe`) """
+        for event in events:
+            try:
+                self.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.lagged = True
+                return
+
+
+class LiveFeedBroker:
+    """ Pub/sub en memoria: (base, atleta) → suscripciones interesadas """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_user = {}
+        self._all = {}
+
+    def subscribe(self, user_ids=None, max_queue=None):
+        """
+        Suscribe al bucle actual a las series de `user_ids` (todas si es
+        None) del gimnasio activo. Debe llamarse desde código asíncrono.
+        """
+        subscription = Subscription(
+            router.db_for_write(WorkoutData),
+            frozenset(user_ids) if user_ids is not None else None,
+            max_queue or settings.LIVE_FEED.get('max_queue', 1000))
+        db = subscription.db
+        with self._lock:
+            if subscription.user_ids is None:
+                self._all.setdefault(db, set()).add(subscription)
+            for user_id in subscription.user_ids or ():
+                self._by_user.setdefault(
+                    (db, user_id), set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        db = subscription.db
+        with self._lock:
+            everything = self._all.get(db)
+            if everything is not None:
+                everything.discard(subscription)
+                if not everything:
+                    del self._all[db]
+            for user_id in subscription.user_ids or ():
+                subscribers = self._by_user.get((db, user_id))
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._by_user[(db, user_id)]
+
+    def has_subscribers(self):
+        return bool(self._all or self._by_user)
+
+    def publish(self, workouts):
+        """
+        Reparte las series guardadas. Cada evento se codifica una vez y
+        cada suscriptor recibe una sola llamada con todos los suyos.
+        """
+        if not self.has_subscribers():
+            return
+        pending = {}
+        with self._lock:
+            for workout in workouts:
+                if workout.planificado:
+                    continue
+                db = workout._state.db
+                targets = self._all.get(db, set()) | self._by_user.get(
+                    (db, workout.user_id), set())
+                if not targets:
+                    continue
+                event = (workout.pk, encode_event(event_data(workout)))
+                for subscription in targets:
+                    pending.setdefault(subscription, []).append(event)
+        for subscription, events in pending.items():
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.deliver, events)
+            except RuntimeError:
+                # El bucle del cliente ya se cerró
+                self.unsubscribe(subscription)
+
+
+broker = LiveFeedBroker()
+publish = broker.publish
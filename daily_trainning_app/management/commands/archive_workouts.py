@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from daily_trainning_app.archiving import archive_cutoff, archive_workouts
+
+
+class Command(BaseCommand):
+    help = "Mueve los entrenamientos antiguos a la tabla de archivo."
+    # Sin system checks: arranca antes y no importa las URLs ni el admin
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=None,
+            help="Horizonte en días (por defecto WORKOUT_ARCHIVE_HORIZON_DAYS).")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options["days"])
+        self.stdout.write(f"📦 Archivando entrenamientos anteriores a {cutoff}...")
+        moved = archive_workouts(
+            before=cutoff,
+            batch_size=options["batch_size"],
+            using=options["database"],
+            progress=lambda done, total: self.stdout.write(
+                f"   {done}/{total}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"🎉 {moved} entrenamientos archivados."))
@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import now
+
+from daily_trainning_app.backups import (
+    BackupError, export_delta, full_backup_overdue, next_delta_start,
+    online_backup, parse_moment, verify_backup
+)
+
+
+class Command(BaseCommand):
+    help = ("Copia en caliente la base SQLite o exporta un delta con las "
+            "series y RMs cambiados desde la última copia (el resto del "
+            "catálogo solo viaja en las copias completas).")
+    # Sin system checks: arranca antes y no importa las URLs ni el admin
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+        parser.add_argument(
+            "--incremental", action="store_true",
+            help="Exporta un delta en lugar de una copia completa.")
+        parser.add_argument(
+            "--since", default=None,
+            help="Inicio del delta (por defecto, donde acabó el anterior).")
+        parser.add_argument(
+            "--until", default=None, help="Fin del delta (por defecto, ahora).")
+        parser.add_argument(
+            "--pages", type=int, default=None,
+            help="Páginas por paso (por defecto BACKUPS['pages_per_step']).")
+        parser.add_argument(
+            "--sleep-ms", type=float, default=None,
+            help="Pausa entre pasos (por defecto BACKUPS['sleep_ms']).")
+        parser.add_argument(
+            "--verify", action="store_true",
+            help="Comprueba la copia con PRAGMA quick_check.")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        try:
+            if options["incremental"]:
+                self._delta(using, options)
+            else:
+                self._full(using, options)
+        except BackupError as exc:
+            raise CommandError(str(exc))
+
+    def _full(self, using, options):
+        self.stdout.write(f"💾 Copiando '{using}' en caliente...")
+        last = {"percent": -10}
+
+        def progress(done, total):
+            percent = done * 100 // max(total, 1)
+            if percent >= last["percent"] + 10:
+                last["percent"] = percent
+                self.stdout.write(f"   {done}/{total} páginas")
+
+        path = online_backup(
+            using, pages_per_step=options["pages"],
+            sleep_ms=options["sleep_ms"], progress=progress)
+        if options["verify"]:
+            verify_backup(path)
+            self.stdout.write("   ✅ quick_check correcto")
+        self.stdout.write(self.style.SUCCESS(f"🎉 Copia completa en {path}"))
+
+    def _delta(self, using, options):
+        desde = parse_moment(options["since"]) if options["since"] \
+            else next_delta_start(using)
+        if desde is None:
+            raise CommandError(
+                "No hay copias previas: haz primero una copia completa "
+                "o indica --since.")
+        hasta = parse_moment(options["until"]) if options["until"] else now()
+        self.stdout.write(f"🧾 Exportando cambios de '{using}' "
+                          f"entre {desde:%Y-%m-%d %H:%M} y {hasta:%Y-%m-%d %H:%M}...")
+        path, counts = export_delta(desde, hasta, using=using)
+        for modelo, rows in counts.items():
+            if rows:
+                self.stdout.write(f"   {modelo}: {rows}")
+        self.stdout.write(self.style.SUCCESS(f"🎉 Delta en {path}"))
+        if full_backup_overdue(using):
+            self.stdout.write(self.style.WARNING(
+                "⚠️ Los deltas solo llevan series y RMs y la última copia "
+                "completa es antigua (o no existe): haz una con `backup_db` "
+                "para no perder cambios de atletas, ejercicios, programas o "
+                "tablas RPE."))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from daily_trainning_app.query_guard import check_query_plans
+
+
+class Command(BaseCommand):
+    help = ("Comprueba con EXPLAIN que las consultas calientes siguen usando "
+            "índices. Termina con error si alguna deja de hacerlo (para CI).")
+    # Sin system checks: arranca antes y no importa las URLs ni el admin
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        failures = 0
+        for name, plan, problems in check_query_plans(options["database"]):
+            if problems:
+                failures += 1
+                self.stdout.write(self.style.ERROR(
+                    f"❌ {name}: {', '.join(problems)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"✅ {name}"))
+            if problems or options["verbosity"] > 1:
+                for line in plan.splitlines():
+                    self.stdout.write(f"     {line}")
+
+        if failures:
+            raise CommandError(
+                f"{failures} consultas calientes no usan índices.")
+        self.stdout.write(self.style.SUCCESS(
+            "🎉 Todas las consultas calientes usan índices."))
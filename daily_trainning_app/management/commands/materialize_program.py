@@ -0,0 +1,60 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import localdate
+
+from daily_trainning_app.models import TrainingProgram, User
+from daily_trainning_app.programs import materialize_program
+
+
+class Command(BaseCommand):
+    help = "Crea las series planificadas de un programa para un grupo de atletas."
+    # Sin system checks: arranca antes y no importa las URLs ni el admin
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("program_id", type=int)
+        parser.add_argument(
+            "--start", type=date.fromisoformat, default=None,
+            help="Fecha de la semana 1, día 1 (YYYY-MM-DD, por defecto hoy).")
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument(
+            "--users", type=lambda value: [int(pk) for pk in value.split(",")],
+            help="Ids de atletas separados por comas.")
+        group.add_argument(
+            "--all-users", action="store_true", help="Todos los atletas.")
+        parser.add_argument(
+            "--replace", action="store_true",
+            help="Borra antes las series planificadas de este programa.")
+        parser.add_argument("--users-per-batch", type=int, default=50)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        try:
+            program = TrainingProgram.objects.using(using).get(
+                pk=options["program_id"])
+        except TrainingProgram.DoesNotExist:
+            raise CommandError("❌ El programa no existe.")
+
+        if options["all_users"]:
+            user_ids = list(
+                User.objects.using(using).values_list("pk", flat=True))
+        else:
+            user_ids = options["users"]
+
+        self.stdout.write(
+            f"🗓️ Materializando '{program}' para {len(user_ids)} atletas...")
+        result = materialize_program(
+            program, user_ids, options["start"] or localdate(),
+            reemplazar=options["replace"],
+            users_per_batch=options["users_per_batch"],
+            using=using,
+            progress=lambda done, total: self.stdout.write(
+                f"   {done}/{total}"))
+        for missing in result["sin_rm"]:
+            self.stdout.write(self.style.WARNING(
+                f"⚠️ Atleta {missing['user_id']} sin 1RM en los ejercicios "
+                f"{missing['exercise_ids']}: se omiten."))
+        self.stdout.write(self.style.SUCCESS(
+            f"🎉 {result['creadas']} series planificadas creadas."))
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from basis_trainning_app.db_routers import gym_alias
+from daily_trainning_app.tenancy import sync_catalogue
+
+
+class Command(BaseCommand):
+    help = ("Crea o migra la base de cada gimnasio de TENANT_GYMS y copia "
+            "en ella el catálogo común.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "gyms", nargs="*",
+            help="Solo estos gimnasios (por defecto, todos).")
+
+    def handle(self, *args, **options):
+        gyms = options["gyms"] or settings.TENANT_GYMS
+        unknown = [gym for gym in gyms if gym_alias(gym) is None]
+        if unknown:
+            raise CommandError(
+                f"Gimnasios fuera de TENANT_GYMS: {', '.join(unknown)}.")
+        if not gyms:
+            self.stdout.write("⚠️ No hay gimnasios configurados (TENANT_GYMS).")
+            return
+
+        settings.TENANCY["directory"].mkdir(parents=True, exist_ok=True)
+        for gym in gyms:
+            alias = gym_alias(gym)
+            self.stdout.write(f"🏋️ Migrando '{gym}' ({alias})...")
+            call_command("migrate", database=alias, verbosity=0,
+                         interactive=False)
+            copied = sync_catalogue(alias)
+            self.stdout.write(f"   📚 {copied} filas del catálogo copiadas.")
+        self.stdout.write(self.style.SUCCESS(
+            f"🎉 {len(gyms)} gimnasios listos."))
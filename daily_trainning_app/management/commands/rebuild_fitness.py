@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from daily_trainning_app.fitness import rebuild_fitness
+
+
+class Command(BaseCommand):
+    help = ("Recalcula desde cero los estados del modelo fitness–fatiga "
+            "(tras importar datos o cambiar FITNESS_MODEL).")
+    # Sin system checks: arranca antes y no importa las URLs ni el admin
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=int, nargs="+", default=None,
+            help="Solo estos usuarios (por defecto, todos).")
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        self.stdout.write("📈 Recalculando el modelo fitness–fatiga...")
+        created = rebuild_fitness(
+            user_ids=options["users"],
+            batch_size=options["batch_size"],
+            using=options["database"])
+        self.stdout.write(self.style.SUCCESS(
+            f"🎉 {created} estados diarios guardados."))
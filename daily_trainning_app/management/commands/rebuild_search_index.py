@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from daily_trainning_app.models import SearchTrigram
+from daily_trainning_app.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el índice de búsqueda de ejercicios y usuarios."
+    # Sin system checks: arranca antes y no importa las URLs ni el admin
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        rebuild_index(using=using)
+        total = SearchTrigram.objects.using(using).count()
+        self.stdout.write(self.style.SUCCESS(
+            f"🎉 Índice reconstruido ({total} trigramas)."))
@@ -0,0 +1,34 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from daily_trainning_app.recompute import recompute_all
+
+
+class Command(BaseCommand):
+    help = "Recalcula las métricas de todos los entrenamientos en paralelo por atleta."
+    # Sin system checks: arranca antes y no importa las URLs ni el admin
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes", type=int, default=os.cpu_count() or 1)
+        parser.add_argument(
+            "--shards", type=int, default=None,
+            help="Número de grupos de usuarios (por defecto, uno por proceso).")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"🔄 Recalculando con {options['processes']} procesos...")
+        stats = recompute_all(
+            processes=options["processes"],
+            shards=options["shards"],
+            batch_size=options["batch_size"],
+            using=options["database"])
+        self.stdout.write(self.style.SUCCESS(
+            f"🎉 {stats['filas']} filas ({stats['actualizadas']} actualizadas) "
+            f"en {stats['segundos']} s: {stats['filas_por_segundo']} filas/s."))
+        if stats["actualizadas"]:
+            self.stdout.write("📈 Modelo fitness–fatiga recalculado.")
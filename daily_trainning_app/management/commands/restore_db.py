@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from daily_trainning_app.backups import (
+    BackupError, restore_delta, restore_full, restore_plan, verify_backup
+)
+
+
+class Command(BaseCommand):
+    help = ("Restaura la base SQLite desde una copia completa y aplica los "
+            "deltas posteriores. Detén antes los procesos que escriben.")
+    # Sin system checks: arranca antes y no importa las URLs ni el admin
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+        parser.add_argument(
+            "--full", default=None,
+            help="Copia completa a cargar (con --latest, la más reciente).")
+        parser.add_argument(
+            "deltas", nargs="*",
+            help="Deltas a aplicar, en orden, después de la copia.")
+        parser.add_argument(
+            "--latest", action="store_true",
+            help="Última copia completa del directorio y todos sus deltas.")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        full, deltas = options["full"], options["deltas"]
+        try:
+            if options["latest"]:
+                full, deltas = restore_plan(using)
+            if not full and not deltas:
+                raise CommandError("Indica --full, algún delta o --latest.")
+            if full:
+                verify_backup(full)
+                self.stdout.write(f"♻️ Cargando copia completa {full}...")
+                restore_full(full, using=using)
+            for delta in deltas:
+                self.stdout.write(f"🧾 Aplicando {delta}...")
+                counts = restore_delta(delta, using=using)
+                for modelo, rows in counts.items():
+                    self.stdout.write(f"   {modelo}: {rows}")
+        except BackupError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(
+            f"🎉 '{using}' restaurada ({len(deltas)} deltas aplicados)."))
@@ -0,0 +1,47 @@
+import multiprocessing
+import os
+
+from django.core.management.base import BaseCommand
+
+from daily_trainning_app.workers import worker_main
+
+
+class Command(BaseCommand):
+    help = "Ejecuta las tareas en segundo plano con un pool de procesos."
+    # Sin system checks: arranca antes y no importa las URLs ni el admin
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes", type=int, default=os.cpu_count() or 1,
+            help="Número de procesos worker (por defecto, uno por núcleo).")
+        parser.add_argument(
+            "--poll-interval", type=float, default=1.0,
+            help="Segundos entre consultas cuando la cola está vacía.")
+        parser.add_argument(
+            "--burst", action="store_true",
+            help="Terminar cuando no queden tareas pendientes.")
+
+    def handle(self, *args, **options):
+        settings_module = os.environ["DJANGO_SETTINGS_MODULE"]
+        processes = max(1, options["processes"])
+        self.stdout.write(f"🚀 Iniciando {processes} workers...")
+
+        context = multiprocessing.get_context("spawn")
+        workers = [
+            context.Process(
+                target=worker_main,
+                args=(settings_module, options["poll_interval"],
+                      options["burst"]),
+                name=f"worker-{index}")
+            for index in range(processes)
+        ]
+        for process in workers:
+            process.start()
+        try:
+            for process in workers:
+                process.join()
+        except KeyboardInterrupt:
+            for process in workers:
+                process.terminate()
+        self.stdout.write(self.style.SUCCESS("🎉 Workers detenidos."))
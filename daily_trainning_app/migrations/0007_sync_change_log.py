@@ -0,0 +1,54 @@
+# Generated by Django 5.1.7 on 2026-10-18 22:29
+
+from django.db import migrations, models
+
+
+def seed_change_log(apps, schema_editor):
+    """ Registra las filas existentes para que la primera sincronización las incluya """
+    ChangeLog = apps.get_model('daily_trainning_app', 'ChangeLog')
+    db_alias = schema_editor.connection.alias
+    for modelo in ('userexerciserm', 'workoutdata'):
+        Model = apps.get_model('daily_trainning_app', modelo)
+        rows = Model.objects.using(db_alias).order_by('pk').values_list(
+            'pk', 'user_id')
+        ChangeLog.objects.using(db_alias).bulk_create(
+            (ChangeLog(modelo=modelo, objeto_id=pk, usuario_id=user_id,
+                       accion='upsert') for pk, user_id in rows.iterator()),
+            batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_trainning_app', '0006_alter_userexerciserm_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userexerciserm',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Updated At'),
+        ),
+        migrations.AddField(
+            model_name='workoutdata',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Updated At'),
+        ),
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=50, verbose_name='Model')),
+                ('objeto_id', models.BigIntegerField(verbose_name='Object ID')),
+                ('usuario_id', models.BigIntegerField(verbose_name='User ID')),
+                ('accion', models.CharField(choices=[('upsert', 'Created/Updated'), ('delete', 'Deleted')], max_length=10, verbose_name='Action')),
+                ('fecha', models.DateTimeField(auto_now_add=True, verbose_name='Date')),
+            ],
+            options={
+                'verbose_name': 'Change Log Entry',
+                'verbose_name_plural': 'Change Log',
+                'indexes': [models.Index(fields=['usuario_id', 'id'], name='daily_train_usuario_b23e9d_idx')],
+            },
+        ),
+        migrations.RunPython(seed_change_log, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-18 22:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_trainning_app', '0007_sync_change_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedWorkoutData',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Date')),
+                ('sets', models.PositiveIntegerField(default=0, verbose_name='Sets')),
+                ('reps', models.PositiveIntegerField(default=0, verbose_name='Reps')),
+                ('total_reps', models.PositiveIntegerField(default=0, verbose_name='Total Reps')),
+                ('peso', models.PositiveIntegerField(default=0, verbose_name='Weight (kg)')),
+                ('intensidad_relativa', models.FloatField(default=0.0, verbose_name='Relative Intensity (%)')),
+                ('carga', models.PositiveIntegerField(default=0, verbose_name='Load (kg)')),
+                ('volumen_relativo', models.FloatField(default=0.0, verbose_name='Relative Volume')),
+                ('rpe_objetivo', models.FloatField(default=0.0, verbose_name='Target RPE')),
+                ('rm_sesion', models.FloatField(default=0.0, verbose_name='Estimated 1RM (Session)')),
+                ('archivado_en', models.DateTimeField(auto_now_add=True, verbose_name='Archived At')),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_workouts', to='daily_trainning_app.exercise', verbose_name='Exercise')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_workouts', to='daily_trainning_app.user', verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Archived Workout Data',
+                'verbose_name_plural': 'Archived Workout Data',
+                'indexes': [models.Index(fields=['user', 'fecha'], name='daily_train_user_id_84aa9d_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.7 on 2026-10-18 22:33
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+# Copia de `search.trigrams` tal como era al crear el índice: la migración
+# no debe cambiar si cambia el código de la app
+def trigrams(value):
+    value = re.sub(r'\s+', ' ', value or '').strip().title()
+    value = unicodedata.normalize('NFKD', value)
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    grams = set()
+    for word in re.findall(r'\w+', value.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def build_search_index(apps, schema_editor):
+    """ Indexa los ejercicios y usuarios existentes """
+    SearchTrigram = apps.get_model('daily_trainning_app', 'SearchTrigram')
+    db_alias = schema_editor.connection.alias
+    sources = (
+        ('exercise', 'Exercise', ('nombre', 'descripcion')),
+        ('user', 'User', ('nombre', 'email')),
+    )
+    for tipo, model_name, fields in sources:
+        Model = apps.get_model('daily_trainning_app', model_name)
+        rows = Model.objects.using(db_alias).values_list('pk', *fields)
+        SearchTrigram.objects.using(db_alias).bulk_create(
+            (SearchTrigram(tipo=tipo, objeto_id=pk, trigrama=gram)
+             for pk, *text in rows.iterator()
+             for gram in trigrams(' '.join(text))),
+            batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_trainning_app', '0008_archived_workout_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('exercise', 'Exercise'), ('user', 'User')], max_length=10, verbose_name='Type')),
+                ('objeto_id', models.BigIntegerField(verbose_name='Object ID')),
+                ('trigrama', models.CharField(max_length=3, verbose_name='Trigram')),
+            ],
+            options={
+                'verbose_name': 'Search Trigram',
+                'verbose_name_plural': 'Search Trigrams',
+                'indexes': [models.Index(fields=['tipo', 'trigrama'], name='daily_train_tipo_2c949c_idx'), models.Index(fields=['tipo', 'objeto_id'], name='daily_train_tipo_0f0859_idx')],
+            },
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-18 22:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_trainning_app', '0009_search_trigram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=255, unique=True, verbose_name='Key')),
+                ('huella', models.CharField(max_length=64, verbose_name='Request Fingerprint')),
+                ('status_code', models.PositiveSmallIntegerField(default=0, verbose_name='Status Code')),
+                ('respuesta', models.JSONField(null=True, verbose_name='Response')),
+                ('creado_en', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'Idempotency Key',
+                'verbose_name_plural': 'Idempotency Keys',
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.7 on 2026-10-18 22:37
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_trainning_app', '0010_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, verbose_name='Name')),
+                ('argumentos', models.JSONField(default=dict, verbose_name='Arguments')),
+                ('estado', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=10, verbose_name='Status')),
+                ('intentos', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('max_intentos', models.PositiveIntegerField(default=3, verbose_name='Max Attempts')),
+                ('progreso', models.FloatField(default=0.0, verbose_name='Progress')),
+                ('mensaje', models.CharField(blank=True, max_length=255, verbose_name='Message')),
+                ('resultado', models.JSONField(blank=True, null=True, verbose_name='Result')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('ejecutar_desde', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Run After')),
+                ('creado_en', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('iniciado_en', models.DateTimeField(blank=True, null=True, verbose_name='Started At')),
+                ('finalizado_en', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+                ('duracion_ms', models.FloatField(blank=True, null=True, verbose_name='Duration (ms)')),
+            ],
+            options={
+                'verbose_name': 'Task',
+                'verbose_name_plural': 'Tasks',
+                'ordering': ['-creado_en'],
+                'indexes': [models.Index(fields=['estado', 'ejecutar_desde'], name='daily_train_estado_fc37c0_idx')],
+            },
+        ),
+    ]
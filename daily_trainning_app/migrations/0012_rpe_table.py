@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-18 22:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_trainning_app', '0011_task_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RPETable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=255, verbose_name='Name')),
+                ('rir_por_porcentaje', models.JSONField(blank=True, default=dict, help_text='Ej.: {"100": 0, "95": 1, "90": 2}', verbose_name='RIR by %1RM')),
+                ('ajuste_fatiga', models.JSONField(blank=True, default=dict, help_text='Ej.: {"Bajo": 0, "Medio": 0.5, "Alto": 1}', verbose_name='RPE Fatigue Adjustment')),
+                ('factores_ajuste', models.JSONField(blank=True, default=dict, help_text='Ej.: {"Bajo": 0.022, "Medio": 0.028, "Alto": 0.033}', verbose_name='1RM Adjustment Factors')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('classification', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rpe_table', to='daily_trainning_app.classification', verbose_name='Classification')),
+                ('exercise', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rpe_table', to='daily_trainning_app.exercise', verbose_name='Exercise')),
+            ],
+            options={
+                'verbose_name': 'RPE Table',
+                'verbose_name_plural': 'RPE Tables',
+            },
+        ),
+    ]
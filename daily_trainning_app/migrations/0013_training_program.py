@@ -0,0 +1,67 @@
+# Generated by Django 5.1.7 on 2026-10-18 22:47
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_trainning_app', '0012_rpe_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrainingProgram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=255, verbose_name='Name')),
+                ('descripcion', models.TextField(blank=True, verbose_name='Description')),
+                ('creado_en', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'Training Program',
+                'verbose_name_plural': 'Training Programs',
+            },
+        ),
+        migrations.AddField(
+            model_name='archivedworkoutdata',
+            name='planificado',
+            field=models.BooleanField(default=False, verbose_name='Planned'),
+        ),
+        migrations.AddField(
+            model_name='workoutdata',
+            name='planificado',
+            field=models.BooleanField(default=False, verbose_name='Planned'),
+        ),
+        migrations.CreateModel(
+            name='ProgramEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semana', models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1)], verbose_name='Week')),
+                ('dia', models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(7)], verbose_name='Day')),
+                ('orden', models.PositiveSmallIntegerField(default=0, verbose_name='Order')),
+                ('sets', models.PositiveIntegerField(default=1, verbose_name='Sets')),
+                ('reps', models.PositiveIntegerField(default=1, verbose_name='Reps')),
+                ('porcentaje_rm', models.FloatField(validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(150)], verbose_name='%1RM')),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='daily_trainning_app.exercise', verbose_name='Exercise')),
+                ('programa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entradas', to='daily_trainning_app.trainingprogram', verbose_name='Program')),
+            ],
+            options={
+                'verbose_name': 'Program Entry',
+                'verbose_name_plural': 'Program Entries',
+                'ordering': ['semana', 'dia', 'orden', 'id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='archivedworkoutdata',
+            name='programa',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_workouts', to='daily_trainning_app.trainingprogram', verbose_name='Program'),
+        ),
+        migrations.AddField(
+            model_name='workoutdata',
+            name='programa',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='workouts', to='daily_trainning_app.trainingprogram', verbose_name='Program'),
+        ),
+    ]
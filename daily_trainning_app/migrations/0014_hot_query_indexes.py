@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-18 22:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_trainning_app', '0013_training_program'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userexerciserm',
+            index=models.Index(fields=['user', 'exercise', '-fecha_registro'], name='rm_user_exercise_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workoutdata',
+            index=models.Index(fields=['user', 'fecha'], name='workout_user_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.7 on 2026-10-18 23:07
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+def fill_plain_columns(apps, schema_editor):
+    """ Al deshacer: rellena de nuevo las columnas normales """
+    WorkoutData = apps.get_model('daily_trainning_app', 'WorkoutData')
+    WorkoutData.objects.using(schema_editor.connection.alias).update(
+        total_reps=models.F('reps') * models.F('sets'),
+        carga=models.F('reps') * models.F('sets') * models.F('peso'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_trainning_app', '0014_hot_query_indexes'),
+    ]
+
+    # Una columna normal no se puede convertir en generada: se elimina y se
+    # vuelve a crear. La base rellena las filas existentes al añadirla.
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, fill_plain_columns),
+        migrations.RemoveField(
+            model_name='workoutdata',
+            name='carga',
+        ),
+        migrations.RemoveField(
+            model_name='workoutdata',
+            name='total_reps',
+        ),
+        migrations.AddField(
+            model_name='workoutdata',
+            name='total_reps',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('reps'), '*', models.F('sets')), output_field=models.PositiveIntegerField(), verbose_name='Total Reps'),
+        ),
+        migrations.AddField(
+            model_name='workoutdata',
+            name='carga',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('reps'), '*', models.F('sets')), '*', models.F('peso')), output_field=models.PositiveIntegerField(), verbose_name='Load (kg)'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.7 on 2026-10-18 23:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_trainning_app', '0015_workout_generated_metrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AthleteFitnessState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Date')),
+                ('impulso', models.FloatField(default=0.0, verbose_name='Training Impulse')),
+                ('fitness', models.FloatField(default=0.0, verbose_name='Fitness')),
+                ('fatiga', models.FloatField(default=0.0, verbose_name='Fatigue')),
+                ('rendimiento', models.FloatField(default=0.0, verbose_name='Performance')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fitness_states', to='daily_trainning_app.user', verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Athlete Fitness State',
+                'verbose_name_plural': 'Athlete Fitness States',
+                'constraints': [models.UniqueConstraint(fields=('user', 'fecha'), name='fitness_user_fecha_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-18 23:13
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_trainning_app', '0016_athlete_fitness_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExerciseContribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('peso', models.FloatField(default=1.0, help_text='1 = primary mover, 0.5 = synergist', validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(1)], verbose_name='Weight')),
+                ('classification', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contribuciones', to='daily_trainning_app.classification', verbose_name='Muscle Group')),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contribuciones', to='daily_trainning_app.exercise', verbose_name='Exercise')),
+            ],
+            options={
+                'verbose_name': 'Exercise Contribution',
+                'verbose_name_plural': 'Exercise Contributions',
+                'constraints': [models.UniqueConstraint(fields=('exercise', 'classification'), name='contribution_exercise_classification_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 23:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_trainning_app', '0017_exercise_contribution'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='gym',
+            field=models.CharField(blank=True, default='', max_length=50, verbose_name='Gym'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.7 on 2026-10-18 23:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, migrations, models
+
+
+def link_accounts_by_email(apps, schema_editor):
+    """
+    Enlaza cada atleta con la cuenta de su mismo email (sin distinguir
+    mayúsculas) si hay exactamente una y no está ya enlazada. Las cuentas
+    viven en `default` aunque el atleta esté en la base de su gimnasio; los
+    atletas sin pareja se enlazan a mano desde el admin.
+    """
+    Account = apps.get_model(settings.AUTH_USER_MODEL)
+    User = apps.get_model('daily_trainning_app', 'User')
+    db_alias = schema_editor.connection.alias
+
+    by_email = {}
+    for pk, email in Account.objects.using(DEFAULT_DB_ALIAS).exclude(
+            email='').values_list('pk', 'email'):
+        by_email.setdefault(email.lower(), []).append(pk)
+    athletes = User.objects.using(db_alias)
+    linked = set(athletes.exclude(cuenta_id=None).values_list(
+        'cuenta_id', flat=True))
+    for pk, email in athletes.filter(cuenta_id=None).values_list(
+            'pk', 'email'):
+        accounts = by_email.get((email or '').lower(), [])
+        if len(accounts) == 1 and accounts[0] not in linked:
+            athletes.filter(pk=pk).update(cuenta_id=accounts[0])
+            linked.add(accounts[0])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_trainning_app', '0018_task_gym'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='cuenta',
+            field=models.OneToOneField(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='atleta', to=settings.AUTH_USER_MODEL, verbose_name='Account'),
+        ),
+        migrations.RunPython(link_accounts_by_email, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.7 on 2026-10-19 00:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_trainning_app', '0019_user_cuenta'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='changelog',
+            name='daily_train_usuario_b23e9d_idx',
+        ),
+        migrations.AddIndex(
+            model_name='changelog',
+            index=models.Index(fields=['usuario_id', 'fecha', 'id'], name='daily_train_usuario_5658d7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='changelog',
+            index=models.Index(fields=['fecha', 'id'], name='daily_train_fecha_d26409_idx'),
+        ),
+    ]
@@ -1,8 +1,14 @@
-from django.db import models
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models, router
 from django.utils.translation import gettext_lazy as _
 from django.utils.timezone import now
 import re
 
+from . import rpe_tables
+from .instrumentation import span
+
 
 def normalize_text(value):
     """ Normaliza el texto eliminando espacios extra y caracteres especiales. """
@@ -60,10 +66,55 @@ class Exercise(models.Model):
         verbose_name_plural = _("Exercises")
 
 
+class ExerciseContribution(models.Model):
+    """
+    Parte del trabajo de un ejercicio que recibe un grupo muscular
+    (`Classification`). Un ejercicio sin contribuciones cuenta entero para
+    su propia clasificación (ver `muscle_volume.py`).
+    """
+    exercise = models.ForeignKey(
+        Exercise,
+        on_delete=models.CASCADE,
+        related_name="contribuciones",
+        verbose_name=_("Exercise"))
+    classification = models.ForeignKey(
+        Classification,
+        on_delete=models.CASCADE,
+        related_name="contribuciones",
+        verbose_name=_("Muscle Group"))
+    peso = models.FloatField(
+        default=1.0,
+        validators=[MinValueValidator(0), MaxValueValidator(1)],
+        verbose_name=_("Weight"),
+        help_text=_("1 = primary mover, 0.5 = synergist"))
+
+    def __str__(self):
+        return f"{self.exercise_id} → {self.classification_id}: {self.peso}"
+
+    class Meta:
+        verbose_name = _("Exercise Contribution")
+        verbose_name_plural = _("Exercise Contributions")
+        constraints = [
+            models.UniqueConstraint(
+                fields=['exercise', 'classification'],
+                name='contribution_exercise_classification_uniq'),
+        ]
+
+
 class User(models.Model):
     nombre = models.CharField(max_length=255, verbose_name=_("Name"))
     email = models.EmailField(unique=True, verbose_name=_("Email"))
     fecha_inicio = models.DateField(verbose_name=_("Start Date"))
+    # Cuenta de acceso a la API del atleta. Sin restricción en la base: las
+    # cuentas viven en `default` y el atleta puede estar en la de su gimnasio
+    cuenta = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_constraint=False,
+        related_name="atleta",
+        verbose_name=_("Account"))
 
     def clean(self):
         self.nombre = normalize_text(self.nombre)
@@ -71,6 +122,23 @@ class User(models.Model):
     def __str__(self):
         return f"{self.nombre} ({self.email})"
 
+    @staticmethod
+    def id_for_account(account):
+        """
+        Id del atleta enlazado a la cuenta `account` (None si no tiene). Se
+        recuerda en la cuenta por base de datos durante la petición.
+        """
+        if account is None or not account.is_authenticated:
+            return None
+        using = router.db_for_read(User)
+        known = getattr(account, '_athlete_ids', None)
+        if known is None:
+            known = account._athlete_ids = {}
+        if using not in known:
+            known[using] = User.objects.using(using).filter(
+                cuenta_id=account.pk).values_list('pk', flat=True).first()
+        return known[using]
+
     class Meta:
         verbose_name = _("User")
         verbose_name_plural = _("Users")
@@ -93,12 +161,20 @@ class UserExerciseRM(models.Model):
     )
     fecha_registro = models.DateField(
         default=now, verbose_name=_("Date Recorded"))
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name=_("Updated At"))
 
     class Meta:
         verbose_name = _("User Exercise 1RM")
         verbose_name_plural = _("User Exercise 1RMs")
         # Ordenamos del más reciente al más antiguo
         ordering = ['-fecha_registro']
+        # Último 1RM de un usuario en un ejercicio (ver `check_query_plans`)
+        indexes = [
+            models.Index(
+                fields=['user', 'exercise', '-fecha_registro'],
+                name='rm_user_exercise_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.nombre} - {self.exercise.nombre}: {self.peso_maximo_rm} kg ({self.fecha_registro})"
@@ -110,6 +186,23 @@ class UserExerciseRM(models.Model):
             user=user, exercise=exercise).order_by('-fecha_registro').first()
         return latest_rm.peso_maximo_rm if latest_rm else 0
 
+    @staticmethod
+    def latest_rm_map(user_ids, exercise_ids, using=None):
+        """
+        Obtiene en una sola consulta el 1RM más reciente de cada par
+        (usuario, ejercicio): `{(user_id, exercise_id): peso_maximo_rm}`.
+        """
+        queryset = UserExerciseRM.objects.filter(
+            user_id__in=set(user_ids), exercise_id__in=set(exercise_ids))
+        if using is not None:
+            queryset = queryset.using(using)
+        rms = {}
+        for user_id, exercise_id, peso in queryset.order_by(
+                '-fecha_registro', '-id').values_list(
+                'user_id', 'exercise_id', 'peso_maximo_rm'):
+            rms.setdefault((user_id, exercise_id), peso)
+        return rms
+
     @staticmethod
     def get_latest_rm_from_workouts(user, exercise):
         """ Obtiene el 1RM estimado más reciente desde los entrenamientos en WorkoutData """
@@ -136,51 +229,89 @@ class WorkoutData(models.Model):
     fecha = models.DateField(verbose_name=_("Date"))
     sets = models.PositiveIntegerField(default=0, verbose_name=_("Sets"))
     reps = models.PositiveIntegerField(default=0, verbose_name=_("Reps"))
-    total_reps = models.PositiveIntegerField(
-        default=0, verbose_name=_("Total Reps"))
+    # Aritmética pura: la calcula la base en cada INSERT/UPDATE, también en
+    # `bulk_update`, `QuerySet.update()` y SQL directo
+    total_reps = models.GeneratedField(
+        expression=models.F("reps") * models.F("sets"),
+        output_field=models.PositiveIntegerField(),
+        db_persist=True,
+        verbose_name=_("Total Reps"))
     peso = models.PositiveIntegerField(
         default=0, verbose_name=_("Weight (kg)"))
     intensidad_relativa = models.FloatField(
         default=0.0, verbose_name=_("Relative Intensity (%)"))
-    carga = models.PositiveIntegerField(default=0, verbose_name=_("Load (kg)"))
+    carga = models.GeneratedField(
+        expression=models.F("reps") * models.F("sets") * models.F("peso"),
+        output_field=models.PositiveIntegerField(),
+        db_persist=True,
+        verbose_name=_("Load (kg)"))
     volumen_relativo = models.FloatField(
         default=0.0, verbose_name=_("Relative Volume"))
     rpe_objetivo = models.FloatField(default=0.0, verbose_name=_("Target RPE"))
     rm_sesion = models.FloatField(default=0.0,
                                   verbose_name=_("Estimated 1RM (Session)"))
+    planificado = models.BooleanField(
+        default=False, verbose_name=_("Planned"))
+    programa = models.ForeignKey(
+        "TrainingProgram",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="workouts",
+        verbose_name=_("Program"))
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name=_("Updated At"))
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Atleta, fecha y `planificado` guardados: si una edición los cambia,
+        # el modelo de fitness también debe recalcular el día original
+        instance._guardado = (
+            instance.__dict__.get('user_id'), instance.__dict__.get('fecha'),
+            instance.__dict__.get('planificado'))
+        return instance
 
     def clean(self):
         """ Ajusta cálculos automáticos antes de guardar """
-        if self.reps and self.sets:
-            self.total_reps = self.reps * self.sets
-
-        user_rm = UserExerciseRM.objects.filter(
-            user=self.user, exercise=self.exercise).first()
-        if user_rm and user_rm.peso_maximo_rm:
+        with span('workout.rm_lookup'):
+            user_rm = UserExerciseRM.objects.filter(
+                user=self.user, exercise=self.exercise).first()
+        self.aplicar_calculos(user_rm.peso_maximo_rm if user_rm else 0)
+
+    def aplicar_calculos(self, peso_maximo_rm):
+        """
+        Calcula las métricas a partir de un 1RM ya conocido, sin consultas.
+        Permite procesar lotes cargando los 1RM de una sola vez.
+        `total_reps` y `carga` los genera la base; aquí solo se reflejan en
+        la instancia para usarlos antes de guardar.
+        """
+        self.total_reps = total_reps = self.reps * self.sets
+        self.carga = total_reps * self.peso
+
+        if peso_maximo_rm:
             self.intensidad_relativa = round(
-                (self.peso / user_rm.peso_maximo_rm) * 100, 2)
+                (self.peso / peso_maximo_rm) * 100, 2)
         else:
             self.intensidad_relativa = 0.0
 
-        if self.peso and self.total_reps:
-            self.carga = self.total_reps * self.peso
-
-        if self.total_reps and self.intensidad_relativa:
+        if total_reps and self.intensidad_relativa:
             self.volumen_relativo = round(
-                self.total_reps * (self.intensidad_relativa), 2)
+                total_reps * (self.intensidad_relativa), 2)
 
-        self.rpe_objetivo = self.calcular_rpe()
-        self.rm_sesion = self.calcular_rm_sesion()
+        with span('workout.compute_rpe'):
+            self.rpe_objetivo = self.calcular_rpe(peso_maximo_rm)
+        with span('workout.compute_rm_sesion'):
+            self.rm_sesion = self.calcular_rm_sesion()
 
     def calcular_rm_sesion(self):
         """ Calcula el 1RM estimado usando reps, RPE, carga y un factor de ajuste basado en el ejercicio """
         if self.peso == 0 or self.reps == 0 or self.rpe_objetivo < 5:
             return 0.0  # Si no hay datos suficientes, devolvemos 0
 
-        # Definir factores de ajuste según el nivel de fatiga del ejercicio
-        factores_ajuste = {"Bajo": 0.022, "Medio": 0.028, "Alto": 0.033}
-        factor_ajuste = factores_ajuste.get(
-            self.exercise.nivel_fatiga, 0.028)  # Default: Medio
+        # Factor de ajuste según el nivel de fatiga del ejercicio
+        factor_ajuste = rpe_tables.table_for(self.exercise).factor(
+            self.exercise.nivel_fatiga)
 
         # Aplicar la fórmula
         rm_estimado = ((self.reps + 10 - self.rpe_objetivo) *
@@ -188,36 +319,24 @@ class WorkoutData(models.Model):
 
         return round(rm_estimado, 2)  # Redondeamos a 2 decimales
 
-    def calcular_rpe(self):
+    def calcular_rpe(self, peso_maximo_rm=None):
         """ Calcula el RPE basado en %1RM, repeticiones realizadas y ajuste por fatiga. """
         if self.peso == 0 or self.reps == 0:
             return 0.0
 
-        user_rm = UserExerciseRM.objects.filter(
-            user=self.user, exercise=self.exercise).first()
-        if not user_rm or user_rm.peso_maximo_rm == 0:
+        if peso_maximo_rm is None:
+            user_rm = UserExerciseRM.objects.filter(
+                user=self.user, exercise=self.exercise).first()
+            peso_maximo_rm = user_rm.peso_maximo_rm if user_rm else 0
+        if not peso_maximo_rm:
             return 0.0
 
-        porcentaje_rm = (self.peso / user_rm.peso_maximo_rm) * 100
-
-        rir_porcentaje_rm = {
-            100: 0,
-            95: 1,
-            90: 2,
-            85: 3,
-            80: 4,
-            75: 5,
-            70: 6,
-            65: 7,
-            60: 8}
-        intensidad = min(
-            rir_porcentaje_rm.keys(),
-            key=lambda x: abs(
-                x - porcentaje_rm))
-        reps_en_reserva = rir_porcentaje_rm[intensidad]
-
-        ajuste_fatiga = {"Bajo": 0, "Medio": 0.5, "Alto": 1}
-        fatiga = ajuste_fatiga.get(self.exercise.nivel_fatiga, 1.0)
+        porcentaje_rm = (self.peso / peso_maximo_rm) * 100
+
+        # RIR y ajuste por fatiga desde las tablas compiladas (`rpe_tables`)
+        tabla = rpe_tables.table_for(self.exercise)
+        reps_en_reserva = tabla.reps_en_reserva(porcentaje_rm)
+        fatiga = tabla.fatiga(self.exercise.nivel_fatiga)
 
         rpe_estimado = round(10 - reps_en_reserva + fatiga, 2)
 
@@ -229,3 +348,329 @@ class WorkoutData(models.Model):
     class Meta:
         verbose_name = _("Workout Data")
         verbose_name_plural = _("Workout Data")
+        # Historial y último entrenamiento de un usuario (ver `check_query_plans`)
+        indexes = [
+            models.Index(fields=['user', 'fecha'], name='workout_user_fecha_idx'),
+        ]
+
+
+class TrainingProgram(models.Model):
+    """ Plantilla de programa: semanas × días × ejercicios (ver `programs.py`) """
+    nombre = models.CharField(max_length=255, verbose_name=_("Name"))
+    descripcion = models.TextField(blank=True, verbose_name=_("Description"))
+    creado_en = models.DateTimeField(
+        auto_now_add=True, verbose_name=_("Created At"))
+
+    def __str__(self):
+        return self.nombre
+
+    class Meta:
+        verbose_name = _("Training Program")
+        verbose_name_plural = _("Training Programs")
+
+
+class ProgramEntry(models.Model):
+    """ Ejercicio planificado de un día del programa, con carga en %1RM """
+    programa = models.ForeignKey(
+        TrainingProgram,
+        on_delete=models.CASCADE,
+        related_name="entradas",
+        verbose_name=_("Program"))
+    semana = models.PositiveSmallIntegerField(
+        validators=[MinValueValidator(1)], verbose_name=_("Week"))
+    dia = models.PositiveSmallIntegerField(
+        validators=[MinValueValidator(1), MaxValueValidator(7)],
+        verbose_name=_("Day"))
+    orden = models.PositiveSmallIntegerField(
+        default=0, verbose_name=_("Order"))
+    exercise = models.ForeignKey(
+        Exercise,
+        on_delete=models.CASCADE,
+        verbose_name=_("Exercise"))
+    sets = models.PositiveIntegerField(default=1, verbose_name=_("Sets"))
+    reps = models.PositiveIntegerField(default=1, verbose_name=_("Reps"))
+    porcentaje_rm = models.FloatField(
+        validators=[MinValueValidator(0), MaxValueValidator(150)],
+        verbose_name=_("%1RM"))
+
+    def __str__(self):
+        return (f"S{self.semana} D{self.dia} - {self.exercise.nombre}: "
+                f"{self.sets}x{self.reps} @ {self.porcentaje_rm}%")
+
+    class Meta:
+        verbose_name = _("Program Entry")
+        verbose_name_plural = _("Program Entries")
+        ordering = ['semana', 'dia', 'orden', 'id']
+
+
+class RPETable(models.Model):
+    """
+    Coeficientes para estimar RPE y 1RM de un ejercicio o de toda una
+    clasificación. Las tablas vacías heredan los valores de
+    `settings.RPE_TABLES` (ver `rpe_tables.py`).
+    """
+    nombre = models.CharField(max_length=255, verbose_name=_("Name"))
+    exercise = models.OneToOneField(
+        Exercise,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="rpe_table",
+        verbose_name=_("Exercise"))
+    classification = models.OneToOneField(
+        Classification,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="rpe_table",
+        verbose_name=_("Classification"))
+    rir_por_porcentaje = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name=_("RIR by %1RM"),
+        help_text=_("Ej.: {\"100\": 0, \"95\": 1, \"90\": 2}"))
+    ajuste_fatiga = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name=_("RPE Fatigue Adjustment"),
+        help_text=_("Ej.: {\"Bajo\": 0, \"Medio\": 0.5, \"Alto\": 1}"))
+    factores_ajuste = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name=_("1RM Adjustment Factors"),
+        help_text=_("Ej.: {\"Bajo\": 0.022, \"Medio\": 0.028, \"Alto\": 0.033}"))
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name=_("Updated At"))
+
+    def clean(self):
+        """ Valida el ámbito y que las tablas sean numéricas """
+        if bool(self.exercise_id) == bool(self.classification_id):
+            raise ValidationError(
+                _("Select either an exercise or a classification."))
+        try:
+            for porcentaje, rir in self.rir_por_porcentaje.items():
+                float(porcentaje), float(rir)
+            for field in ('ajuste_fatiga', 'factores_ajuste'):
+                for valor in getattr(self, field).values():
+                    float(valor)
+        except (AttributeError, TypeError, ValueError):
+            raise ValidationError(_("Tables must map keys to numbers."))
+
+    def __str__(self):
+        return self.nombre
+
+    class Meta:
+        verbose_name = _("RPE Table")
+        verbose_name_plural = _("RPE Tables")
+
+
+class ArchivedWorkoutData(models.Model):
+    """
+    Entrenamientos antiguos movidos fuera de `WorkoutData` para mantener la
+    tabla caliente (y sus índices) pequeña. Conserva el `id` original.
+    """
+    id = models.BigIntegerField(primary_key=True, verbose_name=_("ID"))
+    user = models.ForeignKey(
+        "User",
+        on_delete=models.CASCADE,
+        related_name="archived_workouts",
+        verbose_name=_("User"))
+    exercise = models.ForeignKey(
+        "Exercise",
+        on_delete=models.CASCADE,
+        related_name="archived_workouts",
+        verbose_name=_("Exercise"))
+    fecha = models.DateField(verbose_name=_("Date"))
+    sets = models.PositiveIntegerField(default=0, verbose_name=_("Sets"))
+    reps = models.PositiveIntegerField(default=0, verbose_name=_("Reps"))
+    total_reps = models.PositiveIntegerField(
+        default=0, verbose_name=_("Total Reps"))
+    peso = models.PositiveIntegerField(
+        default=0, verbose_name=_("Weight (kg)"))
+    intensidad_relativa = models.FloatField(
+        default=0.0, verbose_name=_("Relative Intensity (%)"))
+    carga = models.PositiveIntegerField(default=0, verbose_name=_("Load (kg)"))
+    volumen_relativo = models.FloatField(
+        default=0.0, verbose_name=_("Relative Volume"))
+    rpe_objetivo = models.FloatField(default=0.0, verbose_name=_("Target RPE"))
+    rm_sesion = models.FloatField(default=0.0,
+                                  verbose_name=_("Estimated 1RM (Session)"))
+    planificado = models.BooleanField(
+        default=False, verbose_name=_("Planned"))
+    programa = models.ForeignKey(
+        "TrainingProgram",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="archived_workouts",
+        verbose_name=_("Program"))
+    archivado_en = models.DateTimeField(
+        auto_now_add=True, verbose_name=_("Archived At"))
+
+    def __str__(self):
+        return f"Archived workout #{self.pk} on {self.fecha}"
+
+    class Meta:
+        verbose_name = _("Archived Workout Data")
+        verbose_name_plural = _("Archived Workout Data")
+        indexes = [models.Index(fields=['user', 'fecha'])]
+
+
+class AthleteFitnessState(models.Model):
+    """
+    Estado del modelo fitness–fatiga (Banister) de un atleta al final de un
+    día con entrenamiento. Los días sin entrenar no se guardan: se obtienen
+    aplicando el decaimiento al estado anterior (ver `fitness.py`).
+    """
+    user = models.ForeignKey(
+        "User",
+        on_delete=models.CASCADE,
+        related_name="fitness_states",
+        verbose_name=_("User"))
+    fecha = models.DateField(verbose_name=_("Date"))
+    impulso = models.FloatField(default=0.0, verbose_name=_("Training Impulse"))
+    fitness = models.FloatField(default=0.0, verbose_name=_("Fitness"))
+    fatiga = models.FloatField(default=0.0, verbose_name=_("Fatigue"))
+    rendimiento = models.FloatField(
+        default=0.0, verbose_name=_("Performance"))
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name=_("Updated At"))
+
+    def __str__(self):
+        return f"Fitness state for user #{self.user_id} on {self.fecha}"
+
+    class Meta:
+        verbose_name = _("Athlete Fitness State")
+        verbose_name_plural = _("Athlete Fitness States")
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'fecha'], name='fitness_user_fecha_uniq'),
+        ]
+
+
+class ChangeLog(models.Model):
+    """ Registro de cambios (altas, ediciones y bajas) para la sincronización incremental """
+    ACCION_CHOICES = [
+        ('upsert', _("Created/Updated")),
+        ('delete', _("Deleted")),
+    ]
+
+    modelo = models.CharField(max_length=50, verbose_name=_("Model"))
+    objeto_id = models.BigIntegerField(verbose_name=_("Object ID"))
+    # Guardamos el id y no una FK para que las bajas sobrevivan al usuario
+    usuario_id = models.BigIntegerField(verbose_name=_("User ID"))
+    accion = models.CharField(
+        max_length=10,
+        choices=ACCION_CHOICES,
+        verbose_name=_("Action"))
+    fecha = models.DateTimeField(auto_now_add=True, verbose_name=_("Date"))
+
+    class Meta:
+        verbose_name = _("Change Log Entry")
+        verbose_name_plural = _("Change Log")
+        # El token de sincronización es `(fecha, id)` (ver `sync.py`)
+        indexes = [
+            models.Index(fields=['usuario_id', 'fecha', 'id']),
+            models.Index(fields=['fecha', 'id']),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.accion} {self.modelo}:{self.objeto_id}"
+
+
+class SearchTrigram(models.Model):
+    """
+    Índice de búsqueda por trigramas de ejercicios y usuarios.
+    Se mantiene sincronizado con señales (ver `search.py`).
+    """
+    TIPO_CHOICES = [
+        ('exercise', _("Exercise")),
+        ('user', _("User")),
+    ]
+
+    tipo = models.CharField(
+        max_length=10,
+        choices=TIPO_CHOICES,
+        verbose_name=_("Type"))
+    objeto_id = models.BigIntegerField(verbose_name=_("Object ID"))
+    trigrama = models.CharField(max_length=3, verbose_name=_("Trigram"))
+
+    class Meta:
+        verbose_name = _("Search Trigram")
+        verbose_name_plural = _("Search Trigrams")
+        indexes = [
+            models.Index(fields=['tipo', 'trigrama']),
+            models.Index(fields=['tipo', 'objeto_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo}:{self.objeto_id} '{self.trigrama}'"
+
+
+class IdempotencyKey(models.Model):
+    """ Respuestas ya enviadas por `Idempotency-Key`, para reintentos de dispositivos """
+    clave = models.CharField(max_length=255, unique=True, verbose_name=_("Key"))
+    huella = models.CharField(
+        max_length=64,
+        verbose_name=_("Request Fingerprint"))
+    status_code = models.PositiveSmallIntegerField(
+        default=0, verbose_name=_("Status Code"))
+    respuesta = models.JSONField(null=True, verbose_name=_("Response"))
+    creado_en = models.DateTimeField(
+        auto_now_add=True, db_index=True, verbose_name=_("Created At"))
+
+    class Meta:
+        verbose_name = _("Idempotency Key")
+        verbose_name_plural = _("Idempotency Keys")
+
+    def __str__(self):
+        return self.clave
+
+
+class Task(models.Model):
+    """ Tarea en segundo plano (cola en base de datos, ver `task_queue.py`) """
+    ESTADO_CHOICES = [
+        ('pending', _("Pending")),
+        ('running', _("Running")),
+        ('succeeded', _("Succeeded")),
+        ('failed', _("Failed")),
+    ]
+
+    nombre = models.CharField(max_length=100, verbose_name=_("Name"))
+    argumentos = models.JSONField(default=dict, verbose_name=_("Arguments"))
+    estado = models.CharField(
+        max_length=10,
+        choices=ESTADO_CHOICES,
+        default='pending',
+        verbose_name=_("Status"))
+    intentos = models.PositiveIntegerField(
+        default=0, verbose_name=_("Attempts"))
+    max_intentos = models.PositiveIntegerField(
+        default=3, verbose_name=_("Max Attempts"))
+    progreso = models.FloatField(default=0.0, verbose_name=_("Progress"))
+    mensaje = models.CharField(
+        max_length=255, blank=True, verbose_name=_("Message"))
+    resultado = models.JSONField(null=True, blank=True, verbose_name=_("Result"))
+    error = models.TextField(blank=True, verbose_name=_("Error"))
+    worker = models.CharField(max_length=100, blank=True, verbose_name=_("Worker"))
+    # Gimnasio en cuya base se ejecuta (vacío → base común)
+    gym = models.CharField(max_length=50, blank=True, default='', verbose_name=_("Gym"))
+    ejecutar_desde = models.DateTimeField(
+        default=now, verbose_name=_("Run After"))
+    creado_en = models.DateTimeField(
+        auto_now_add=True, verbose_name=_("Created At"))
+    iniciado_en = models.DateTimeField(
+        null=True, blank=True, verbose_name=_("Started At"))
+    finalizado_en = models.DateTimeField(
+        null=True, blank=True, verbose_name=_("Finished At"))
+    duracion_ms = models.FloatField(
+        null=True, blank=True, verbose_name=_("Duration (ms)"))
+
+    class Meta:
+        verbose_name = _("Task")
+        verbose_name_plural = _("Tasks")
+        ordering = ['-creado_en']
+        indexes = [models.Index(fields=['estado', 'ejecutar_desde'])]
+
+    def __str__(self):
+        return f"#{self.pk} {self.nombre} ({self.estado})"
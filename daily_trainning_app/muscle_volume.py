@@ -0,0 +1,185 @@
+"""
+Series semanales efectivas por grupo muscular y atleta.
+
+Cada `Exercise` tiene una sola `Classification`, pero un ejercicio
+compuesto trabaja varios grupos. `ExerciseContribution` reparte sus series
+con un peso por grupo (sentadilla: cuádriceps 1, glúteo 1, isquios 0.5) y
+el volumen de cada grupo es el producto disperso
+
+    volumen[atleta, semana] = series[atleta, semana, ejercicio] × matriz[ejercicio, grupo]
+
+- La matriz (ejercicio → [(grupo, peso)]) se construye una vez por versión
+  del catálogo (`catalogue_version()`); sus señales la invalidan.
+- Cada (atleta, semana) calculado se guarda en caché con una huella de sus
+  series (número, suma de series y último `updated_at`): solo se recalcula
+  si cambian sus entrenamientos de esa semana o la matriz.
+- Toda la plantilla se resuelve con dos consultas por tabla: las huellas
+  y, solo para las semanas que faltan en caché, las series agregadas por
+  ejercicio. Las semanas antiguas salen del archivo (`ArchivedWorkoutData`,
+  cuya huella usa `archivado_en`), así que archivar no las vacía.
+"""
+import hashlib
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncWeek
+
+from .compression import catalogue_version
+from .models import (
+    ArchivedWorkoutData, Classification, Exercise, ExerciseContribution,
+    WorkoutData
+)
+
+_matrix_lock = threading.Lock()
+_matrix = {}  # {'version': ..., 'filas': ..., 'grupos': ...}
+
+
+def week_start(fecha):
+    """ Lunes de la semana de `fecha` (igual que `TruncWeek`) """
+    return fecha - timedelta(days=fecha.weekday())
+
+
+# 📌 1️⃣ Matriz ejercicio × grupo muscular
+def contribution_matrix():
+    """
+    `({exercise_id: ((classification_id, peso), ...)}, {classification_id:
+    nombre})`. Un ejercicio sin contribuciones cuenta entero para su propia
+    clasificación. Tres consultas por versión del catálogo, por proceso.
+    """
+    version = catalogue_version()
+    with _matrix_lock:
+        if _matrix.get('version') == version:
+            return _matrix['filas'], _matrix['grupos']
+
+    filas = {}
+    for exercise_id, classification_id, peso in (
+            ExerciseContribution.objects.filter(peso__gt=0)
+            .values_list('exercise_id', 'classification_id', 'peso')):
+        filas.setdefault(exercise_id, []).append((classification_id, peso))
+    for exercise_id, classification_id in Exercise.objects.values_list(
+            'id', 'classification_id'):
+        filas.setdefault(exercise_id, [(classification_id, 1.0)])
+    filas = {exercise_id: tuple(fila) for exercise_id, fila in filas.items()}
+    grupos = dict(Classification.objects.values_list('id', 'nombre'))
+
+    with _matrix_lock:
+        _matrix.update(version=version, filas=filas, grupos=grupos)
+    return filas, grupos
+
+
+# 📌 2️⃣ Producto disperso
+def _volume_by_group(series_by_exercise, filas):
+    """ `{exercise_id: series}` × matriz → `{classification_id: series}` """
+    volumen = {}
+    for exercise_id, series in series_by_exercise.items():
+        for classification_id, peso in filas.get(exercise_id, ()):
+            volumen[classification_id] = \
+                volumen.get(classification_id, 0.0) + series * peso
+    return {grupo: round(series, 2) for grupo, series in volumen.items()}
+
+
+def _cache_key(using, user_id, semana, version, huella):
+    raw = f'{using}|{version}|{user_id}|{semana.isoformat()}|{huella}'
+    return 'muscle_volume:' + hashlib.sha256(raw.encode()).hexdigest()
+
+
+# 📌 3️⃣ Volumen semanal de la plantilla
+def weekly_volume(user_ids, desde, hasta, using=None):
+    """
+    `{user_id: {semana: {classification_id: series}}}` para las semanas
+    (lunes) entre `desde` y `hasta`. Las series planificadas no cuentan.
+    """
+    filas, _ = contribution_matrix()
+    version = catalogue_version()
+    # Cada gimnasio tiene su base: los ids de atleta se repiten entre ellas
+    using = using or router.db_for_read(WorkoutData)
+    # Tabla caliente y archivo, cada uno con su marca de última edición
+    sources = [
+        (model.objects.using(using).filter(
+            user_id__in=user_ids, planificado=False,
+            fecha__gte=week_start(desde), fecha__lte=hasta), editado)
+        for model, editado in ((WorkoutData, 'updated_at'),
+                               (ArchivedWorkoutData, 'archivado_en'))]
+
+    partes = {}
+    for workouts, editado in sources:
+        for user_id, semana, total, series, ultimo in (
+                workouts.annotate(semana=TruncWeek('fecha'))
+                .values('user_id', 'semana')
+                .annotate(total=Count('id'), series=Sum('sets'),
+                          ultimo=Max(editado))
+                .order_by()
+                .values_list('user_id', 'semana', 'total', 'series',
+                             'ultimo')):
+            partes.setdefault((user_id, semana), []).append(
+                f'{total}|{series}|{ultimo.isoformat()}')
+    huellas = {clave: '+'.join(parte) for clave, parte in partes.items()}
+    keys = {clave: _cache_key(using, *clave, version, huella)
+            for clave, huella in huellas.items()}
+    cached = cache.get_many(keys.values())
+
+    result = {}
+    missing = []
+    for clave, key in keys.items():
+        if key in cached:
+            result[clave] = cached[key]
+        else:
+            missing.append(clave)
+
+    if missing:
+        por_semana = {}
+        pendientes = {user_id for user_id, _ in missing}
+        for workouts, _ in sources:
+            for user_id, semana, exercise_id, series in (
+                    workouts.filter(user_id__in=pendientes,
+                                    fecha__gte=min(
+                                        semana for _, semana in missing))
+                    .annotate(semana=TruncWeek('fecha'))
+                    .values('user_id', 'semana', 'exercise_id')
+                    .annotate(series=Sum('sets'))
+                    .order_by()
+                    .values_list('user_id', 'semana', 'exercise_id',
+                                 'series')):
+                por_ejercicio = por_semana.setdefault((user_id, semana), {})
+                por_ejercicio[exercise_id] = \
+                    por_ejercicio.get(exercise_id, 0) + series
+        nuevos = {}
+        for clave in missing:
+            result[clave] = _volume_by_group(por_semana.get(clave, {}), filas)
+            nuevos[keys[clave]] = result[clave]
+        cache.set_many(
+            nuevos, settings.MUSCLE_VOLUME.get('cache_timeout', 604800))
+
+    volume = {}
+    for (user_id, semana), grupos in sorted(result.items()):
+        volume.setdefault(user_id, {})[semana] = grupos
+    return volume
+
+
+def roster_volume(user_ids, desde, hasta, using=None):
+    """ `weekly_volume` con los nombres de los grupos, listo para la API """
+    volume = weekly_volume(user_ids, desde, hasta, using=using)
+    _, grupos = contribution_matrix()
+    return [
+        {
+            'user_id': user_id,
+            'semanas': [
+                {
+                    'semana': semana.isoformat(),
+                    'grupos': [
+                        {'classification_id': grupo,
+                         'nombre': grupos.get(grupo, ''),
+                         'series': series}
+                        for grupo, series in sorted(
+                            por_grupo.items(), key=lambda item: -item[1])
+                    ],
+                }
+                for semana, por_grupo in semanas.items()
+            ],
+        }
+        for user_id, semanas in volume.items()
+    ]
@@ -0,0 +1,68 @@
+"""
+Prescripción de cargas: dado un usuario, un ejercicio, las repeticiones y
+el RPE objetivo, calcula el `peso` sugerido.
+
+Es la inversa de `WorkoutData.calcular_rm_sesion()`: buscamos el peso con
+el que el 1RM estimado de la sesión coincide con el 1RM actual del usuario:
+
+    rm = peso · (1 + f · (reps + 10 − rpe))  →  peso = rm / (1 + f · (reps + 10 − rpe))
+
+Una sesión completa (varios ejercicios × esquemas de series) se resuelve
+con dos consultas: ejercicios y últimos 1RM (`latest_rm_map`).
+"""
+from . import rpe_tables
+from .models import Exercise, UserExerciseRM, WorkoutData
+
+
+def round_to(value, incremento):
+    """ Redondea al incremento de carga disponible (p. ej. discos de 2.5 kg) """
+    return round(round(value / incremento) * incremento, 2)
+
+
+def prescribe(user_id, items, incremento=1, using=None):
+    """
+    `items` son diccionarios con `exercise_id`, `sets`, `reps` y `rpe`.
+    Devuelve una lista con el peso sugerido para cada uno, en el mismo
+    orden. Si el usuario no tiene 1RM para un ejercicio, `peso` es None.
+    """
+    items = list(items)
+    exercise_ids = {item['exercise_id'] for item in items}
+    exercises = Exercise.objects.using(using).in_bulk(exercise_ids)
+    rms = UserExerciseRM.latest_rm_map([user_id], exercise_ids, using=using)
+
+    # Coeficientes por ejercicio (1RM y factor), resueltos una sola vez
+    coeficientes = {}
+    for exercise_id, exercise in exercises.items():
+        tabla = rpe_tables.table_for(exercise)
+        coeficientes[exercise_id] = (
+            rms.get((user_id, exercise_id), 0),
+            tabla.factor(exercise.nivel_fatiga))
+
+    results = []
+    for item in items:
+        exercise = exercises[item['exercise_id']]
+        rm, factor = coeficientes[item['exercise_id']]
+        result = {
+            'exercise_id': item['exercise_id'],
+            'sets': item['sets'],
+            'reps': item['reps'],
+            'rpe': item['rpe'],
+            'rm': rm,
+            'peso': None,
+            'porcentaje_rm': None,
+            'rpe_estimado': None,
+        }
+        if rm:
+            peso = round_to(
+                rm / (1 + factor * (item['reps'] + 10 - item['rpe'])),
+                incremento)
+            # Comprobación hacia delante con las tablas de RPE
+            workout = WorkoutData(
+                exercise=exercise, peso=peso, reps=item['reps'],
+                sets=item['sets'])
+            result.update(
+                peso=peso,
+                porcentaje_rm=round(peso / rm * 100, 2),
+                rpe_estimado=workout.calcular_rpe(rm))
+        results.append(result)
+    return results
@@ -0,0 +1,177 @@
+"""
+Materialización de programas de entrenamiento.
+
+Expande un `TrainingProgram` (semanas × días × ejercicios) para un grupo de
+atletas en filas `WorkoutData` planificadas (`planificado=True`). El peso
+de cada serie sale del %1RM de la entrada y del 1RM actual del atleta; los
+1RM de todo el grupo se cargan en una consulta y las filas se insertan con
+un `INSERT` en `executemany` por lotes de atletas (como `recompute.py`,
+sin instanciar un modelo por fila).
+
+Sin 1RM no hay peso que planificar: esas entradas se omiten y se informan
+en `sin_rm`, como hace `prescriptions.py`.
+"""
+from datetime import timedelta
+
+from django.db import connections, router, transaction
+from django.db.models import Max
+from django.utils.timezone import now
+
+from .models import Exercise, UserExerciseRM, WorkoutData
+from .sync import record_change_rows
+
+# Métricas calculadas por `WorkoutData.aplicar_calculos()` (`total_reps` y
+# `carga` no se insertan: son columnas generadas por la base)
+METRIC_FIELDS = [
+    'intensidad_relativa',
+    'volumen_relativo',
+    'rpe_objetivo',
+    'rm_sesion',
+]
+# Columnas de cada fila insertada, en el orden de los parámetros
+INSERTED_FIELDS = [
+    'user', 'exercise', 'fecha', 'sets', 'reps', 'peso',
+    *METRIC_FIELDS,
+    'planificado', 'programa', 'updated_at',
+]
+
+
+def entry_date(fecha_inicio, entry):
+    """ Fecha de una entrada: la semana 1, día 1 cae en `fecha_inicio` """
+    return fecha_inicio + timedelta(weeks=entry.semana - 1, days=entry.dia - 1)
+
+
+def planned_load(peso_maximo_rm, porcentaje_rm):
+    """ Peso (kg enteros, como `WorkoutData.peso`) para un %1RM """
+    return int(round(peso_maximo_rm * porcentaje_rm / 100))
+
+
+def _delete_sql(connection, count):
+    meta = WorkoutData._meta
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * count)
+    return (f'DELETE FROM {quote(meta.db_table)} '
+            f'WHERE {quote(meta.pk.column)} IN ({placeholders})')
+
+
+def delete_planned(program, user_ids, using=None, batch_size=500):
+    """
+    Borra las series planificadas de un programa, registrando las bajas.
+    `WorkoutData` no tiene relaciones inversas, así que borramos con SQL
+    directo en lugar de cargar cada instancia para sus señales.
+    """
+    using = using or router.db_for_write(WorkoutData)
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        rows = list(WorkoutData.objects.using(using).filter(
+            programa=program, planificado=True, user_id__in=user_ids,
+        ).values_list('id', 'user_id'))
+        with connection.cursor() as cursor:
+            for offset in range(0, len(rows), batch_size):
+                ids = [pk for pk, _ in rows[offset:offset + batch_size]]
+                cursor.execute(_delete_sql(connection, len(ids)), ids)
+        record_change_rows(WorkoutData, rows, 'delete', using=using)
+    return len(rows)
+
+
+def _insert_sql(connection):
+    """ `INSERT` parametrizado de una serie planificada """
+    meta = WorkoutData._meta
+    quote = connection.ops.quote_name
+    columns = [meta.get_field(name).column for name in INSERTED_FIELDS]
+    return (f'INSERT INTO {quote(meta.db_table)} '
+            f'({", ".join(quote(column) for column in columns)}) '
+            f'VALUES ({", ".join(["%s"] * len(columns))})')
+
+
+class _MetricsCache:
+    """
+    Métricas de una entrada para un 1RM dado, calculadas con
+    `WorkoutData.aplicar_calculos()` sobre una instancia reutilizada.
+    Los atletas con el mismo 1RM comparten el resultado.
+    """
+
+    def __init__(self, exercises):
+        self.exercises = exercises
+        self.workout = WorkoutData()
+        self.cache = {}
+
+    def get(self, entry, rm, peso):
+        key = (entry.pk, rm)
+        if key not in self.cache:
+            workout = self.workout
+            workout.exercise = self.exercises[entry.exercise_id]
+            workout.sets, workout.reps, workout.peso = \
+                entry.sets, entry.reps, peso
+            # `aplicar_calculos` solo rellena `volumen_relativo` si hay datos
+            workout.volumen_relativo = 0.0
+            workout.aplicar_calculos(rm)
+            self.cache[key] = tuple(
+                getattr(workout, field) for field in METRIC_FIELDS)
+        return self.cache[key]
+
+
+def materialize_program(program, user_ids, fecha_inicio, reemplazar=False,
+                        users_per_batch=50, using=None, progress=None):
+    """
+    Crea las series planificadas de `program` para `user_ids` empezando en
+    `fecha_inicio`. Con `reemplazar` borra antes las series planificadas
+    de ese programa para esos atletas. Devuelve `{'creadas': n, 'sin_rm':
+    [{'user_id': ..., 'exercise_ids': [...]}, ...]}` con los ejercicios que
+    se omitieron por no tener 1RM.
+    """
+    using = using or router.db_for_write(WorkoutData)
+    connection = connections[using]
+    user_ids = sorted(set(user_ids))
+    entries = list(program.entradas.using(using).all())
+    exercises = Exercise.objects.using(using).in_bulk(
+        {entry.exercise_id for entry in entries})
+    rms = UserExerciseRM.latest_rm_map(user_ids, exercises, using=using)
+    fechas = [connection.ops.adapt_datefield_value(entry_date(fecha_inicio, entry))
+              for entry in entries]
+    metrics = _MetricsCache(exercises)
+    sql = _insert_sql(connection)
+
+    if reemplazar:
+        delete_planned(program, user_ids, using=using)
+
+    created = 0
+    sin_rm = {}
+    for offset in range(0, len(user_ids), users_per_batch):
+        batch = user_ids[offset:offset + users_per_batch]
+        updated_at = connection.ops.adapt_datetimefield_value(now())
+        params = []
+        for user_id in batch:
+            for entry, fecha in zip(entries, fechas):
+                rm = rms.get((user_id, entry.exercise_id), 0)
+                if not rm:
+                    sin_rm.setdefault(user_id, set()).add(entry.exercise_id)
+                    continue
+                peso = planned_load(rm, entry.porcentaje_rm)
+                params.append((
+                    user_id, entry.exercise_id, fecha, entry.sets,
+                    entry.reps, peso, *metrics.get(entry, rm, peso),
+                    True, program.pk, updated_at))
+
+        if params:
+            with transaction.atomic(using=using):
+                planned = WorkoutData.objects.using(using).filter(
+                    programa=program, planificado=True, user_id__in=batch)
+                last_id = planned.aggregate(last=Max('id'))['last'] or 0
+                with connection.cursor() as cursor:
+                    cursor.executemany(sql, params)
+                # Ids asignados por la base, para el registro de sincronización
+                record_change_rows(
+                    WorkoutData,
+                    list(planned.filter(id__gt=last_id).values_list(
+                        'id', 'user_id')),
+                    'upsert', using=using)
+        created += len(params)
+        if progress is not None:
+            progress(offset + len(batch), len(user_ids))
+    return {
+        'creadas': created,
+        'sin_rm': [
+            {'user_id': user_id, 'exercise_ids': sorted(exercise_ids)}
+            for user_id, exercise_ids in sorted(sin_rm.items())],
+    }
@@ -0,0 +1,189 @@
+"""
+Guardas de rendimiento de consultas para desarrollo y CI.
+
+- Detección de N+1: con `N_PLUS_ONE_DETECTION['mode']` en `log` o `raise`,
+  `NPlusOneMiddleware` cuenta las consultas de cada petición por su "forma"
+  (el SQL con los parámetros ya separados y las listas `IN (...)` plegadas).
+  Si una misma forma se repite `threshold` veces se registra un aviso con la
+  pila de llamadas o se lanza `NPlusOneError`. `detect_n_plus_one()` aplica
+  lo mismo a cualquier bloque (scripts, comandos, el shell).
+- Conteo por petición: con `QUERY_COUNT_HEADER`, `QueryCountMiddleware`
+  añade la cabecera `X-DB-Queries` (la usa `benchmarks/loadtest.py`).
+- Planes de consulta: `check_query_plans()` ejecuta `EXPLAIN` sobre las
+  consultas calientes (`HOT_QUERIES`) y señala las que dejan de usar un
+  índice (`manage.py check_query_plans`).
+"""
+import logging
+import re
+import traceback
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections, transaction
+from django.db.models import Q
+
+from .models import ChangeLog, UserExerciseRM, WorkoutData
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+class NPlusOneError(Exception):
+    """ Una consulta con la misma forma se repitió demasiadas veces """
+
+
+def query_shape(sql):
+    """ SQL normalizado: `IN (%s, %s, ...)` cuenta como una sola forma """
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+# 📌 1️⃣ Detección de N+1
+class QueryShapeCounter:
+    """ `execute_wrapper` que cuenta consultas por forma y avisa al repetirse """
+
+    def __init__(self, threshold=5, mode='log'):
+        self.threshold = threshold
+        self.mode = mode
+        self.counts = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # `executemany` es una sola llamada a la base: no es un N+1
+        if not many:
+            shape = query_shape(sql)
+            self.counts[shape] += 1
+            if self.counts[shape] == self.threshold:
+                self.report(shape)
+        return execute(sql, params, many, context)
+
+    def report(self, shape):
+        stack = ''.join(traceback.format_stack(limit=25)[:-2])
+        message = (f"Posible N+1: {self.threshold} consultas con la misma "
+                   f"forma:\n    {shape}\n{stack}")
+        if self.mode == 'raise':
+            raise NPlusOneError(message)
+        logger.warning(message)
+
+
+@contextmanager
+def detect_n_plus_one(threshold=None, mode=None):
+    """ Vigila todas las conexiones durante el bloque """
+    config = settings.N_PLUS_ONE_DETECTION
+    counter = QueryShapeCounter(
+        threshold=threshold or config.get('threshold', 5),
+        mode=mode or config.get('mode', 'log'))
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        yield counter
+
+
+class NPlusOneMiddleware:
+    """ Aplica `detect_n_plus_one()` a cada petición (solo si está activo) """
+
+    def __init__(self, get_response):
+        if settings.N_PLUS_ONE_DETECTION.get('mode', 'off') == 'off':
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with detect_n_plus_one():
+            return self.get_response(request)
+
+
+class QueryCountMiddleware:
+    """ Devuelve en `X-DB-Queries` cuántas consultas hizo la petición """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_COUNT_HEADER:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        count = 0
+
+        def counter(execute, sql, params, many, context):
+            nonlocal count
+            count += 1
+            return execute(sql, params, many, context)
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        response['X-DB-Queries'] = str(count)
+        return response
+
+
+# 📌 2️⃣ Planes de las consultas calientes
+# Valor cualquiera para los filtros por fecha (el plan no depende de él)
+_ANY_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+# (nombre, queryset, ¿debe salir ordenada del índice?)
+HOT_QUERIES = [
+    ('latest_rm',
+     lambda: UserExerciseRM.objects.filter(
+         user_id=1, exercise_id=1).order_by('-fecha_registro')[:1],
+     True),
+    ('latest_rm_map',
+     lambda: UserExerciseRM.objects.filter(
+         user_id__in=[1, 2], exercise_id__in=[1, 2]).order_by(
+         '-fecha_registro', '-id').values_list(
+         'user_id', 'exercise_id', 'peso_maximo_rm'),
+     False),
+    ('latest_workout',
+     lambda: WorkoutData.objects.filter(user_id=1).order_by('-fecha')[:1],
+     True),
+    ('user_workouts',
+     lambda: WorkoutData.objects.filter(user_id=1).select_related(
+         'user', 'exercise__classification').order_by('-fecha', '-id'),
+     True),
+    ('user_rms',
+     lambda: UserExerciseRM.objects.filter(user_id=1),
+     False),
+    ('sync_changes',
+     lambda: ChangeLog.objects.filter(
+         Q(fecha__gt=_ANY_DATE) | Q(fecha=_ANY_DATE, id__gt=0),
+         usuario_id=1, fecha__lte=_ANY_DATE).order_by('fecha', 'id')[:1000],
+     True),
+]
+
+# Pasos del plan que indican que no se usó un índice, por motor
+_FULL_SCAN = {
+    'sqlite': re.compile(r'\bSCAN (?!CONSTANT ROW)'),
+    'postgresql': re.compile(r'Seq Scan'),
+}
+_SORT = {
+    'sqlite': re.compile(r'USE TEMP B-TREE FOR (ORDER BY|LAST TERM)'),
+    'postgresql': re.compile(r'\bSort\b'),
+}
+
+
+def check_query_plans(using='default'):
+    """
+    Devuelve `[(nombre, plan, problemas)]` para cada consulta caliente.
+    `problemas` está vacío si el plan usa índices como se espera.
+    """
+    connection = connections[using]
+    full_scan = _FULL_SCAN.get(connection.vendor)
+    sort = _SORT.get(connection.vendor)
+    results = []
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql':
+            # Con tablas pequeñas PostgreSQL prefiere recorrerlas enteras;
+            # así comprobamos que el índice existe y es utilizable.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('SET LOCAL enable_sort = off')
+        for name, build, sorted_by_index in HOT_QUERIES:
+            plan = build().using(using).explain()
+            problems = []
+            if full_scan and full_scan.search(plan):
+                problems.append("recorre la tabla completa (sin índice)")
+            if sorted_by_index and sort and sort.search(plan):
+                problems.append("ordena en memoria en lugar de usar el índice")
+            results.append((name, plan, problems))
+    return results
@@ -0,0 +1,149 @@
+"""
+Recálculo masivo de métricas de `WorkoutData`, en paralelo por atleta.
+
+Los usuarios se reparten en shards equilibrados por número de
+entrenamientos. Cada proceso carga en bloque los 1RM y entrenamientos de
+su shard, calcula en memoria con `WorkoutData.aplicar_calculos()` y
+escribe por lotes con un `UPDATE ... WHERE id = %s` en `executemany`
+(`bulk_update` dedica la mayor parte del tiempo a construir sus `CASE`).
+Las escrituras se serializan con un lock
+compartido para no competir por el bloqueo de SQLite mientras los demás
+procesos siguen calculando.
+
+La base se resuelve una vez con el router (la del gimnasio de la tarea,
+si se encola desde uno) y se pasa a cada shard: los procesos hijo no
+heredan el gimnasio del contexto.
+"""
+import heapq
+import os
+import time
+from contextlib import nullcontext
+
+from django.db import connections, router, transaction
+from django.db.models import Count
+from django.utils.timezone import now
+
+from . import fitness
+from .models import Exercise, UserExerciseRM, WorkoutData
+from .sync import record_changes
+
+# `total_reps` y `carga` son columnas generadas: las recalcula la base
+RECOMPUTED_FIELDS = [
+    'intensidad_relativa',
+    'volumen_relativo',
+    'rpe_objetivo',
+    'rm_sesion',
+]
+
+
+def shard_users(shards, using=None):
+    """ Reparte los usuarios en `shards` grupos con carga similar """
+    using = using or router.db_for_write(WorkoutData)
+    counts = (
+        WorkoutData.objects.using(using).values('user_id')
+        .annotate(total=Count('id')).order_by('-total')
+        .values_list('user_id', 'total'))
+    heap = [(0, index, []) for index in range(shards)]
+    for user_id, total in counts:
+        load, index, users = heapq.heappop(heap)
+        users.append(user_id)
+        heapq.heappush(heap, (load + total, index, users))
+    return [users for _, _, users in sorted(heap, key=lambda s: s[1]) if users]
+
+
+def _update_sql(connection):
+    """ `UPDATE` parametrizado de los campos recalculados (+ `updated_at`) """
+    meta = WorkoutData._meta
+    quote = connection.ops.quote_name
+    columns = [meta.get_field(name).column
+               for name in RECOMPUTED_FIELDS + ['updated_at']]
+    assignments = ', '.join(f'{quote(column)} = %s' for column in columns)
+    return (f'UPDATE {quote(meta.db_table)} SET {assignments} '
+            f'WHERE {quote(meta.pk.column)} = %s')
+
+
+def bulk_write(workouts, using=None):
+    """ Escribe los campos recalculados de una lista de entrenamientos """
+    connection = connections[using or router.db_for_write(WorkoutData)]
+    updated_at = now()
+    params = []
+    for workout in workouts:
+        workout.updated_at = updated_at
+        params.append([
+            getattr(workout, field) for field in RECOMPUTED_FIELDS
+        ] + [connection.ops.adapt_datetimefield_value(updated_at), workout.pk])
+    with connection.cursor() as cursor:
+        cursor.executemany(_update_sql(connection), params)
+
+
+def recompute_shard(user_ids, batch_size=2000, write_lock=None, using=None):
+    """ Recalcula los entrenamientos de un grupo de usuarios. Devuelve (filas, actualizadas) """
+    using = using or router.db_for_write(WorkoutData)
+    exercises = Exercise.objects.using(using).in_bulk()
+    rms = UserExerciseRM.latest_rm_map(user_ids, exercises, using=using)
+    workouts = WorkoutData.objects.using(using).filter(
+        user_id__in=user_ids).only(
+        'id', 'user_id', 'exercise_id', 'sets', 'reps', 'peso',
+        *RECOMPUTED_FIELDS)
+
+    processed = 0
+    changed = []
+    for workout in workouts.iterator(chunk_size=batch_size):
+        processed += 1
+        before = [getattr(workout, field) for field in RECOMPUTED_FIELDS]
+        workout.exercise = exercises[workout.exercise_id]
+        workout.aplicar_calculos(
+            rms.get((workout.user_id, workout.exercise_id), 0))
+        if before != [getattr(workout, field) for field in RECOMPUTED_FIELDS]:
+            changed.append(workout)
+
+    for offset in range(0, len(changed), batch_size):
+        batch = changed[offset:offset + batch_size]
+        with write_lock or nullcontext(), transaction.atomic(using=using):
+            bulk_write(batch, using=using)
+            record_changes(WorkoutData, batch, 'upsert', using=using)
+    return processed, len(changed)
+
+
+def recompute_all(processes=1, shards=None, batch_size=2000, using=None):
+    """
+    Recalcula todas las métricas de la base `using` (la del router por
+    defecto) con `processes` procesos y, si algo cambió, el modelo
+    fitness–fatiga. Devuelve un resumen con filas procesadas, actualizadas
+    y filas por segundo.
+    """
+    start = time.perf_counter()
+    using = using or router.db_for_write(WorkoutData)
+    groups = shard_users(shards or processes, using=using)
+
+    if processes <= 1:
+        results = [recompute_shard(users, batch_size, using=using)
+                   for users in groups]
+    else:
+        import multiprocessing
+        from .workers import init_recompute_worker, recompute_shard_job
+
+        context = multiprocessing.get_context('spawn')
+        lock = context.Lock()
+        with context.Pool(
+                processes,
+                initializer=init_recompute_worker,
+                initargs=(os.environ['DJANGO_SETTINGS_MODULE'], lock)) as pool:
+            results = pool.starmap(
+                recompute_shard_job,
+                [(users, batch_size, using) for users in groups])
+
+    seconds = time.perf_counter() - start
+    processed = sum(rows for rows, _ in results)
+    updated = sum(changed for _, changed in results)
+    if updated:
+        # Los impulsos salen de `volumen_relativo`, que acaba de cambiar
+        fitness.rebuild_fitness(using=using)
+    return {
+        'procesos': processes,
+        'base': using,
+        'filas': processed,
+        'actualizadas': updated,
+        'segundos': round(seconds, 3),
+        'filas_por_segundo': round(processed / seconds) if seconds else 0,
+    }
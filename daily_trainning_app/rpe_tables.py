@@ -0,0 +1,151 @@
+"""
+Tablas de coeficientes para estimar RPE y 1RM.
+
+Los valores por defecto están en `settings.RPE_TABLES` y se pueden
+sobrescribir por clasificación o por ejercicio con el modelo `RPETable`
+(orden de prioridad: ejercicio > clasificación > settings). Cada
+combinación se compila una vez en un array denso indexado por el %1RM con
+resolución de `RPE_TABLES['resolucion']` (0.1 %), así cada estimación es
+una indexación O(1) en lugar de buscar la clave más cercana.
+
+Las tablas se recompilan al guardar/borrar un `RPETable` (señales) y, para
+cambios hechos desde otros procesos, comprobando la huella de la tabla cada
+`RPE_TABLES['recarga_segundos']`.
+"""
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Count, Max
+
+# Campos de `RPETable` que contienen coeficientes
+TABLE_FIELDS = ('rir_por_porcentaje', 'ajuste_fatiga', 'factores_ajuste')
+
+
+class CompiledTable:
+    """ Coeficientes ya resueltos para un ejercicio o clasificación """
+
+    def __init__(self, rir_por_porcentaje, ajuste_fatiga, factores_ajuste,
+                 resolucion=0.1, porcentaje_maximo=150):
+        self.ajuste_fatiga = {
+            nivel: float(valor) for nivel, valor in ajuste_fatiga.items()}
+        self.factores_ajuste = {
+            nivel: float(valor) for nivel, valor in factores_ajuste.items()}
+        self.pasos = 1 / resolucion
+
+        # Conservamos el orden de las claves: en un empate gana la primera,
+        # igual que la búsqueda `min()` que reemplaza esta tabla.
+        puntos = [(float(porcentaje), rir)
+                  for porcentaje, rir in rir_por_porcentaje.items()]
+        size = int(round(porcentaje_maximo * self.pasos)) + 1
+        self.rir = [
+            min(puntos, key=lambda punto: abs(punto[0] - index / self.pasos))[1]
+            for index in range(size)
+        ]
+        self._ultimo = size - 1
+
+    def reps_en_reserva(self, porcentaje_rm):
+        """ RIR para un %1RM (por encima del máximo se usa el último valor) """
+        index = int(porcentaje_rm * self.pasos)
+        if index >= self._ultimo:
+            return self.rir[self._ultimo]
+        return self.rir[index]
+
+    def fatiga(self, nivel_fatiga):
+        return self.ajuste_fatiga.get(nivel_fatiga, 1.0)
+
+    def factor(self, nivel_fatiga):
+        return self.factores_ajuste.get(nivel_fatiga, 0.028)  # Default: Medio
+
+
+class TableRegistry:
+    """ Tablas compiladas por ejercicio y clasificación, con recarga en caliente """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._fingerprint = None
+        self._next_check = 0.0
+        self._default = None
+        self._by_exercise = {}
+        self._by_classification = {}
+
+    # 📌 1️⃣ Resolución
+    def for_exercise(self, exercise):
+        """ Devuelve la tabla aplicable a un ejercicio (sin consultas extra) """
+        self._ensure_loaded()
+        table = self._by_exercise.get(exercise.id)
+        if table is None:
+            table = self._by_classification.get(
+                exercise.classification_id, self._default)
+        return table
+
+    # 📌 2️⃣ Compilación
+    def _ensure_loaded(self):
+        if time.monotonic() < self._next_check:
+            return
+        with self._lock:
+            if time.monotonic() < self._next_check:
+                return
+            fingerprint = self._current_fingerprint()
+            if not self._loaded or fingerprint != self._fingerprint:
+                self._compile(fingerprint)
+            self._next_check = time.monotonic() + \
+                settings.RPE_TABLES.get('recarga_segundos', 30)
+
+    def _current_fingerprint(self):
+        RPETable = apps.get_model('daily_trainning_app', 'RPETable')
+        summary = RPETable.objects.aggregate(
+            total=Count('id'), ultimo=Max('updated_at'))
+        return summary['total'], summary['ultimo']
+
+    def _compile(self, fingerprint):
+        RPETable = apps.get_model('daily_trainning_app', 'RPETable')
+        config = settings.RPE_TABLES
+        base = {field: dict(config[field]) for field in TABLE_FIELDS}
+        options = {
+            'resolucion': config.get('resolucion', 0.1),
+            'porcentaje_maximo': config.get('porcentaje_maximo', 150),
+        }
+
+        overrides = list(RPETable.objects.values(
+            'exercise_id', 'exercise__classification_id',
+            'classification_id', *TABLE_FIELDS))
+        by_classification = {
+            row['classification_id']: row for row in overrides
+            if row['classification_id'] is not None}
+
+        def merge(*rows):
+            # Una tabla vacía en el override hereda la del nivel anterior
+            tables = dict(base)
+            for row in rows:
+                for field in TABLE_FIELDS:
+                    if row and row[field]:
+                        tables[field] = row[field]
+            return CompiledTable(**tables, **options)
+
+        self._default = merge()
+        self._by_classification = {
+            classification_id: merge(row)
+            for classification_id, row in by_classification.items()}
+        self._by_exercise = {
+            row['exercise_id']: merge(
+                by_classification.get(row['exercise__classification_id']),
+                row)
+            for row in overrides if row['exercise_id'] is not None}
+        self._fingerprint = fingerprint
+        self._loaded = True
+
+    def invalidate(self):
+        """ Fuerza la recompilación en la próxima estimación """
+        with self._lock:
+            self._loaded = False
+            self._next_check = 0.0
+
+
+registry = TableRegistry()
+
+
+table_for = registry.for_exercise
+invalidate = registry.invalidate
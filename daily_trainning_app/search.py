@@ -0,0 +1,140 @@
+"""
+Búsqueda de ejercicios y usuarios insensible a acentos y tolerante a errores.
+
+Cada objeto se indexa como el conjunto de trigramas de su texto normalizado
+(`normalize_text` + sin acentos + minúsculas) en `SearchTrigram`. Una
+búsqueda cuenta cuántos trigramas de la consulta comparte cada objeto
+usando el índice `(tipo, trigrama)`, en vez de un `LIKE '%...%'`.
+"""
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Count, OuterRef, Subquery
+
+from .models import Exercise, SearchTrigram, User, normalize_text
+
+SEARCH_MODELS = {
+    'exercise': Exercise,
+    'user': User,
+}
+
+
+def search_key(value):
+    """ Normaliza un texto para indexarlo: sin acentos, en minúsculas """
+    value = normalize_text(value or '')
+    value = unicodedata.normalize('NFKD', value)
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return value.lower()
+
+
+def trigrams(value):
+    """ Trigramas de cada palabra, con relleno como `pg_trgm` ("  pa", " pal"...) """
+    grams = set()
+    for word in re.findall(r'\w+', search_key(value)):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def search_text(instance):
+    """ Texto indexado para cada tipo de objeto """
+    if isinstance(instance, Exercise):
+        return f"{instance.nombre} {instance.descripcion}"
+    return f"{instance.nombre} {instance.email}"
+
+
+def _tipo(instance):
+    for tipo, model in SEARCH_MODELS.items():
+        if isinstance(instance, model):
+            return tipo
+    raise ValueError(f"{type(instance).__name__} no se indexa.")
+
+
+def index_objects(objects, using=None):
+    """ (Re)indexa objetos del mismo tipo """
+    objects = list(objects)
+    if not objects:
+        return
+    tipo = _tipo(objects[0])
+    using = using or router.db_for_write(SearchTrigram)
+    with transaction.atomic(using=using):
+        SearchTrigram.objects.using(using).filter(
+            tipo=tipo, objeto_id__in=[obj.pk for obj in objects]).delete()
+        SearchTrigram.objects.using(using).bulk_create(
+            [SearchTrigram(tipo=tipo, objeto_id=obj.pk, trigrama=gram)
+             for obj in objects for gram in trigrams(search_text(obj))],
+            batch_size=1000)
+
+
+def unindex_object(instance, using=None):
+    SearchTrigram.objects.using(using).filter(
+        tipo=_tipo(instance), objeto_id=instance.pk).delete()
+
+
+def rebuild_index(using=None, batch_size=1000):
+    """ Reconstruye el índice completo (tras cargas con `bulk_create`) """
+    using = using or router.db_for_write(SearchTrigram)
+    SearchTrigram.objects.using(using).all().delete()
+    for model in SEARCH_MODELS.values():
+        queryset = model.objects.using(using).order_by('pk')
+        batch = []
+        for obj in queryset.iterator(chunk_size=batch_size):
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                index_objects(batch, using=using)
+                batch = []
+        index_objects(batch, using=using)
+
+
+def _matches(tipo, query, using=None):
+    """
+    Objetos que comparten suficientes trigramas con la consulta, con
+    `objeto_id` y `hits`; None si la consulta no tiene trigramas.
+    """
+    grams = trigrams(query)
+    if not grams:
+        return None
+    min_hits = max(1, round(len(grams) * settings.SEARCH_MIN_SIMILARITY))
+    return (
+        SearchTrigram.objects.using(using)
+        .filter(tipo=tipo, trigrama__in=grams)
+        .values('objeto_id')
+        .annotate(hits=Count('id'))
+        .filter(hits__gte=min_hits)
+    )
+
+
+def search_ids(tipo, query, limit=None, using=None):
+    """
+    Ids de objetos que comparten suficientes trigramas con la consulta,
+    ordenados del más al menos parecido (los `limit` primeros, si se pide).
+    """
+    matches = _matches(tipo, query, using=using)
+    if matches is None:
+        return []
+    ids = matches.order_by('-hits', 'objeto_id').values_list(
+        'objeto_id', flat=True)
+    if limit is not None:
+        ids = ids[:limit]
+    return list(ids)
+
+
+def filter_by_search(queryset, tipo, query, limit=None):
+    """
+    Filtra un queryset por la búsqueda, ordenado por relevancia. Sin
+    `limit` devuelve todas las coincidencias (la API las pagina o las sirve
+    enteras); el admin pide solo las más parecidas.
+    """
+    matches = _matches(tipo, query, using=queryset.db)
+    if matches is None:
+        return queryset.none()
+    if limit is None:
+        ids = matches.values('objeto_id')
+    else:
+        ids = search_ids(tipo, query, limit=limit, using=queryset.db)
+    hits = matches.filter(objeto_id=OuterRef('pk')).values('hits')
+    return (queryset.filter(pk__in=ids)
+            .annotate(search_hits=Subquery(hits))
+            .order_by('-search_hits', 'pk'))
@@ -0,0 +1,101 @@
+from functools import partial
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import fitness, live_feed, rpe_tables
+from .compression import bump_catalogue_version
+from .models import (
+    Classification, Exercise, ExerciseContribution, RPETable, User,
+    UserExerciseRM, WorkoutData
+)
+from .search import index_objects, unindex_object
+from .sync import is_suppressed, record_change
+
+
+@receiver(post_save, sender=WorkoutData)
+@receiver(post_save, sender=UserExerciseRM)
+def log_sync_upsert(sender, instance, using, raw=False, **kwargs):
+    """ Registra altas y ediciones para la sincronización incremental """
+    if not raw:
+        record_change(instance, 'upsert', using=using)
+
+
+@receiver(post_save, sender=WorkoutData)
+def publish_live_workout(sender, instance, created, using, raw=False, **kwargs):
+    """
+    Publica las series nuevas en el feed en vivo, una vez confirmadas. Las
+    planificadas no se emiten (igual que en el backlog de `Last-Event-ID`).
+    """
+    if (created and not raw and not instance.planificado
+            and live_feed.broker.has_subscribers()):
+        transaction.on_commit(partial(live_feed.publish, [instance]), using=using)
+
+
+@receiver(post_save, sender=WorkoutData)
+@receiver(post_delete, sender=WorkoutData)
+def update_fitness_state(sender, instance, using, raw=False, **kwargs):
+    """
+    Recalcula el modelo fitness–fatiga de los días afectados: el de la
+    serie si cuenta (no planificada) y el que tenía al cargarse si contaba,
+    aunque la edición la haya convertido en planificada.
+    """
+    if raw or is_suppressed():
+        return
+    rows = []
+    if not instance.planificado:
+        rows.append((instance.user_id, instance.fecha))
+    guardado = getattr(instance, '_guardado', None)
+    if guardado and None not in guardado and not guardado[2] and \
+            guardado[:2] not in rows:
+        rows.append(guardado[:2])
+    if rows:
+        fitness.mark_changed(rows, using=using)
+    # Las siguientes ediciones de la misma instancia parten de lo guardado
+    instance._guardado = (
+        instance.user_id, instance.fecha, instance.planificado)
+
+
+@receiver(post_delete, sender=WorkoutData)
+@receiver(post_delete, sender=UserExerciseRM)
+def log_sync_delete(sender, instance, using, **kwargs):
+    """ Registra bajas (tombstones) para la sincronización incremental """
+    record_change(instance, 'delete', using=using)
+
+
+@receiver(post_save, sender=Exercise)
+@receiver(post_save, sender=User)
+def update_search_index(sender, instance, using, **kwargs):
+    """ Mantiene sincronizado el índice de búsqueda por trigramas """
+    index_objects([instance], using=using)
+
+
+@receiver(post_delete, sender=Exercise)
+@receiver(post_delete, sender=User)
+def remove_from_search_index(sender, instance, using, **kwargs):
+    unindex_object(instance, using=using)
+
+
+@receiver(post_save, sender=RPETable)
+@receiver(post_delete, sender=RPETable)
+@receiver(post_save, sender=Exercise)
+def reload_rpe_tables(sender, **kwargs):
+    """ Recompila las tablas de RPE (un ejercicio puede cambiar de clasificación) """
+    rpe_tables.invalidate()
+
+
+@receiver(post_save, sender=Exercise)
+@receiver(post_delete, sender=Exercise)
+@receiver(post_save, sender=Classification)
+@receiver(post_delete, sender=Classification)
+@receiver(post_save, sender=ExerciseContribution)
+@receiver(post_delete, sender=ExerciseContribution)
+def invalidate_catalogue_cache(sender, using, **kwargs):
+    """
+    Las listas precomprimidas del catálogo, la matriz de volumen por grupo
+    muscular y las copias de cada gimnasio dejan de ser válidas. Solo
+    cuenta la base común: las copias se actualizan desde ella.
+    """
+    if using == DEFAULT_DB_ALIAS:
+        bump_catalogue_version()
@@ -0,0 +1,153 @@
+"""
+Registro de cambios para la sincronización incremental de clientes offline.
+
+Cada alta, edición o baja de `WorkoutData` y `UserExerciseRM` deja una
+entrada en `ChangeLog` con la hora (`fecha`) en que se escribió.
+
+El `id` autoincremental no sirve de cursor: en PostgreSQL (o con varios
+procesos escribiendo) una transacción puede confirmar después de otra que
+obtuvo un `id` mayor, y el cliente se saltaría sus cambios. El token es el
+par `(fecha, id)` de la última entrada servida y solo se sirven entradas
+con más de `SYNC_SETTLE_SECONDS` de antigüedad: para entonces la
+transacción que las escribió ya ha confirmado (o se ha deshecho), así que
+no puede aparecer después ninguna entrada anterior al token. El margen
+debe superar la transacción más larga que registre cambios.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Q
+from django.utils.timezone import now
+
+from .models import ChangeLog, UserExerciseRM, WorkoutData
+
+# Modelos sincronizados: nombre en el log → modelo
+SYNC_MODELS = {
+    'workoutdata': WorkoutData,
+    'userexerciserm': UserExerciseRM,
+}
+
+_suppressed = ContextVar('change_log_suppressed', default=False)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+@contextmanager
+def change_log_suppressed():
+    """ Desactiva el registro (p. ej. al mover filas al archivo) """
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
+
+def is_suppressed():
+    """ ¿Está activo `change_log_suppressed()` en el contexto actual? """
+    return _suppressed.get()
+
+
+def record_change(instance, accion, using=None):
+    """ Registra un cambio de una instancia sincronizada """
+    record_changes(type(instance), [instance], accion, using=using)
+
+
+def record_changes(model, objects, accion, using=None):
+    """
+    Registra cambios en bloque. Las operaciones `bulk_create`/`bulk_update`
+    no disparan señales, así que quien las use debe llamar a esta función.
+    """
+    record_change_rows(
+        model, [(obj.pk, obj.user_id) for obj in objects], accion,
+        using=using)
+
+
+def _insert_sql(connection):
+    """ `INSERT` parametrizado de una entrada del log """
+    meta = ChangeLog._meta
+    quote = connection.ops.quote_name
+    columns = ', '.join(
+        quote(meta.get_field(name).column)
+        for name in ('modelo', 'objeto_id', 'usuario_id', 'accion', 'fecha'))
+    return (f'INSERT INTO {quote(meta.db_table)} ({columns}) '
+            f'VALUES (%s, %s, %s, %s, %s)')
+
+
+def record_change_rows(model, rows, accion, using=None):
+    """
+    Igual que `record_changes`, a partir de pares `(objeto_id, usuario_id)`.
+    Inserta con `executemany` (sin instanciar un `ChangeLog` por fila).
+    """
+    if _suppressed.get() or not rows:
+        return
+    connection = connections[using or router.db_for_write(ChangeLog)]
+    modelo = model._meta.model_name
+    fecha = connection.ops.adapt_datetimefield_value(now())
+    with connection.cursor() as cursor:
+        cursor.executemany(_insert_sql(connection), [
+            (modelo, objeto_id, usuario_id, accion, fecha)
+            for objeto_id, usuario_id in rows])
+
+
+# 📌 Tokens de sincronización
+def make_token(fecha, entry_id):
+    """ Token opaco `<microsegundos>-<id>` de una entrada del log """
+    return f'{(fecha - _EPOCH) // timedelta(microseconds=1)}-{entry_id}'
+
+
+def parse_token(token, using=None):
+    """
+    `(fecha, id)` de un token, o `None` para sincronizar desde el principio.
+    Los tokens antiguos (solo el `id`) se traducen con la `fecha` de esa
+    entrada. Un token mal formado es `ValueError`.
+    """
+    if not token or token == '0':
+        return None
+    micros, separator, entry_id = token.partition('-')
+    if separator:
+        return _EPOCH + timedelta(microseconds=int(micros)), int(entry_id)
+    entry_id = int(token)
+    if entry_id < 0:
+        raise ValueError(token)
+    fecha = (ChangeLog.objects.using(using).filter(id__lte=entry_id)
+             .order_by('-id').values_list('fecha', flat=True).first())
+    return (fecha, entry_id) if fecha is not None else None
+
+
+def changes_since(token, limit, usuario_id=None, using=None):
+    """
+    Devuelve `(cambios, siguiente_token, hay_mas)`.
+
+    `cambios` agrupa por modelo los ids creados/actualizados y borrados,
+    quedándose solo con la última acción de cada objeto dentro de la página.
+    """
+    cursor = parse_token(token, using=using)
+    settled = now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    entries = ChangeLog.objects.using(using).filter(fecha__lte=settled)
+    if cursor is not None:
+        fecha, entry_id = cursor
+        entries = entries.filter(
+            Q(fecha__gt=fecha) | Q(fecha=fecha, id__gt=entry_id))
+    if usuario_id is not None:
+        entries = entries.filter(usuario_id=usuario_id)
+    rows = list(entries.order_by('fecha', 'id').values_list(
+        'id', 'fecha', 'modelo', 'objeto_id', 'accion')[:limit + 1])
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    latest = {}
+    for _, _, modelo, objeto_id, accion in rows:
+        latest[(modelo, objeto_id)] = accion
+
+    changes = {modelo: {'upsert': [], 'delete': []} for modelo in SYNC_MODELS}
+    for (modelo, objeto_id), accion in latest.items():
+        if modelo in changes:
+            changes[modelo][accion].append(objeto_id)
+
+    next_token = make_token(rows[-1][1], rows[-1][0]) if rows else \
+        (token or '0')
+    return changes, next_token, has_more
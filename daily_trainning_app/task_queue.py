@@ -0,0 +1,180 @@
+"""
+Cola de tareas en segundo plano respaldada por la tabla `Task`.
+
+Las funciones se registran con `@task` (ver `tasks.py`), se encolan con
+`enqueue()` y las ejecuta `manage.py run_workers`. Cada tarea recibe un
+callback `progress(fraccion, mensaje)` para informar de su avance y se
+ejecuta contra la base del gimnasio desde el que se encoló.
+
+Un worker que muere a mitad de una tarea la deja en `running`: pasado
+`TASK_QUEUE['lease_seconds']` desde `iniciado_en`, `claim_next()` la
+devuelve a `pending` (o la marca `failed` si ya agotó sus intentos). El
+plazo debe superar la duración de la tarea más larga.
+"""
+import importlib
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils.timezone import now
+
+from basis_trainning_app.db_routers import current_gym, use_gym
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+# nombre → (función, max_intentos)
+registry = {}
+
+# Módulos que registran tareas
+TASK_MODULES = ['daily_trainning_app.tasks']
+
+# Mínimo de segundos entre escrituras de progreso de una misma tarea
+PROGRESS_INTERVAL = 0.5
+
+
+def task(name=None, max_attempts=3):
+    """ Registra una función como tarea en segundo plano """
+    def decorator(func):
+        registry[name or func.__name__] = (func, max_attempts)
+        return func
+    return decorator
+
+
+def load_tasks():
+    for module in TASK_MODULES:
+        importlib.import_module(module)
+
+
+def enqueue(name, arguments=None, delay=0):
+    """
+    Encola una tarea registrada y devuelve su `Task`. `arguments` se pasa
+    a la función como argumentos con nombre.
+    """
+    load_tasks()
+    if name not in registry:
+        raise KeyError(f"No existe la tarea '{name}'.")
+    _, max_attempts = registry[name]
+    return Task.objects.create(
+        nombre=name,
+        argumentos=arguments or {},
+        gym=current_gym() or '',
+        max_intentos=max_attempts,
+        ejecutar_desde=now() + timedelta(seconds=delay))
+
+
+def requeue_stale(lease_seconds=None):
+    """
+    Recupera las tareas `running` cuyo worker murió: las que empezaron hace
+    más de `lease_seconds` vuelven a `pending` si les quedan intentos y, si
+    no, pasan a `failed`. Devuelve cuántas se han recuperado.
+    """
+    if lease_seconds is None:
+        lease_seconds = settings.TASK_QUEUE.get('lease_seconds', 900)
+    stale = Task.objects.filter(
+        estado='running', iniciado_en__lt=now() - timedelta(seconds=lease_seconds))
+    requeued = stale.filter(intentos__lt=F('max_intentos')).update(
+        estado='pending', worker='', ejecutar_desde=now())
+    failed = stale.update(
+        estado='failed', finalizado_en=now(),
+        error="El worker no terminó la tarea dentro del plazo.")
+    if requeued or failed:
+        logger.warning(
+            "Tareas abandonadas: %s reencoladas, %s fallidas.", requeued, failed)
+    return requeued + failed
+
+
+def claim_next(worker):
+    """ Reserva la siguiente tarea pendiente para este worker (o None) """
+    requeue_stale()
+    while True:
+        candidate = (
+            Task.objects.filter(estado='pending', ejecutar_desde__lte=now())
+            .order_by('id').values_list('id', flat=True).first())
+        if candidate is None:
+            return None
+        # El UPDATE condicional evita que dos workers tomen la misma tarea.
+        # El intento se cuenta al reservar para que una caída también gaste
+        # uno y `requeue_stale()` no reencole para siempre
+        claimed = Task.objects.filter(pk=candidate, estado='pending').update(
+            estado='running', worker=worker, iniciado_en=now(),
+            intentos=F('intentos') + 1, progreso=0.0, mensaje='')
+        if claimed:
+            return Task.objects.get(pk=candidate)
+
+
+class _Progress:
+    """ Callback de progreso que limita la frecuencia de escritura """
+
+    def __init__(self, task_id):
+        self.task_id = task_id
+        self.last_write = 0.0
+
+    def __call__(self, fraction, message=''):
+        current = time.monotonic()
+        if fraction < 1 and current - self.last_write < PROGRESS_INTERVAL:
+            return
+        self.last_write = current
+        Task.objects.filter(pk=self.task_id).update(
+            progreso=max(0.0, min(1.0, fraction)), mensaje=str(message)[:255])
+
+
+def run_task(task_obj):
+    """ Ejecuta una tarea ya reservada y registra resultado, error y duración """
+    func, _ = registry[task_obj.nombre]
+    start = time.perf_counter()
+    try:
+        with use_gym(task_obj.gym):
+            result = func(
+                progress=_Progress(task_obj.pk), **task_obj.argumentos)
+    except Exception:
+        task_obj.error = traceback.format_exc()
+        logger.exception("La tarea %s falló (intento %s/%s).", task_obj,
+                         task_obj.intentos, task_obj.max_intentos)
+        if task_obj.intentos < task_obj.max_intentos:
+            # Reintento con espera exponencial
+            task_obj.estado = 'pending'
+            task_obj.ejecutar_desde = now() + timedelta(
+                seconds=2 ** task_obj.intentos)
+        else:
+            task_obj.estado = 'failed'
+    else:
+        task_obj.estado = 'succeeded'
+        task_obj.resultado = result
+        task_obj.progreso = 1.0
+        task_obj.error = ''
+
+    task_obj.duracion_ms = (time.perf_counter() - start) * 1000
+    task_obj.finalizado_en = now()
+    task_obj.save(update_fields=[
+        'estado', 'resultado', 'progreso', 'error', 'ejecutar_desde', 'duracion_ms', 'finalizado_en'])
+    return task_obj
+
+
+def work(poll_interval=1.0, burst=False, worker=None):
+    """
+    Bucle de un worker: reserva y ejecuta tareas hasta que se interrumpa.
+    Con `burst` termina cuando no quedan tareas pendientes.
+    """
+    load_tasks()
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    while True:
+        close_old_connections()
+        task_obj = claim_next(worker)
+        if task_obj is None:
+            if burst:
+                return
+            time.sleep(poll_interval)
+            continue
+        if task_obj.nombre not in registry:
+            Task.objects.filter(pk=task_obj.pk).update(
+                estado='failed', error=f"Tarea desconocida: {task_obj.nombre}")
+            continue
+        run_task(task_obj)
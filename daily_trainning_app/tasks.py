@@ -0,0 +1,57 @@
+"""
+Tareas pesadas que se ejecutan fuera de la petición (`manage.py run_workers`).
+
+Todas reciben `progress(fraccion, mensaje)` y devuelven un resultado
+serializable en JSON.
+"""
+from .task_queue import task
+
+
+@task()
+def archive_workouts(progress, days=None, batch_size=5000):
+    from .archiving import archive_cutoff
+    from .archiving import archive_workouts as archive
+
+    moved = archive(
+        before=archive_cutoff(days), batch_size=batch_size,
+        progress=lambda done, total: progress(
+            done / total if total else 1.0, f"{done}/{total}"))
+    return {"archivados": moved}
+
+
+@task()
+def rebuild_search_index(progress):
+    from .search import rebuild_index
+
+    rebuild_index()
+    return {}
+
+
+@task()
+def purge_idempotency_keys(progress):
+    from .api.idempotency import purge_expired_keys
+
+    return {"eliminadas": purge_expired_keys()}
+
+
+@task()
+def recompute_workouts(progress, processes=1, batch_size=2000):
+    from .recompute import recompute_all
+
+    return recompute_all(processes=processes, batch_size=batch_size)
+
+
+@task()
+def materialize_program(progress, program_id, user_ids, fecha_inicio,
+                        reemplazar=False):
+    from datetime import date
+
+    from .models import TrainingProgram
+    from .programs import materialize_program as materialize
+
+    result = materialize(
+        TrainingProgram.objects.get(pk=program_id), user_ids,
+        date.fromisoformat(fecha_inicio), reemplazar=reemplazar,
+        progress=lambda done, total: progress(
+            done / total if total else 1.0, f"{done}/{total} atletas"))
+    return {"creados": result["creadas"], "sin_rm": result["sin_rm"]}
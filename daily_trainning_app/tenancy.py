@@ -0,0 +1,157 @@
+"""
+Un gimnasio por base de datos.
+
+Cada gimnasio de `TENANT_GYMS` guarda sus atletas, 1RM, series y derivados
+en su propia base (`gym_<gimnasio>`): las escrituras de gimnasios distintos
+ya no compiten por el único escritor de SQLite, y un fallo o una
+restauración afectan a un solo gimnasio. `TenantMiddleware` elige el
+gimnasio de cada petición y `TenantRouter` (`basis_trainning_app/
+db_routers.py`) enruta los modelos.
+
+El catálogo (`Exercise`, `Classification`, contribuciones y tablas de RPE)
+es común: se escribe en `default` y cada gimnasio lee una copia local, que
+`ensure_catalogue()` pone al día cuando cambia `catalogue_version()`. Con
+la copia local las FK de las series siguen siendo válidas y los
+`select_related` del catálogo no salen de la base del gimnasio.
+
+Alta de un gimnasio:
+    TENANT_GYMS=norte python manage.py migrate_gyms
+"""
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.http import JsonResponse
+
+from basis_trainning_app.db_routers import gym_alias, use_gym
+
+from .compression import catalogue_version
+from .models import (
+    Classification, Exercise, ExerciseContribution, RPETable
+)
+from .search import index_objects
+
+# Padres antes que hijos (mismo orden que `CATALOGUE_MODELS`)
+CATALOGUE = (Classification, Exercise, ExerciseContribution, RPETable)
+
+_synced = {}  # alias → versión del catálogo copiada en este proceso
+_sync_lock = threading.Lock()
+
+
+# 📌 1️⃣ Copia local del catálogo
+def sync_catalogue(alias):
+    """
+    Copia el catálogo de `default` en la base `alias`. Primero borra lo que
+    ya no existe (hijos antes que padres, con sus cascadas) y después
+    inserta o actualiza el resto. Devuelve las filas copiadas.
+    """
+    rows = {model: list(model.objects.using(DEFAULT_DB_ALIAS).order_by('pk'))
+            for model in CATALOGUE}
+    with transaction.atomic(using=alias):
+        for model in reversed(CATALOGUE):
+            model.objects.using(alias).exclude(
+                pk__in=[obj.pk for obj in rows[model]]).delete()
+        for model in CATALOGUE:
+            fields = [field.name for field in model._meta.concrete_fields
+                      if not field.primary_key]
+            model.objects.using(alias).bulk_create(
+                rows[model], batch_size=500, update_conflicts=True,
+                unique_fields=[model._meta.pk.name], update_fields=fields)
+        index_objects(rows[Exercise], using=alias)
+    return sum(len(objects) for objects in rows.values())
+
+
+def ensure_catalogue(alias):
+    """
+    Pone al día la copia de `alias` si el catálogo cambió. Lo habitual
+    cuesta una lectura de caché; la copia se hace una vez por versión.
+    """
+    version = catalogue_version()
+    if _synced.get(alias) == version:
+        return False
+    with _sync_lock:
+        if _synced.get(alias) == version:
+            return False
+        key = f'catalogue:synced:{alias}'
+        if cache.get(key) != version:
+            sync_catalogue(alias)
+            cache.set(key, version, None)
+        _synced[alias] = version
+    return True
+
+
+# 📌 2️⃣ Gimnasio de cada petición
+def gym_from_request(request):
+    """ Gimnasio de la cabecera `TENANCY['header']` o del subdominio """
+    config = settings.TENANCY
+    gym = request.headers.get(config['header'], '').strip().lower()
+    domain = config.get('domain')
+    if not gym and domain:
+        host = request.get_host().split(':')[0].lower()
+        if host.endswith('.' + domain):
+            gym = host[:-len(domain) - 1]
+    return gym or None
+
+
+def is_gym_member(user, gym):
+    """ Superusuarios o miembros del grupo `<group_prefix><gimnasio>` """
+    if user.is_superuser:
+        return True
+    key = f'gym-member:{user.pk}:{gym}'
+    member = cache.get(key)
+    if member is None:
+        member = user.groups.filter(
+            name=settings.TENANCY.get('group_prefix', 'gym:') + gym).exists()
+        cache.set(key, member, 300)
+    return member
+
+
+def gym_required_message():
+    return (f"Indica el gimnasio (cabecera {settings.TENANCY['header']} "
+            f"o subdominio).")
+
+
+def may_skip_gym(user):
+    """
+    Sin gimnasio la petición usa `default`, la base común: con gimnasios
+    configurados solo pueden hacerlo los anónimos (que solo leen el
+    catálogo) y los superusuarios.
+    """
+    return not settings.TENANT_GYMS or user is None or \
+        not user.is_authenticated or user.is_superuser
+
+
+class TenantMiddleware:
+    """
+    Activa la base del gimnasio durante la petición. Un gimnasio
+    desconocido es un 404, un usuario de sesión que no pertenece a él un
+    403 y uno sin gimnasio un 400 (salvo `may_skip_gym`). Las credenciales
+    de la API las comprueba `api.authentication.GymBasicAuthentication`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        gym = gym_from_request(request) if settings.TENANT_GYMS else None
+        if gym is None:
+            if not may_skip_gym(getattr(request, 'user', None)):
+                return JsonResponse(
+                    {"detail": gym_required_message()}, status=400)
+            return self.get_response(request)
+
+        alias = gym_alias(gym)
+        if alias is None:
+            return JsonResponse(
+                {"detail": f"Gimnasio desconocido: '{gym}'."}, status=404)
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated and \
+                not is_gym_member(user, gym):
+            return JsonResponse(
+                {"detail": "No perteneces a este gimnasio."}, status=403)
+
+        ensure_catalogue(alias)
+        request.gym = gym
+        with use_gym(gym):
+            return self.get_response(request)
@@ -1,3 +1,1491 @@
-from django.test import TestCase
+import base64
+import gzip
+import importlib
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import Group, User as Account
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections, router
+from django.test import (
+    Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+)
+from django.utils.timezone import now
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+
+from basis_trainning_app.db_routers import use_gym, use_replica
+
+from . import backups, live_feed, rpe_tables, sync, task_queue, tenancy
+from .api import renderers
+from .api.fast_serializers import (
+    serialize_workouts, serialize_workouts_compact
+)
+from .api.idempotency import _fingerprint, idempotent
+from .api.serializers import WorkoutDataSerializer
+from .api.throttling import TokenBucketThrottle
+from .archiving import archive_workouts
+from .fitness import rebuild_fitness
+from .ingestion import WorkoutIngestBuffer, get_buffer
+from .models import (
+    ArchivedWorkoutData, AthleteFitnessState, ChangeLog, Classification,
+    Exercise, IdempotencyKey, ProgramEntry, Task, TrainingProgram, User,
+    UserExerciseRM, WorkoutData
+)
+from .programs import materialize_program
+from .query_guard import NPlusOneError, check_query_plans, detect_n_plus_one
+from .recompute import RECOMPUTED_FIELDS, recompute_all
+from .search import search_ids, trigrams
+from .views import _allowed_user_ids
+
+GYM = "pruebas"
+GYM_DB = settings.TENANCY["alias_prefix"] + GYM
+
+
+def register_database(alias, **options):
+    """
+    Base SQLite extra para las pruebas (gimnasios, réplica, copias). Se
+    registra al importar este módulo, antes de que el runner cree las bases
+    de prueba, y solo la crea para las clases que la piden en `databases`.
+    """
+    settings.DATABASES[alias] = {**settings.DATABASES["default"], **options}
+    connections.settings = connections.configure_settings(settings.DATABASES)
+
+
+register_database(GYM_DB)
+
+# Réplica en su propio archivo SQLite, sin copiar lo que se escribe en `default`
+REPLICA_DB = "replica_pruebas"
+register_database(REPLICA_DB, TEST={"NAME": os.path.join(
+    tempfile.gettempdir(), f"{REPLICA_DB}_{os.getpid()}.sqlite3")})
+
+# Las copias en caliente leen el archivo SQLite: no valen en memoria
+BACKUP_DB = "copias_pruebas"
+register_database(BACKUP_DB, TEST={"NAME": os.path.join(
+    tempfile.gettempdir(), f"{BACKUP_DB}_{os.getpid()}.sqlite3")})
+
+
+class CatalogueMixin:
+    """ Catálogo mínimo, dos atletas con sus cuentas y un administrador """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.classification = Classification.objects.create(nombre="Pierna")
+        cls.exercise = Exercise.objects.create(
+            nombre="Sentadilla", classification=cls.classification)
+        cls.accounts = [
+            Account.objects.create_user(f"atleta{i}") for i in range(2)]
+        cls.athletes = [
+            User.objects.create(
+                nombre=f"Atleta {i}", email=f"atleta{i}@example.com",
+                fecha_inicio=date(2024, 1, 1), cuenta=account)
+            for i, account in enumerate(cls.accounts)]
+        cls.admin = Account.objects.create_superuser("admin")
+        for athlete in cls.athletes:
+            UserExerciseRM.objects.create(
+                user=athlete, exercise=cls.exercise, peso_maximo_rm=100,
+                fecha_registro=date(2024, 1, 1))
+            WorkoutData.objects.create(
+                user=athlete, exercise=cls.exercise, fecha=date(2024, 1, 2),
+                sets=3, reps=5, peso=80)
+
+    def client_for(self, account):
+        client = APIClient()
+        client.force_authenticate(account)
+        return client
+
+
+# 📌 1️⃣ Cuentas de la API y atletas (`User.cuenta`)
+class AccountLinkTests(CatalogueMixin, TestCase):
+    def test_account_sees_only_its_athlete(self):
+        response = self.client_for(self.accounts[1]).get(
+            "/api/v1/workout-data/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {row["user"]["id"] for row in response.json()},
+            {self.athletes[1].pk})
+
+    def test_unlinked_account_sees_nothing(self):
+        # Misma pk que el primer atleta pero sin enlace: no ve sus datos
+        athlete = self.athletes[0]
+        Account.objects.filter(pk=athlete.pk).delete()
+        coach = Account.objects.create_user("coach", id=athlete.pk)
+        self.assertIsNone(User.id_for_account(coach))
+        for url in ("/api/v1/workout-data/", "/api/v1/user-exercise-rm/"):
+            response = self.client_for(coach).get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), [])
+
+    def test_migration_links_existing_accounts_by_email(self):
+        migration = importlib.import_module(
+            "daily_trainning_app.migrations.0019_user_cuenta")
+        unique = Account.objects.create_user(
+            "nuevo", email="Nuevo@Example.com")
+        Account.objects.create_user("doble1", email="doble@example.com")
+        Account.objects.create_user("doble2", email="doble@example.com")
+        athletes = [
+            User.objects.create(nombre=f"Atleta {email}", email=email,
+                                fecha_inicio=date(2024, 1, 1))
+            for email in ("nuevo@example.com", "doble@example.com")]
+        migration.link_accounts_by_email(
+            apps, SimpleNamespace(connection=connection))
+        for athlete in athletes:
+            athlete.refresh_from_db()
+        # Un email compartido por dos cuentas no se adivina
+        self.assertEqual(athletes[0].cuenta_id, unique.pk)
+        self.assertIsNone(athletes[1].cuenta_id)
+        self.assertEqual(
+            User.objects.get(pk=self.athletes[0].pk).cuenta_id,
+            self.accounts[0].pk)
+
+    def test_rm_is_created_for_the_linked_athlete(self):
+        response = self.client_for(self.accounts[0]).post(
+            "/api/v1/user-exercise-rm/",
+            {"user_id": self.athletes[1].pk, "exercise_id": self.exercise.pk,
+             "peso_maximo_rm": 120, "fecha_registro": "2024-02-01"},
+            format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["user"]["id"], self.athletes[0].pk)
+
+
+# 📌 2️⃣ Panel del atleta
+class DashboardTests(CatalogueMixin, TestCase):
+    def test_only_own_dashboard(self):
+        client = self.client_for(self.accounts[0])
+        own = client.get(f"/api/v1/users/{self.athletes[0].pk}/dashboard/")
+        self.assertEqual(own.status_code, 200)
+        other = client.get(f"/api/v1/users/{self.athletes[1].pk}/dashboard/")
+        self.assertEqual(other.status_code, 403)
+
+    def test_latest_rm_per_exercise(self):
+        athlete = self.athletes[0]
+        for peso, fecha in ((110, date(2024, 3, 1)), (105, date(2024, 2, 1))):
+            UserExerciseRM.objects.create(
+                user=athlete, exercise=self.exercise, peso_maximo_rm=peso,
+                fecha_registro=fecha)
+        response = self.client_for(self.admin).get(
+            f"/api/v1/users/{athlete.pk}/dashboard/?sections=rms")
+        self.assertEqual(
+            [(rm["exercise_id"], rm["peso_maximo_rm"])
+             for rm in response.json()["rms"]],
+            [(self.exercise.pk, 110)])
+
+
+# 📌 3️⃣ Modelo fitness–fatiga
+class FitnessTests(CatalogueMixin, TestCase):
+    def setUp(self):
+        # Los estados se calculan al confirmar y los datos de la clase
+        # nunca se confirman
+        rebuild_fitness()
+
+    def test_readiness_is_scoped_to_the_linked_athlete(self):
+        response = self.client_for(self.accounts[1]).get(
+            "/api/v1/fitness/?fecha=2024-01-10")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row["user_id"] for row in response.json()],
+            [self.athletes[1].pk])
+        other = self.client_for(self.accounts[1]).get(
+            f"/api/v1/fitness/{self.athletes[0].pk}/"
+            "?desde=2024-01-01&hasta=2024-01-10")
+        self.assertEqual(other.status_code, 403)
+
+    def test_missing_states_are_rebuilt_on_first_read(self):
+        # Como una base migrada a 0016 sin recalcular
+        AthleteFitnessState.objects.all().delete()
+        response = self.client_for(self.admin).get(
+            "/api/v1/fitness/?fecha=2024-01-10")
+        self.assertEqual(
+            [row["user_id"] for row in response.json()],
+            [athlete.pk for athlete in self.athletes])
+        AthleteFitnessState.objects.all().delete()
+        response = self.client_for(self.accounts[0]).get(
+            f"/api/v1/fitness/{self.athletes[0].pk}/"
+            "?desde=2024-01-01&hasta=2024-01-03")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["dias"]), 3)
+        self.assertTrue(AthleteFitnessState.objects.filter(
+            user=self.athletes[0], fecha=date(2024, 1, 2)).exists())
+
+    def test_planning_a_logged_set_recalculates_its_day(self):
+        athlete = self.athletes[0]
+        states = AthleteFitnessState.objects.filter(
+            user=athlete, fecha=date(2024, 1, 2))
+        self.assertTrue(states.exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            workout = WorkoutData.objects.get(user=athlete)
+            workout.planificado = True
+            workout.save()
+        self.assertFalse(states.filter(impulso__gt=0).exists())
+
+
+# 📌 4️⃣ Volumen por grupo muscular
+class MuscleVolumeTests(CatalogueMixin, TestCase):
+    def test_volume_is_scoped_to_the_linked_athlete(self):
+        response = self.client_for(self.accounts[0]).get(
+            "/api/v1/muscle-volume/?desde=2024-01-01&hasta=2024-01-07")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row["user_id"] for row in response.json()],
+            [self.athletes[0].pk])
+
+    def test_unlinked_account_is_rejected(self):
+        stranger = Account.objects.create_user("stranger")
+        response = self.client_for(stranger).get("/api/v1/muscle-volume/")
+        self.assertEqual(response.status_code, 403)
+
+
+# 📌 5️⃣ Prescripción de cargas
+class PrescriptionTests(CatalogueMixin, TestCase):
+    def prescribe(self, account, athlete):
+        return self.client_for(account).post(
+            "/api/v1/prescriptions/",
+            {"user_id": athlete.pk,
+             "items": [{"exercise_id": self.exercise.pk, "reps": 5, "rpe": 8}]},
+            format="json")
+
+    def test_prescribes_for_the_linked_athlete_only(self):
+        self.assertEqual(
+            self.prescribe(self.accounts[0], self.athletes[0]).status_code, 200)
+        self.assertEqual(
+            self.prescribe(self.accounts[0], self.athletes[1]).status_code, 403)
+
+
+# 📌 6️⃣ Ingesta de series: propietario e `Idempotency-Key`
+class IngestionTests(CatalogueMixin, TestCase):
+    def workout(self, athlete, **extra):
+        return {"user_id": athlete.pk, "exercise_id": self.exercise.pk,
+                "fecha": "2024-01-03", "sets": 3, "reps": 5, "peso": 90,
+                **extra}
+
+    def test_only_own_workouts(self):
+        client = self.client_for(self.accounts[0])
+        own = client.post("/api/v1/workout-data/",
+                          self.workout(self.athletes[0]), format="json")
+        self.assertEqual(own.status_code, 201)
+        other = client.post("/api/v1/workout-data/",
+                            self.workout(self.athletes[1]), format="json")
+        self.assertEqual(other.status_code, 403)
+
+    def test_idempotency_key_replays_and_rejects_other_bodies(self):
+        client = self.client_for(self.accounts[0])
+        headers = {"Idempotency-Key": "serie-1"}
+        first = client.post("/api/v1/workout-data/",
+                            self.workout(self.athletes[0]), format="json",
+                            headers=headers)
+        again = client.post("/api/v1/workout-data/",
+                            self.workout(self.athletes[0]), format="json",
+                            headers=headers)
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(again.status_code, 201)
+        self.assertEqual(again.headers["Idempotent-Replayed"], "true")
+        self.assertEqual(again.json()["id"], first.json()["id"])
+        other = client.post("/api/v1/workout-data/",
+                            self.workout(self.athletes[0], peso=95),
+                            format="json", headers=headers)
+        self.assertEqual(other.status_code, 422)
+        self.assertEqual(
+            WorkoutData.objects.filter(fecha=date(2024, 1, 3)).count(), 1)
+
+    def test_idempotency_key_with_multipart_body(self):
+        # Con sesión, la comprobación CSRF lee `request.POST` (el stream)
+        # antes que la vista
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.accounts[0])
+        token = "a" * 32
+        client.cookies["csrftoken"] = token
+        for _ in range(2):
+            response = client.post(
+                "/api/v1/workout-data/",
+                {**self.workout(self.athletes[0]),
+                 "csrfmiddlewaretoken": token},
+                headers={"Idempotency-Key": "multipart-1"})
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            WorkoutData.objects.filter(fecha=date(2024, 1, 3)).count(), 1)
+
+    @override_settings(WORKOUT_INGEST_BUFFER={"enabled": True})
+    def test_buffered_workouts_are_saved_on_flush(self):
+        response = self.client_for(self.accounts[0]).post(
+            "/api/v1/workout-data/", self.workout(self.athletes[0]),
+            format="json")
+        self.assertEqual(response.status_code, 202)
+        get_buffer().flush()
+        self.assertTrue(
+            WorkoutData.objects.filter(fecha=date(2024, 1, 3)).exists())
+
+    def test_bad_row_in_buffer_does_not_lose_its_neighbours(self):
+        buffer = WorkoutIngestBuffer()
+        rows = [self.workout(self.athletes[0], reps=reps) for reps in (1, 2)]
+        rows.insert(1, self.workout(self.athletes[1], exercise_id=999999))
+        # Directo a la cola, sin el hilo de volcado
+        for row in rows:
+            buffer._queue.put((None, {**row, "fecha": date(2024, 1, 3)}))
+        with self.assertLogs("daily_trainning_app.ingestion", "WARNING"):
+            self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(
+            sorted(WorkoutData.objects.filter(fecha=date(2024, 1, 3))
+                   .values_list("reps", flat=True)), [1, 2])
+        self.assertEqual(
+            [row["exercise_id"] for _, row in buffer.rejected], [999999])
+
+    def idempotent_request(self):
+        request = APIRequestFactory().post(
+            "/api/v1/workout-data/", {"peso": 90}, format="json",
+            headers={"Idempotency-Key": "vista-1"})
+        request.user = self.accounts[0]
+        return request
+
+    def test_view_integrity_errors_are_not_taken_for_a_race(self):
+        @idempotent
+        def create(view, request):
+            raise IntegrityError("UNIQUE constraint failed")
+
+        with self.assertRaises(IntegrityError):
+            create(None, self.idempotent_request())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_concurrent_key_replays_the_other_response(self):
+        request = self.idempotent_request()
+        # La otra petición guardó la clave después de nuestra consulta
+        IdempotencyKey.objects.create(
+            clave=f"cuenta:{self.accounts[0].pk}:vista-1",
+            huella=_fingerprint(request), status_code=201,
+            respuesta={"id": 7})
+        real_filter = IdempotencyKey.objects.filter
+        lookups = []
+
+        def late_filter(**fields):
+            lookups.append(fields)
+            if len(lookups) == 1:
+                return IdempotencyKey.objects.none()
+            return real_filter(**fields)
+
+        @idempotent
+        def create(view, request):
+            return Response({"id": 8}, status=201)
+
+        with mock.patch.object(
+                IdempotencyKey.objects, "filter", side_effect=late_filter):
+            response = create(None, request)
+        self.assertEqual((response.status_code, response.data),
+                         (201, {"id": 7}))
+        self.assertEqual(response.headers["Idempotent-Replayed"], "true")
+
+    @override_settings(INGESTION_THROTTLE={"rate": 0.001, "burst": 5})
+    def test_token_bucket_holds_under_concurrent_requests(self):
+        cache.clear()
+        request = SimpleNamespace(user=self.accounts[0])
+        start = threading.Barrier(20)
+        allowed = []
+
+        def device():
+            throttle = TokenBucketThrottle()
+            start.wait()
+            allowed.append(throttle.allow_request(request, None))
+
+        real_get = LocMemCache.get
+
+        def slow_get(self, *args, **kwargs):
+            # Ensancha la ventana entre leer el saldo y guardarlo (la caché
+            # es un objeto por hilo: se parchea la clase)
+            value = real_get(self, *args, **kwargs)
+            time.sleep(0.005)
+            return value
+
+        threads = [threading.Thread(target=device) for _ in range(20)]
+        with mock.patch.object(LocMemCache, "get", slow_get):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(allowed.count(True), 5)
+
+
+# 📌 7️⃣ Sincronización incremental
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class SyncTests(CatalogueMixin, TestCase):
+    def test_changes_of_the_linked_athlete_since_token(self):
+        client = self.client_for(self.accounts[0])
+        first = client.get("/api/v1/sync/").json()
+        self.assertEqual(
+            {row["user_id"] for row in first["workout_data"]["updated"]},
+            {self.athletes[0].pk})
+
+        workout = WorkoutData.objects.get(user=self.athletes[0])
+        workout_id = workout.pk
+        workout.delete()
+        WorkoutData.objects.create(
+            user=self.athletes[1], exercise=self.exercise,
+            fecha=date(2024, 1, 5), sets=1, reps=1, peso=50)
+        delta = client.get(f"/api/v1/sync/?since={first['next']}").json()
+        self.assertEqual(delta["workout_data"]["updated"], [])
+        self.assertEqual(delta["workout_data"]["deleted"], [workout_id])
+        self.assertFalse(delta["has_more"])
+
+
+    def test_pages_follow_next_until_has_more_is_false(self):
+        WorkoutData.objects.bulk_create(
+            WorkoutData(user=self.athletes[0], exercise=self.exercise,
+                        fecha=date(2024, 2, day), sets=3, reps=5, peso=80)
+            for day in range(1, 5))
+        sync.record_changes(
+            WorkoutData, WorkoutData.objects.filter(fecha__month=2), "upsert")
+        client = self.client_for(self.admin)
+        token, pages = "0", []
+        while True:
+            page = client.get(f"/api/v1/sync/?since={token}&limit=2").json()
+            pages.append((len(page["workout_data"]["updated"]) +
+                          len(page["user_exercise_rm"]["updated"]),
+                          page["has_more"]))
+            token = page["next"]
+            if not page["has_more"]:
+                break
+        # 2 series y 2 1RM del catálogo, más las 4 series nuevas
+        self.assertEqual(pages, [(2, True), (2, True), (2, True), (2, False)])
+        last = client.get(f"/api/v1/sync/?since={token}&limit=2").json()
+        self.assertEqual((last["next"], last["has_more"]), (token, False))
+
+    def test_late_commit_with_a_lower_id_is_not_skipped(self):
+        client = self.client_for(self.admin)
+        token = client.get("/api/v1/sync/").json()["next"]
+        slow, fast = WorkoutData.objects.bulk_create(
+            WorkoutData(user=self.athletes[0], exercise=self.exercise,
+                        fecha=date(2024, 2, day), sets=3, reps=5, peso=80)
+            for day in (1, 2))
+        # La transacción lenta toma su id y su hora antes que la rápida,
+        # pero confirma después (en PostgreSQL, no en orden de id)
+        reserved = ChangeLog.objects.create(
+            modelo="workoutdata", objeto_id=slow.pk, usuario_id=slow.user_id,
+            accion="upsert")
+        reserved.delete()
+        sync.record_changes(WorkoutData, [fast], "upsert")
+        fecha = ChangeLog.objects.get(objeto_id=fast.pk).fecha
+
+        def get(since, seconds):
+            with self.settings(SYNC_SETTLE_SECONDS=2), mock.patch(
+                    "daily_trainning_app.sync.now",
+                    return_value=fecha + timedelta(seconds=seconds)):
+                return client.get(f"/api/v1/sync/?since={since}").json()
+
+        first = get(token, 1)
+        self.assertEqual(first["workout_data"]["updated"], [])
+        ChangeLog.objects.create(
+            id=reserved.id, modelo="workoutdata", objeto_id=slow.pk,
+            usuario_id=slow.user_id, accion="upsert")
+        ChangeLog.objects.filter(pk=reserved.id).update(fecha=reserved.fecha)
+        second = get(first["next"], 3)
+        self.assertEqual(
+            [row["id"] for row in second["workout_data"]["updated"]],
+            [slow.pk, fast.pk])
+
+    def test_legacy_and_invalid_tokens(self):
+        client = self.client_for(self.admin)
+        last_id = ChangeLog.objects.order_by("id").last().pk
+        legacy = client.get(f"/api/v1/sync/?since={last_id - 1}").json()
+        self.assertEqual(len(legacy["user_exercise_rm"]["updated"]) +
+                         len(legacy["workout_data"]["updated"]), 1)
+        self.assertEqual(
+            client.get("/api/v1/sync/?since=abc").status_code, 400)
+
+# 📌 8️⃣ Feed en vivo
+class LiveFeedTests(CatalogueMixin, TestCase):
+    def test_coaches_choose_athletes_and_athletes_only_follow_themselves(self):
+        coach = Account.objects.create_user("coach", is_staff=True)
+        wanted = {athlete.pk for athlete in self.athletes}
+        self.assertEqual(_allowed_user_ids(coach, wanted), (wanted, None))
+        self.assertEqual(_allowed_user_ids(coach, None), (None, None))
+
+        own = self.athletes[0].pk
+        self.assertEqual(
+            _allowed_user_ids(self.accounts[0], None), ({own}, None))
+        self.assertEqual(
+            _allowed_user_ids(self.accounts[0], {own}), ({own}, None))
+        _, error = _allowed_user_ids(self.accounts[0], wanted)
+        self.assertIsNotNone(error)
+
+    def test_events_are_encoded_without_drf(self):
+        workout = WorkoutData.objects.get(user=self.athletes[0])
+        chunk = live_feed.encode_event(live_feed.event_data(workout))
+        self.assertTrue(chunk.startswith(f"id: {workout.pk}\n".encode()))
+        payload = chunk.split(b"data: ", 1)[1]
+        self.assertEqual(json.loads(payload)["user_id"], self.athletes[0].pk)
+
+    def test_planned_workouts_are_not_published(self):
+        athlete = self.athletes[0]
+        with mock.patch.object(
+                live_feed.broker, "has_subscribers", return_value=True), \
+                mock.patch.object(live_feed, "publish") as publish, \
+                self.captureOnCommitCallbacks(execute=True):
+            WorkoutData.objects.create(
+                user=athlete, exercise=self.exercise, fecha=date(2024, 2, 1),
+                sets=3, reps=5, peso=80, planificado=True)
+            done = WorkoutData.objects.create(
+                user=athlete, exercise=self.exercise, fecha=date(2024, 2, 1),
+                sets=3, reps=5, peso=80)
+        self.assertEqual([call.args[0] for call in publish.call_args_list],
+                         [[done]])
+
+    def test_worker_profile_does_not_import_drf(self):
+        script = (
+            "import sys, django; django.setup(); "
+            "import daily_trainning_app.task_queue, "
+            "daily_trainning_app.recompute; "
+            "print(sorted(m for m in sys.modules "
+            "if m.startswith(('rest_framework', 'daily_trainning_app.api'))))")
+        completed = subprocess.run(
+            [sys.executable, "-c", script], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE":
+                 "basis_trainning_app.settings_worker"})
+        self.assertEqual(completed.stdout.strip(), "[]")
+
+
+# 📌 9️⃣ Compresión de respuestas
+class CompressionTests(CatalogueMixin, TestCase):
+    def test_html_with_csrf_tokens_is_not_compressed(self):
+        response = self.client.get(
+            "/admin/login/", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_api_json_is_gzipped_with_random_padding(self):
+        WorkoutData.objects.bulk_create(
+            WorkoutData(user=self.athletes[0], exercise=self.exercise,
+                        fecha=date(2024, 2, day), sets=3, reps=5, peso=80)
+            for day in range(1, 29))
+        client = self.client_for(self.admin)
+        bodies = set()
+        for _ in range(5):
+            response = client.get(
+                "/api/v1/workout-data/", headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            self.assertEqual(
+                len(json.loads(gzip.decompress(response.content))), 30)
+            bodies.add(response.content)
+        self.assertGreater(len(bodies), 1)
+
+
+# 📌 🔟 Multi-gimnasio
+@override_settings(TENANT_GYMS=[GYM])
+class TenancyTests(CatalogueMixin, TestCase):
+    databases = {"default", GYM_DB}
+
+    def setUp(self):
+        # Cada prueba deshace la copia del catálogo: que se vuelva a copiar
+        tenancy._synced.clear()
+        cache.clear()
+        self.member = Account.objects.create_user("socio", password="pw")
+        self.member.groups.add(Group.objects.create(
+            name=settings.TENANCY["group_prefix"] + GYM))
+        self.athlete = User.objects.using(GYM_DB).create(
+            nombre="Socio", email="socio@example.com",
+            fecha_inicio=date(2024, 1, 1), cuenta=self.member)
+
+    def get(self, account, url, gym=GYM):
+        client = Client()
+        client.force_login(account)
+        headers = {"X-Gym": gym} if gym else {}
+        return client.get(url, headers=headers)
+
+    def test_member_reads_its_gym_database(self):
+        response = self.get(self.member, "/api/v1/users/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [user["email"] for user in response.json()], ["socio@example.com"])
+
+    def test_catalogue_is_copied_into_the_gym(self):
+        response = self.get(self.member, "/api/v1/exercises/")
+        self.assertEqual(
+            [exercise["id"] for exercise in response.json()],
+            [self.exercise.pk])
+        self.assertTrue(
+            Exercise.objects.using(GYM_DB).filter(pk=self.exercise.pk).exists())
+
+    def test_unknown_gym_and_non_members_are_rejected(self):
+        self.assertEqual(
+            self.get(self.member, "/api/v1/users/", gym="otro").status_code,
+            404)
+        self.assertEqual(
+            self.get(self.accounts[0], "/api/v1/users/").status_code, 403)
+
+    def test_default_database_needs_a_gym_unless_superuser(self):
+        self.assertEqual(
+            self.get(self.member, "/api/v1/users/", gym=None).status_code, 400)
+        self.assertEqual(
+            self.get(self.admin, "/api/v1/users/", gym=None).status_code, 200)
+
+    def test_basic_auth_without_gym_is_rejected(self):
+        credentials = base64.b64encode(b"socio:pw").decode()
+        response = Client().get(
+            "/api/v1/users/", headers={"Authorization": f"Basic {credentials}"})
+        self.assertEqual(response.status_code, 400)
+        response = Client().get(
+            "/api/v1/users/", headers={
+                "Authorization": f"Basic {credentials}", "X-Gym": GYM})
+        self.assertEqual(response.status_code, 200)
+
+    def test_recompute_task_rewrites_its_gym_database(self):
+        tenancy.sync_catalogue(GYM_DB)
+        workout = WorkoutData.objects.using(GYM_DB).create(
+            user=self.athlete, exercise=self.exercise, fecha=date(2024, 1, 2),
+            sets=3, reps=5, peso=80)
+        UserExerciseRM.objects.using(GYM_DB).create(
+            user=self.athlete, exercise=self.exercise, peso_maximo_rm=100,
+            fecha_registro=date(2024, 1, 1))
+        shared = WorkoutData.objects.get(user=self.athletes[0])
+        for using in ("default", GYM_DB):
+            WorkoutData.objects.using(using).update(intensidad_relativa=1)
+
+        with use_gym(GYM):
+            task = task_queue.enqueue("recompute_workouts")
+        task_queue.work(burst=True, worker="pruebas")
+        task.refresh_from_db()
+        self.assertEqual(task.estado, "succeeded")
+        self.assertEqual(task.resultado["base"], GYM_DB)
+        self.assertEqual(WorkoutData.objects.using(GYM_DB).get(
+            pk=workout.pk).intensidad_relativa, 80)
+        self.assertEqual(
+            WorkoutData.objects.get(pk=shared.pk).intensidad_relativa, 1)
+        self.assertTrue(AthleteFitnessState.objects.using(GYM_DB).filter(
+            user_id=self.athlete.pk).exists())
+
+
+# 📌 1️⃣1️⃣ Guardas de consultas: planes con índice y sin N+1
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        for name, plan, problems in check_query_plans():
+            with self.subTest(name, plan=plan):
+                self.assertEqual(problems, [])
+
+
+@override_settings(N_PLUS_ONE_DETECTION={"mode": "raise", "threshold": 5})
+class NPlusOneTests(CatalogueMixin, TestCase):
+    URLS = (
+        "/api/v1/workout-data/",
+        "/api/v1/workout-data/?layout=compact",
+        "/api/v1/workout-data/?include_archived=1",
+        "/api/v1/user-exercise-rm/",
+        "/api/v1/users/",
+        "/api/v1/exercises/",
+        "/api/v1/sync/",
+        "/api/v1/fitness/",
+        "/api/v1/muscle-volume/",
+        "/admin/daily_trainning_app/workoutdata/",
+        "/admin/daily_trainning_app/userexerciserm/",
+        "/admin/daily_trainning_app/user/",
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        exercises = [cls.exercise] + [
+            Exercise.objects.create(
+                nombre=f"Ejercicio {i}",
+                classification=Classification.objects.create(
+                    nombre=f"Grupo {i}"))
+            for i in range(6)]
+        for athlete in cls.athletes:
+            for day, exercise in enumerate(exercises, start=3):
+                UserExerciseRM.objects.create(
+                    user=athlete, exercise=exercise, peso_maximo_rm=100,
+                    fecha_registro=date(2024, 1, 1))
+                WorkoutData.objects.create(
+                    user=athlete, exercise=exercise, fecha=date(2024, 1, day),
+                    sets=3, reps=5, peso=70)
+
+    def test_detector_raises_on_repeated_queries(self):
+        with self.assertRaises(NPlusOneError):
+            with detect_n_plus_one():
+                for workout in WorkoutData.objects.all():
+                    workout.exercise.nombre
+
+    def test_hot_endpoints_have_no_n_plus_one(self):
+        client = Client()
+        client.force_login(self.admin)
+        for url in self.URLS:
+            with self.subTest(url):
+                self.assertEqual(client.get(url).status_code, 200)
+        dashboard = f"/api/v1/users/{self.athletes[0].pk}/dashboard/"
+        with self.assertNumQueries(5, using="default"):
+            # Con la cuenta ya autenticada: usuario, 1RM, recientes,
+            # últimas sesiones y ejercicios
+            self.assertEqual(
+                self.client_for(self.admin).get(dashboard).status_code, 200)
+
+
+# 📌 1️⃣2️⃣ Cola de tareas
+class TaskQueueTests(CatalogueMixin, TestCase):
+    def test_arguments_do_not_clash_with_enqueue_options(self):
+        response = self.client_for(self.admin).post(
+            "/api/v1/tasks/",
+            {"nombre": "purge_idempotency_keys", "argumentos": {"delay": 60}},
+            format="json")
+        self.assertEqual(response.status_code, 201)
+        task = Task.objects.get(pk=response.data["id"])
+        self.assertEqual(task.argumentos, {"delay": 60})
+        self.assertLessEqual(task.ejecutar_desde, now())
+
+    def test_worker_runs_task_once(self):
+        task = task_queue.enqueue("purge_idempotency_keys")
+        task_queue.work(burst=True, worker="pruebas")
+        task.refresh_from_db()
+        self.assertEqual((task.estado, task.intentos), ("succeeded", 1))
+
+    def abandoned(self, intentos):
+        return Task.objects.create(
+            nombre="purge_idempotency_keys", estado="running",
+            worker="caído", intentos=intentos, max_intentos=3,
+            iniciado_en=now() - timedelta(hours=1))
+
+    def test_abandoned_task_is_requeued_while_attempts_remain(self):
+        task = self.abandoned(intentos=1)
+        recent = Task.objects.create(
+            nombre="purge_idempotency_keys", estado="running",
+            worker="vivo", intentos=1, iniciado_en=now())
+        with self.assertLogs("daily_trainning_app.task_queue", "WARNING"):
+            claimed = task_queue.claim_next("pruebas")
+        self.assertEqual(claimed.pk, task.pk)
+        self.assertEqual((claimed.worker, claimed.intentos), ("pruebas", 2))
+        recent.refresh_from_db()
+        self.assertEqual((recent.estado, recent.worker), ("running", "vivo"))
+
+    def test_abandoned_task_fails_without_attempts_left(self):
+        task = self.abandoned(intentos=3)
+        with self.assertLogs("daily_trainning_app.task_queue", "WARNING"):
+            self.assertIsNone(task_queue.claim_next("pruebas"))
+        task.refresh_from_db()
+        self.assertEqual(task.estado, "failed")
+        self.assertTrue(task.error)
+
+
+# 📌 1️⃣3️⃣ Réplica de lectura
+@override_settings(DATABASE_REPLICA_ALIAS=REPLICA_DB)
+class ReplicaTests(TransactionTestCase):
+    """
+    La réplica no recibe las escrituras de `default`: lo que se lea de ella
+    sale vacío, así se ve qué consultas fueron a cada base.
+    """
+    databases = {"default", REPLICA_DB}
+
+    def setUp(self):
+        cache.clear()
+        self.exercise = Exercise.objects.create(
+            nombre="Sentadilla",
+            classification=Classification.objects.create(nombre="Pierna"))
+        self.account = Account.objects.create_user("atleta")
+        self.athlete = User.objects.create(
+            nombre="Atleta", email="atleta@example.com",
+            fecha_inicio=date(2024, 1, 1), cuenta=self.account)
+        WorkoutData.objects.create(
+            user=self.athlete, exercise=self.exercise, fecha=date(2024, 1, 2),
+            sets=3, reps=5, peso=80)
+        self.client = Client()
+        # La sesión solo existe en `default`
+        self.client.force_login(self.account)
+
+    def test_read_only_actions_read_from_replica_after_auth(self):
+        response = self.client.get("/api/v1/workout-data/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+    def test_writes_pin_the_client_to_default(self):
+        created = self.client.post(
+            "/api/v1/workout-data/",
+            {"user_id": self.athlete.pk, "exercise_id": self.exercise.pk,
+             "fecha": "2024-01-03", "sets": 3, "reps": 5, "peso": 90},
+            content_type="application/json")
+        self.assertEqual(created.status_code, 201)
+        self.assertTrue(WorkoutData.objects.filter(
+            pk=created.json()["id"]).exists())
+        response = self.client.get("/api/v1/workout-data/")
+        self.assertEqual(len(response.json()), 2)
+
+    def test_views_without_opt_in_read_from_default(self):
+        self.account.is_staff = self.account.is_superuser = True
+        self.account.save()
+        response = self.client.get(
+            "/admin/daily_trainning_app/exercise/")
+        self.assertContains(response, "Sentadilla")
+
+    def test_instances_are_written_where_they_were_loaded(self):
+        from_replica, from_backup = WorkoutData(), WorkoutData()
+        from_replica._state.db, from_backup._state.db = REPLICA_DB, GYM_DB
+        self.assertEqual(
+            router.db_for_write(WorkoutData, instance=from_replica), "default")
+        self.assertEqual(
+            router.db_for_write(WorkoutData, instance=from_backup), GYM_DB)
+
+    def test_write_lookups_do_not_change_read_routing(self):
+        with use_replica():
+            self.assertEqual(router.db_for_write(WorkoutData), "default")
+            self.assertEqual(router.db_for_read(WorkoutData), REPLICA_DB)
+
+
+# 📌 1️⃣4️⃣ Búsqueda por trigramas
+class SearchTests(CatalogueMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for i in range(60):
+            Exercise.objects.create(
+                nombre=f"Press {i}", classification=cls.classification)
+        cls.press_banca = Exercise.objects.create(
+            nombre="Press Banca Inclinado", classification=cls.classification)
+
+    def test_api_returns_every_match_by_relevance(self):
+        response = self.client_for(self.accounts[0]).get(
+            "/api/v1/exercises/", {"q": "press banca"})
+        self.assertEqual(response.status_code, 200)
+        ids = [exercise["id"] for exercise in response.json()]
+        self.assertEqual(len(ids), 61)
+        self.assertEqual(ids[0], self.press_banca.pk)
+        self.assertEqual(
+            response.json()[0]["nombre"], self.press_banca.nombre)
+
+    def test_admin_search_uses_the_index(self):
+        client = Client()
+        client.force_login(self.admin)
+        response = client.get(
+            "/admin/daily_trainning_app/exercise/", {"q": "banca inclinado"})
+        self.assertContains(response, "Press Banca Inclinado")
+        self.assertNotContains(response, ">Press 7<")
+
+    def test_search_ids_limit(self):
+        self.assertEqual(len(search_ids("exercise", "press")), 61)
+        self.assertEqual(len(search_ids("exercise", "press", limit=10)), 10)
+
+    def test_migration_keeps_its_own_trigrams(self):
+        migration = importlib.import_module(
+            "daily_trainning_app.migrations.0009_search_trigram")
+        self.assertIsNot(migration.trigrams, trigrams)
+        for text in ("Press  Banca", "Peso muerto rumano", "Ñandú Ágil"):
+            self.assertEqual(migration.trigrams(text), trigrams(text))
+
+
+# 📌 1️⃣5️⃣ Último entrenamiento
+class LatestWorkoutTests(CatalogueMixin, TestCase):
+    def test_planned_sets_are_not_the_latest_workout(self):
+        athlete = self.athletes[0]
+        WorkoutData.objects.create(
+            user=athlete, exercise=self.exercise, fecha=date(2024, 2, 1),
+            sets=3, reps=5, peso=85, planificado=True)
+        response = self.client_for(self.accounts[0]).get(
+            f"/api/v1/workout-data/{athlete.pk}/latest/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["fecha"], "2024-01-02")
+
+    def test_only_own_latest_workout(self):
+        response = self.client_for(self.accounts[0]).get(
+            f"/api/v1/workout-data/{self.athletes[1].pk}/latest/")
+        self.assertEqual(response.status_code, 404)
+
+
+# 📌 1️⃣6️⃣ Archivo de entrenamientos
+class ArchivingTests(CatalogueMixin, TestCase):
+    def test_archived_id_is_overwritten_by_the_hot_row(self):
+        workout = WorkoutData.objects.get(user=self.athletes[0])
+        self.assertEqual(archive_workouts(before=date(2024, 2, 1)), 2)
+        self.assertFalse(WorkoutData.objects.exists())
+        # La misma serie vuelve a la tabla caliente, corregida
+        WorkoutData.objects.create(
+            id=workout.pk, user=self.athletes[0], exercise=self.exercise,
+            fecha=date(2024, 1, 2), sets=3, reps=5, peso=85)
+        self.assertEqual(archive_workouts(before=date(2024, 2, 1)), 1)
+        self.assertFalse(WorkoutData.objects.exists())
+        self.assertEqual(
+            ArchivedWorkoutData.objects.get(pk=workout.pk).peso, 85)
+
+
+    def test_archived_history_stays_reachable(self):
+        athlete = self.athletes[0]
+        workout = WorkoutData.objects.get(user=athlete)
+        self.assertEqual(archive_workouts(before=date(2024, 2, 1)), 2)
+        client = self.client_for(self.accounts[0])
+
+        detail = client.get(f"/api/v1/workout-data/{workout.pk}/")
+        self.assertEqual(detail.status_code, 200)
+        self.assertEqual(detail.json()["fecha"], "2024-01-02")
+        # La serie archivada del otro atleta sigue oculta
+        self.assertEqual(client.get(
+            "/api/v1/workout-data/"
+            f"{ArchivedWorkoutData.objects.exclude(pk=workout.pk).get().pk}/"
+        ).status_code, 404)
+        self.assertEqual(
+            client.get(f"/api/v1/workout-data/{athlete.pk}/latest/")
+            .json()["id"], workout.pk)
+
+        dashboard = client.get(
+            f"/api/v1/users/{athlete.pk}/dashboard/").json()
+        self.assertEqual([row["id"] for row in dashboard["recent"]],
+                         [workout.pk])
+        self.assertEqual(
+            [session["fecha"] for session in dashboard["latest_sessions"]],
+            ["2024-01-02"])
+
+        volume = client.get(
+            "/api/v1/muscle-volume/?desde=2024-01-01&hasta=2024-01-07").json()
+        self.assertEqual(
+            volume[0]["semanas"][0]["grupos"][0]["series"], 3)
+
+        rebuild_fitness()
+        self.assertTrue(AthleteFitnessState.objects.filter(
+            user=athlete, fecha=date(2024, 1, 2)).exists())
+
+# 📌 1️⃣7️⃣ Copias de seguridad y restauración
+class BackupTests(TransactionTestCase):
+    databases = {"default", BACKUP_DB}
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.exercise = Exercise.objects.using(BACKUP_DB).create(
+            nombre="Sentadilla",
+            classification=Classification.objects.using(BACKUP_DB).create(
+                nombre="Pierna"))
+        self.athlete = User.objects.using(BACKUP_DB).create(
+            nombre="Atleta", email="atleta@example.com",
+            fecha_inicio=date(2024, 1, 1))
+        self.workouts = [
+            WorkoutData.objects.using(BACKUP_DB).create(
+                user=self.athlete, exercise=self.exercise,
+                fecha=date(2024, 1, day), sets=3, reps=5, peso=80)
+            for day in (2, 4)]
+
+    def workout_ids(self):
+        return set(WorkoutData.objects.using(BACKUP_DB).values_list(
+            "pk", flat=True))
+
+    def test_full_backup_then_delta_restores_latest_state(self):
+        full = backups.online_backup(
+            using=BACKUP_DB, target=os.path.join(self.directory, "full.sqlite3"),
+            sleep_ms=0)
+        backups.verify_backup(full)
+        desde = now()
+
+        # Después de la copia: una baja, una edición y un alta
+        kept, removed = self.workouts
+        removed_id = removed.pk
+        removed.delete()
+        WorkoutData.objects.using(BACKUP_DB).filter(pk=kept.pk).update(
+            peso=90, updated_at=now())
+        added = WorkoutData.objects.using(BACKUP_DB).create(
+            user=self.athlete, exercise=self.exercise, fecha=date(2024, 1, 6),
+            sets=3, reps=5, peso=85)
+        expected = self.workout_ids()
+        delta, counts = backups.export_delta(
+            desde, using=BACKUP_DB,
+            target=os.path.join(self.directory, "delta.jsonl.gz"))
+        self.assertEqual(counts["workoutdata"], 2)
+        self.assertEqual(counts["workoutdata_borrados"], 1)
+
+        backups.restore_full(full, using=BACKUP_DB)
+        self.assertEqual(self.workout_ids(), {kept.pk, removed_id})
+        backups.restore_delta(delta, using=BACKUP_DB)
+        self.assertEqual(self.workout_ids(), expected)
+        self.assertEqual(
+            WorkoutData.objects.using(BACKUP_DB).get(pk=kept.pk).peso, 90)
+        self.assertIn(added.pk, expected)
+
+    def test_restore_plan_uses_latest_full_and_later_deltas(self):
+        names = [
+            "full-gym-20240101T000000000000Z.sqlite3",
+            "full-gym-20240102T000000000000Z.sqlite3",
+            "delta-gym-20240101T000000000000Z-20240101T120000000000Z.jsonl.gz",
+            "delta-gym-20240101T235500000000Z-20240102T060000000000Z.jsonl.gz",
+            "delta-gym-20240102T055500000000Z-20240102T120000000000Z.jsonl.gz",
+            "delta-otro-20240102T000000000000Z-20240103T000000000000Z.jsonl.gz",
+        ]
+        for name in names:
+            open(os.path.join(self.directory, name), "w").close()
+        full, deltas = backups.restore_plan("gym", self.directory)
+        self.assertEqual(full.name, names[1])
+        self.assertEqual([delta.name for delta in deltas], names[3:5])
+
+    def test_damaged_backup_is_rejected(self):
+        path = os.path.join(self.directory, "full.sqlite3")
+        with open(path, "wb") as handle:
+            handle.write(b"SQLite format 3\x00" + b"\xff" * 4096)
+        with self.assertRaises(backups.BackupError):
+            backups.verify_backup(path)
+
+    def test_delta_warns_when_full_backup_is_overdue(self):
+        """ Los deltas no llevan el catálogo: piden una copia completa reciente """
+        self.assertTrue(backups.full_backup_overdue("gym", self.directory))
+        old = now() - timedelta(days=3)
+        open(os.path.join(self.directory, f"full-gym-{backups._stamp(old)}"
+                                          ".sqlite3"), "w").close()
+        self.assertTrue(backups.full_backup_overdue("gym", self.directory))
+        open(os.path.join(self.directory, f"full-gym-{backups._stamp(now())}"
+                                          ".sqlite3"), "w").close()
+        self.assertFalse(backups.full_backup_overdue("gym", self.directory))
+
+        # Un alta de catálogo sin series no viaja en el delta
+        desde = now()
+        Exercise.objects.using(BACKUP_DB).create(
+            nombre="Press banca", classification=self.exercise.classification)
+        _, counts = backups.export_delta(
+            desde, using=BACKUP_DB,
+            target=os.path.join(self.directory, "delta.jsonl.gz"))
+        self.assertEqual(counts["exercise"], 0)
+
+        output = StringIO()
+        with self.settings(BACKUPS={"directory": self.directory}):
+            call_command("backup_db", "--database", BACKUP_DB,
+                         "--incremental", "--since", "2024-01-01",
+                         stdout=output)
+        self.assertIn("⚠️", output.getvalue())
+
+
+# 📌 1️⃣8️⃣ Profiling por petición
+class ProfilingTests(CatalogueMixin, TestCase):
+    def get(self, username, password):
+        credentials = base64.b64encode(
+            f"{username}:{password}".encode()).decode()
+        return Client().get("/api/v1/users/", headers={
+            "Authorization": f"Basic {credentials}", "X-Profile": "1"})
+
+    def test_basic_auth_staff_is_profiled(self):
+        Account.objects.create_user("perfilador", password="pw", is_staff=True)
+        response = self.get("perfilador", "pw")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("X-Profile-Id", response.headers)
+
+    def test_non_staff_and_bad_credentials_are_not_profiled(self):
+        Account.objects.create_user("socio", password="pw")
+        self.assertNotIn("X-Profile-Id", self.get("socio", "pw").headers)
+        self.assertNotIn("X-Profile-Id", self.get("socio", "mal").headers)
+
+
+# 📌 1️⃣9️⃣ Tablas compiladas de RPE/1RM
+LEGACY_RIR = {100: 0, 95: 1, 90: 2, 85: 3, 80: 4, 75: 5, 70: 6, 65: 7, 60: 8}
+LEGACY_FATIGA = {"Bajo": 0, "Medio": 0.5, "Alto": 1}
+LEGACY_FACTORES = {"Bajo": 0.022, "Medio": 0.028, "Alto": 0.033}
+
+
+def legacy_rir(porcentaje_rm):
+    """ Clave más cercana, como hacía `calcular_rpe` antes de `rpe_tables` """
+    return LEGACY_RIR[min(LEGACY_RIR, key=lambda x: abs(x - porcentaje_rm))]
+
+
+def legacy_rpe(peso, reps, peso_maximo_rm, nivel_fatiga):
+    if peso == 0 or reps == 0 or not peso_maximo_rm:
+        return 0.0
+    rir = legacy_rir((peso / peso_maximo_rm) * 100)
+    rpe_estimado = round(
+        10 - rir + LEGACY_FATIGA.get(nivel_fatiga, 1.0), 2)
+    return max(5, min(10, rpe_estimado))
+
+
+def legacy_rm_sesion(peso, reps, rpe_objetivo, nivel_fatiga):
+    if peso == 0 or reps == 0 or rpe_objetivo < 5:
+        return 0.0
+    factor_ajuste = LEGACY_FACTORES.get(nivel_fatiga, 0.028)
+    return round(((reps + 10 - rpe_objetivo) * peso * factor_ajuste) + peso,
+                 2)
+
+
+class RPETableTests(TestCase):
+    """ Las tablas compiladas dan lo mismo que las fijas a las que sustituyen """
+    NIVELES = ("Bajo", "Medio", "Alto", "Otro")
+
+    @classmethod
+    def setUpTestData(cls):
+        classification = Classification.objects.create(nombre="Pierna")
+        cls.exercises = {
+            nivel: Exercise.objects.create(
+                nombre=f"Ejercicio {nivel}", classification=classification,
+                nivel_fatiga=nivel)
+            for nivel in cls.NIVELES}
+
+    def percentages(self):
+        """ Rejilla de 0.01 % más los puntos medios entre claves y sus vecinos """
+        porcentajes = {step / 100 for step in range(0, 16001)}
+        claves = sorted(LEGACY_RIR)
+        for menor, mayor in zip(claves, claves[1:]):
+            medio = (menor + mayor) / 2
+            porcentajes.update((
+                medio, math.nextafter(medio, 0), math.nextafter(medio, 200),
+                medio - 0.05, medio + 0.05))
+        return sorted(porcentajes)
+
+    def test_compiled_rir_matches_legacy_nearest_key(self):
+        tabla = rpe_tables.table_for(self.exercises["Medio"])
+        diferentes = [
+            porcentaje for porcentaje in self.percentages()
+            if tabla.reps_en_reserva(porcentaje) != legacy_rir(porcentaje)]
+        self.assertEqual(diferentes, [])
+
+    def test_workout_estimates_match_legacy_tables(self):
+        diferentes = []
+        for nivel, exercise in self.exercises.items():
+            for reps in range(0, 13):
+                for peso_maximo_rm in (0, 100, 137, 182.5):
+                    for peso in range(0, 201):
+                        workout = WorkoutData(
+                            exercise=exercise, peso=peso, reps=reps, sets=1)
+                        workout.rpe_objetivo = workout.calcular_rpe(
+                            peso_maximo_rm)
+                        rpe = legacy_rpe(peso, reps, peso_maximo_rm, nivel)
+                        if (workout.rpe_objetivo,
+                                workout.calcular_rm_sesion()) != (
+                                rpe, legacy_rm_sesion(peso, reps, rpe, nivel)):
+                            diferentes.append(
+                                (nivel, reps, peso_maximo_rm, peso))
+        self.assertEqual(diferentes, [])
+
+
+# 📌 2️⃣0️⃣ Columnas generadas (`total_reps` y `carga`)
+class GeneratedColumnTests(CatalogueMixin, TestCase):
+    def assertGenerated(self, queryset=None):
+        """ Cada fila cumple `total_reps = sets·reps` y `carga = total·peso` """
+        queryset = queryset or WorkoutData.objects.all()
+        rows = list(queryset.values_list(
+            "sets", "reps", "peso", "total_reps", "carga"))
+        self.assertTrue(rows)
+        for sets, reps, peso, total_reps, carga in rows:
+            self.assertEqual((total_reps, carga),
+                             (sets * reps, sets * reps * peso))
+
+    def test_queryset_update(self):
+        WorkoutData.objects.update(sets=4, reps=6)
+        self.assertGenerated()
+        self.assertEqual(set(WorkoutData.objects.values_list(
+            "total_reps", "carga")), {(24, 24 * 80)})
+
+    def test_bulk_update(self):
+        workouts = list(WorkoutData.objects.all())
+        for extra, workout in enumerate(workouts, start=1):
+            workout.reps, workout.peso = 5 + extra, 80 + extra
+        WorkoutData.objects.bulk_update(workouts, ["reps", "peso"])
+        self.assertGenerated()
+
+    def test_raw_sql(self):
+        table = connection.ops.quote_name(WorkoutData._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(f"UPDATE {table} SET sets = 2, peso = 90")
+            cursor.execute(f"SELECT total_reps, carga FROM {table}")
+            self.assertEqual(set(cursor.fetchall()), {(10, 900)})
+        self.assertGenerated()
+
+    def test_recompute_keeps_generated_columns(self):
+        WorkoutData.objects.update(sets=5)
+        recompute_all()
+        self.assertGenerated()
+
+    def test_materialized_program_rows(self):
+        program = TrainingProgram.objects.create(nombre="Fuerza")
+        ProgramEntry.objects.create(
+            programa=program, semana=1, dia=1, exercise=self.exercise,
+            sets=4, reps=3, porcentaje_rm=85)
+        self.assertEqual(materialize_program(
+            program, [athlete.pk for athlete in self.athletes],
+            date(2024, 2, 1))["creadas"], 2)
+        planned = WorkoutData.objects.filter(programa=program)
+        self.assertGenerated(planned)
+        self.assertEqual(set(planned.values_list("total_reps", "carga")),
+                         {(12, 12 * 85)})
+
+
+# 📌 2️⃣1️⃣ Renderers (orjson, columnar y MessagePack)
+class RendererTests(TestCase):
+    DATA = {
+        "id": 1,
+        "nombre": "Press\u2028banca",
+        "peso": Decimal("82.50"),
+        "fecha": date(2024, 1, 2),
+        "creado": datetime(2024, 1, 2, 10, 30, 15, 123456,
+                           tzinfo=timezone.utc),
+        "grupos": {7: 1.5, 3: 2.0},
+        "video": None,
+        "series": [{"sets": 3, "reps": 5}, {"sets": 4, "reps": 6}],
+    }
+
+    def render(self, renderer, data):
+        return renderer.render(data, "application/json", {})
+
+    def test_fast_json_matches_drf(self):
+        self.assertEqual(self.render(renderers.FastJSONRenderer(), self.DATA),
+                         self.render(JSONRenderer(), self.DATA))
+
+    def test_fast_json_falls_back_on_unsupported_values(self):
+        data = {"total": 2 ** 70}
+        self.assertEqual(self.render(renderers.FastJSONRenderer(), data),
+                         self.render(JSONRenderer(), data))
+
+    def test_non_finite_floats(self):
+        data = {"rendimiento": float("nan"), "fatiga": float("inf")}
+        self.assertEqual(self.render(renderers.FastJSONRenderer(), data),
+                         b'{"rendimiento":null,"fatiga":null}')
+        # `STRICT_JSON = False` (`JSONRenderer.strict`) conserva los literales
+        renderer = renderers.FastJSONRenderer()
+        renderer.strict = False
+        self.assertEqual(self.render(renderer, data),
+                         b'{"rendimiento":NaN,"fatiga":Infinity}')
+
+    def test_columnar_layout(self):
+        data = {"workouts": self.DATA["series"], "total": 2}
+        self.assertEqual(
+            json.loads(self.render(renderers.ColumnarJSONRenderer(), data)),
+            {"workouts": {"columns": ["sets", "reps"],
+                          "rows": [[3, 5], [4, 6]]},
+             "total": 2})
+
+    def test_msgpack_requires_the_package(self):
+        with mock.patch.object(renderers, "msgpack", None):
+            with self.assertRaises(RuntimeError):
+                self.render(renderers.MessagePackRenderer(), {"id": 1})
+
+    @skipUnless(renderers.msgpack, "msgpack no está instalado")
+    def test_msgpack_round_trip(self):
+        packed = self.render(renderers.MessagePackRenderer(), self.DATA)
+        self.assertEqual(
+            renderers.msgpack.unpackb(packed, strict_map_key=False),
+            json.loads(self.render(JSONRenderer(), self.DATA)) | {
+                "grupos": {7: 1.5, 3: 2.0}})
+
+
+# 📌 2️⃣2️⃣ Serialización rápida de entrenamientos
+class FastSerializerTests(CatalogueMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        program = TrainingProgram.objects.create(nombre="Fuerza")
+        exercise = Exercise.objects.create(
+            nombre="Press banca", classification=cls.classification,
+            video="https://example.com/press", descripcion="Barra")
+        WorkoutData.objects.create(
+            user=cls.athletes[0], exercise=exercise, fecha=date(2024, 1, 3),
+            sets=4, reps=6, peso=60, planificado=True, programa=program)
+
+    def test_rows_match_workout_serializer(self):
+        queryset = WorkoutData.objects.select_related(
+            "user", "exercise__classification").order_by("id")
+        expected = WorkoutDataSerializer(queryset, many=True).data
+        rows = serialize_workouts(queryset)
+        self.assertEqual(rows, expected)
+        self.assertEqual([list(row) for row in rows],
+                         [list(row) for row in expected])
+        self.assertEqual([list(row["exercise"]) for row in rows],
+                         [list(row["exercise"]) for row in expected])
+
+    def test_compact_layout_has_the_same_data(self):
+        queryset = WorkoutData.objects.order_by("id")
+        compact = serialize_workouts_compact(queryset)
+        rebuilt = [
+            {**workout,
+             "user": compact["users"][str(workout["user_id"])],
+             "exercise": compact["exercises"][str(workout["exercise_id"])]}
+            for workout in compact["workouts"]]
+        for row in rebuilt:
+            del row["user_id"], row["exercise_id"]
+        self.assertEqual(rebuilt, serialize_workouts(queryset))
+
+
+# 📌 2️⃣3️⃣ Perfiles de settings
+class SettingsProfileTests(SimpleTestCase):
+    def run_profile(self, module, script, setup=True, **env):
+        """ Ejecuta `script` en un proceso con el perfil `module`; su salida es JSON """
+        prelude = "import django, json; " + (
+            "django.setup(); " if setup else "")
+        completed = subprocess.run(
+            [sys.executable, "-c",
+             prelude + "from django.conf import settings; " + script],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": module, **env})
+        return json.loads(completed.stdout)
+
+    def test_production_sqlite_connections_are_tuned(self):
+        with tempfile.TemporaryDirectory() as directory:
+            result = self.run_profile(
+                "basis_trainning_app.settings_production",
+                "from django.db import connection; "
+                "cursor = connection.cursor(); "
+                "print(json.dumps({"
+                "name: cursor.execute(f'PRAGMA {name}').fetchone()[0] "
+                "for name in ('journal_mode', 'synchronous', 'busy_timeout')"
+                "} | {'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],"
+                " 'transaction_mode': connection.transaction_mode,"
+                " 'debug': settings.DEBUG, 'hosts': settings.ALLOWED_HOSTS}))",
+                SQLITE_PATH=os.path.join(directory, "db.sqlite3"),
+                DJANGO_ALLOWED_HOSTS="api.example.com")
+        self.assertEqual(result, {
+            "journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000,
+            "conn_max_age": 600, "transaction_mode": "IMMEDIATE",
+            "debug": False, "hosts": ["api.example.com"]})
+
+    def test_production_postgresql_uses_a_pool(self):
+        result = self.run_profile(
+            "basis_trainning_app.settings_production",
+            "print(json.dumps({alias: [db['ENGINE'], db['HOST'], "
+            "db['CONN_MAX_AGE'], db['OPTIONS']['pool']['max_size']] "
+            "for alias, db in settings.DATABASES.items()}))",
+            # Sin `django.setup()`: aquí no hace falta tener psycopg
+            setup=False, DATABASE_ENGINE="postgresql", DATABASE_HOST="primario",
+            DATABASE_REPLICA_HOST="replica", DATABASE_POOL_MAX="7")
+        engine = "django.db.backends.postgresql"
+        self.assertEqual(result["default"], [engine, "primario", 0, 7])
+        self.assertEqual(result[settings.DATABASE_REPLICA_ALIAS],
+                         [engine, "replica", 0, 7])
+
+
+    def test_worker_profile_inherits_the_base_profile(self):
+        result = self.run_profile(
+            "basis_trainning_app.settings_worker",
+            "print(json.dumps([settings.INSTALLED_APPS, settings.MIDDLEWARE, "
+            "settings.DATABASES['default']['OPTIONS'].get('transaction_mode'),"
+            " settings.ROOT_URLCONF]))",
+            DJANGO_BASE_SETTINGS="basis_trainning_app.settings_production")
+        self.assertEqual(result, [
+            ["django.contrib.contenttypes", "django.contrib.auth",
+             "daily_trainning_app"],
+            [], "IMMEDIATE", "basis_trainning_app.urls_worker"])
+
+    def test_batch_commands_import_lazily(self):
+        result = self.run_profile(
+            "basis_trainning_app.settings_worker",
+            "import sys; "
+            "from daily_trainning_app.management.commands import ("
+            "archive_workouts, rebuild_search_index, recompute_workouts); "
+            "print(json.dumps(sorted(name for name in sys.modules "
+            "if name.startswith(('rest_framework', 'django.contrib.admin', "
+            "'django.contrib.sessions', 'daily_trainning_app.api')))))")
+        self.assertEqual(result, [])
+
+# 📌 2️⃣4️⃣ Recálculo en paralelo
+class ParallelRecomputeTests(TransactionTestCase):
+    """ Los procesos hijo abren la base de pruebas (un archivo) por su alias """
+    databases = {"default", BACKUP_DB}
+
+    def setUp(self):
+        classification = Classification.objects.using(BACKUP_DB).create(
+            nombre="Pierna")
+        exercises = [
+            Exercise.objects.using(BACKUP_DB).create(
+                nombre=f"Ejercicio {nivel}", classification=classification,
+                nivel_fatiga=nivel)
+            for nivel in ("Bajo", "Medio", "Alto")]
+        rows = []
+        for index in range(6):
+            athlete = User.objects.using(BACKUP_DB).create(
+                nombre=f"Atleta {index}", email=f"atleta{index}@example.com",
+                fecha_inicio=date(2024, 1, 1))
+            for exercise in exercises:
+                UserExerciseRM.objects.using(BACKUP_DB).create(
+                    user=athlete, exercise=exercise,
+                    peso_maximo_rm=100 + 10 * index,
+                    fecha_registro=date(2024, 1, 1))
+                rows += [
+                    WorkoutData(user=athlete, exercise=exercise,
+                                fecha=date(2024, 1, day), sets=3,
+                                reps=day, peso=60 + 5 * day)
+                    for day in range(1, 1 + index + 2)]
+        # Sin `save()`: las métricas quedan a cero hasta recalcular
+        WorkoutData.objects.using(BACKUP_DB).bulk_create(rows)
+
+        # Perfil de los hijos: el alias (y `default`, de donde salen las
+        # tablas de RPE) apunta al archivo de pruebas
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        module = f"parallel_settings_{os.getpid()}"
+        database = {**settings.DATABASES["default"],
+                    "NAME": connections[BACKUP_DB].settings_dict["NAME"]}
+        with open(os.path.join(directory.name, f"{module}.py"), "w") as file:
+            file.write(
+                "from basis_trainning_app.settings import *  # noqa\n"
+                f"DATABASES = {{'default': {database!r}, "
+                f"{BACKUP_DB!r}: {database!r}}}\n")
+        sys.path.insert(0, directory.name)
+        self.addCleanup(sys.path.remove, directory.name)
+        patcher = mock.patch.dict(os.environ, {"DJANGO_SETTINGS_MODULE": module})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def metrics(self):
+        return list(WorkoutData.objects.using(BACKUP_DB).order_by("pk")
+                    .values_list("pk", *RECOMPUTED_FIELDS))
+
+    def reset(self):
+        WorkoutData.objects.using(BACKUP_DB).update(**{
+            field: 0.0 for field in RECOMPUTED_FIELDS})
+
+    def test_multiprocess_matches_serial(self):
+        serial = recompute_all(processes=1, using=BACKUP_DB)
+        expected = self.metrics()
+        self.assertTrue(all(row[1] for row in expected))
+        self.reset()
+        parallel = recompute_all(processes=2, shards=3, using=BACKUP_DB)
+        self.assertEqual(self.metrics(), expected)
+        self.assertEqual(
+            (parallel["filas"], parallel["actualizadas"], parallel["base"]),
+            (serial["filas"], serial["actualizadas"], BACKUP_DB))
+
+
+# 📌 2️⃣5️⃣ Programas y series planificadas
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class PlannedWorkoutTests(CatalogueMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.program = TrainingProgram.objects.create(nombre="Fuerza")
+        cls.press = Exercise.objects.create(
+            nombre="Press banca", classification=cls.classification)
+        for exercise in (cls.exercise, cls.press):
+            ProgramEntry.objects.create(
+                programa=cls.program, semana=1, dia=1, exercise=exercise,
+                sets=4, reps=3, porcentaje_rm=85)
+
+    def materialize(self):
+        return materialize_program(
+            self.program, [athlete.pk for athlete in self.athletes],
+            date(2024, 2, 1))
+
+    def test_exercises_without_rm_are_skipped_and_reported(self):
+        UserExerciseRM.objects.create(
+            user=self.athletes[1], exercise=self.press, peso_maximo_rm=80,
+            fecha_registro=date(2024, 1, 1))
+        self.assertEqual(self.materialize(), {
+            "creadas": 3,
+            "sin_rm": [{"user_id": self.athletes[0].pk,
+                        "exercise_ids": [self.press.pk]}]})
+        self.assertFalse(WorkoutData.objects.filter(peso=0).exists())
+
+    def test_list_excludes_planned_rows_unless_asked(self):
+        self.materialize()
+        client = self.client_for(self.accounts[0])
+        rows = client.get("/api/v1/workout-data/").json()
+        self.assertEqual([row["planificado"] for row in rows], [False])
+        rows = client.get("/api/v1/workout-data/?include_planned=1").json()
+        self.assertEqual(sorted(row["planificado"] for row in rows),
+                         [False, True])
+
+    def test_sync_sends_planned_rows_only_when_asked(self):
+        token = self.client_for(self.admin).get("/api/v1/sync/").json()["next"]
+        self.materialize()
+        planned = list(WorkoutData.objects.filter(
+            planificado=True).values_list("pk", flat=True))
+        client = self.client_for(self.admin)
+        delta = client.get(f"/api/v1/sync/?since={token}").json()
+        self.assertEqual(delta["workout_data"]["updated"], [])
+        self.assertEqual(delta["workout_data"]["deleted"], planned)
+        delta = client.get(
+            f"/api/v1/sync/?since={token}&include_planned=1").json()
+        self.assertEqual(
+            [row["id"] for row in delta["workout_data"]["updated"]], planned)
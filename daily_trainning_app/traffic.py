@@ -0,0 +1,52 @@
+"""
+Grabación del tráfico de la API para las pruebas de carga.
+
+`TrafficRecordingMiddleware` añade cada petición a `/api/` al fichero de
+`TRAFFIC_RECORDING_PATH` para reproducirla con
+`python -m benchmarks.loadtest --replay`.
+"""
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+
+class TrafficRecordingMiddleware:
+    """
+    Con `TRAFFIC_RECORDING_PATH`, añade cada petición a `/api/` al fichero
+    (JSON Lines): segundo relativo, método, ruta, cuerpo y usuario. No se
+    guardan credenciales; al reproducir se usan las del entorno de pruebas.
+    """
+    max_body = 64 * 1024
+
+    def __init__(self, get_response):
+        if not settings.TRAFFIC_RECORDING_PATH:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.file = open(settings.TRAFFIC_RECORDING_PATH, 'a', encoding='utf-8')
+
+    def __call__(self, request):
+        if not request.path.startswith('/api/'):
+            return self.get_response(request)
+
+        body = request.body if len(request.body) <= self.max_body else b''
+        response = self.get_response(request)
+        user = getattr(request, 'user', None)
+        entry = {
+            't': round(time.time() - self.started, 4),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'content_type': request.content_type,
+            'body': body.decode('utf-8', 'replace'),
+            'user_id': user.pk if user and user.is_authenticated else None,
+            'staff': bool(user and user.is_staff),
+            'status': response.status_code,
+        }
+        with self.lock:
+            self.file.write(json.dumps(entry) + '\n')
+            self.file.flush()
+        return response
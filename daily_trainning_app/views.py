@@ -1,3 +1,148 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from . import live_feed
+from .instrumentation import RingBufferSink, recent_profiles
+from .models import User, WorkoutData
+
+
+def profiling(request):
+    """ Spans recientes y perfiles por petición (envuelta con `admin_view`) """
+    profile_id = request.GET.get("id")
+    selected = next(
+        (item for item in recent_profiles if item["id"] == profile_id), None)
+    spans = list(RingBufferSink.records)[-200:]
+    spans.reverse()
+    return render(request, "admin/daily_trainning_app/profiling.html", {
+        "title": "Profiling",
+        "profiles": list(recent_profiles),
+        "selected": selected,
+        "spans": spans,
+    })
+
+
+# 📌 1️⃣ Feed en vivo de series (Server-Sent Events, solo ASGI)
+def _api_user(request):
+    """ Usuario autenticado con los mismos mecanismos que la API de DRF """
+    drf_request = Request(request, authenticators=[
+        authenticator() for authenticator
+        in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    try:
+        return drf_request.user
+    except APIException:
+        return None
+
+
+def _allowed_user_ids(user, user_ids):
+    """
+    Atletas que `user` puede seguir: administradores y entrenadores
+    (`is_staff`) cualquiera de la base de la petición (la de su gimnasio,
+    cuya pertenencia ya comprobaron `TenantMiddleware` y la autenticación;
+    sin `users`, todos); el resto solo a su atleta (`User.cuenta`). Devuelve
+    `(ids o None para todos, error)`.
+    """
+    if user.is_superuser or user.is_staff:
+        return user_ids, None
+    own = User.id_for_account(user)
+    if own is None:
+        return None, "Tu cuenta no está enlazada a ningún atleta."
+    if user_ids is not None and user_ids != {own}:
+        return None, "Solo puedes seguir tus propias series."
+    return {own}, None
+
+
+def _backfill(user_ids, last_id, limit):
+    """ Series posteriores a `Last-Event-ID` para reanudar tras una desconexión """
+    queryset = WorkoutData.objects.filter(id__gt=last_id, planificado=False)
+    if user_ids is not None:
+        queryset = queryset.filter(user_id__in=user_ids)
+    return [
+        (workout.pk, live_feed.encode_event(live_feed.event_data(workout)))
+        for workout in queryset.order_by("id")[:limit]
+    ]
+
+
+async def _stream(subscription, backlog, last_id, heartbeat):
+    try:
+        yield b"retry: 3000\n\n"
+        for last_id, chunk in backlog:
+            yield chunk
+        while True:
+            try:
+                pk, chunk = await asyncio.wait_for(
+                    subscription.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                # Comentario SSE: mantiene viva la conexión en los proxies
+                yield b": keepalive\n\n"
+                continue
+            # Las series que ya llegaron en el backlog no se repiten
+            if pk > last_id:
+                yield chunk
+            if subscription.lagged and subscription.queue.empty():
+                subscription.lagged = False
+                yield b"event: lagged\ndata: {}\n\n"
+    finally:
+        live_feed.broker.unsubscribe(subscription)
+
+
+async def workout_feed(request):
+    """
+    `GET /api/v1/live/workouts/?users=1,2,3` emite cada serie nueva de esos
+    atletas en cuanto se guarda. Los entrenadores eligen los atletas de su
+    gimnasio (o los reciben todos omitiendo `users`); un atleta solo puede
+    seguir las suyas.
+
+    Solo emite las series guardadas en este mismo proceso (ver
+    `live_feed`): con varios workers el resto llega al reconectar con
+    `Last-Event-ID` o por `/api/v1/sync/`. No incluye series planificadas.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"detail": "El feed en vivo solo está disponible con ASGI."},
+            status=501)
+    user = await sync_to_async(_api_user)(request)
+    if user is None or not user.is_authenticated:
+        return JsonResponse(
+            {"detail": "Las credenciales de autenticación no se proveyeron."},
+            status=401)
+
+    try:
+        user_ids = {
+            int(value) for value in request.GET.get("users", "").split(",")
+            if value.strip()} or None
+        last_id = int(request.headers.get("Last-Event-ID") or 0)
+    except ValueError:
+        return JsonResponse(
+            {"detail": "`users` y `Last-Event-ID` deben ser enteros."},
+            status=400)
+    user_ids, error = await sync_to_async(_allowed_user_ids)(user, user_ids)
+    if error:
+        return JsonResponse({"detail": error}, status=403)
+
+    config = settings.LIVE_FEED
+    # Primero la suscripción y luego el backlog: no se pierde nada entre medias
+    subscription = live_feed.broker.subscribe(user_ids)
+    backlog = []
+    if last_id:
+        try:
+            backlog = await sync_to_async(_backfill)(
+                user_ids, last_id, config.get("backfill_limit", 500))
+        except BaseException:
+            live_feed.broker.unsubscribe(subscription)
+            raise
 
-# Create your views here.
+    response = StreamingHttpResponse(
+        _stream(subscription, backlog, last_id,
+                config.get("heartbeat_seconds", 15)),
+        content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,36 @@
+"""
+Punto de entrada de los procesos worker.
+
+No importa modelos a nivel de módulo: cada proceso hijo (arrancado con
+`spawn`) configura Django antes de cargar los módulos que los usan.
+"""
+import os
+
+# Lock compartido de escritura para los procesos de recálculo
+_write_lock = None
+
+
+def _setup(settings_module):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+    django.setup()
+
+
+def worker_main(settings_module, poll_interval, burst):
+    _setup(settings_module)
+
+    from .task_queue import work
+    work(poll_interval=poll_interval, burst=burst)
+
+
+def init_recompute_worker(settings_module, write_lock):
+    global _write_lock
+    _setup(settings_module)
+    _write_lock = write_lock
+
+
+def recompute_shard_job(user_ids, batch_size, using):
+    from .recompute import recompute_shard
+
+    return recompute_shard(
+        user_ids, batch_size, write_lock=_write_lock, using=using)
@@ -1,14 +1,15 @@
-from daily_trainning_app.models import Classification, Exercise, User, UserExerciseRM, WorkoutData
 import os
 import django
 import random
 from datetime import datetime, timedelta
 
-# 📌 Configurar Django
+# 📌 Configurar Django antes de importar los modelos
 # Asegúrate de que sea el nombre correcto del proyecto
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "basis_trainning_app.settings")
 django.setup()
 
+from daily_trainning_app.models import Classification, Exercise, User, UserExerciseRM, WorkoutData  # noqa: E402
+
 
 def seed_classifications():
     Classification.objects.all().delete()
@@ -163,9 +164,10 @@ def seed_workout_data():
     print("🎉 ¡Workouts generados exitosamente!")
 
 
-# 📌 Ejecutar las funciones en orden correcto
-seed_classifications()
-seed_exercises()
-seed_users()
-seed_user_exercise_rm()
-seed_workout_data()
+# 📌 Ejecutar las funciones en orden correcto (solo al lanzar el script)
+if __name__ == "__main__":
+    seed_classifications()
+    seed_exercises()
+    seed_users()
+    seed_user_exercise_rm()
+    seed_workout_data()